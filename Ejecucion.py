@@ -0,0 +1,251 @@
+"""
+Motor de ejecución de la interfaz: corre la medición en un hilo aparte y comunica
+progreso y lecturas a Tk por una cola que se vacía con ventana.after(), así la
+ventana sigue respondiendo durante las lecturas largas del puente o del 3458A.
+
+    motor = MotorEjecucion(ventana, al_evento)
+    motor.iniciar(tarea_campania, "Config/campania.json")
+    motor.pausar() / motor.reanudar() / motor.cancelar()
+
+La tarea recibe un Contexto como primer argumento y debe llamar a contexto.verificar()
+entre pasos: ahí se bloquea mientras está en pausa y lanza Cancelado si se pidió cancelar.
+al_evento(tipo, datos) se llama siempre desde el hilo de Tk con tipo en
+"inicio", "progreso", "lectura", "fin", "cancelado" o "error".
+"""
+import os
+import sys
+import json
+import queue
+import threading
+import traceback
+
+
+class Cancelado(Exception):
+    """La ejecución fue cancelada por el operador."""
+
+
+class Contexto:
+    """
+    Lo que ve la tarea desde el hilo de trabajo.
+    Pausa y cancelación se atienden solo en verificar(), es decir entre lecturas: una lectura
+    en curso (un ciclo del puente, hasta 2 * delay + conversión, o un barrido del 3458A)
+    termina antes de que la tarea se detenga.
+    """
+
+    def __init__(self, cola):
+        self._cola = cola
+        self._cancelar = threading.Event()
+        self._corriendo = threading.Event()
+        self._corriendo.set()
+
+    @property
+    def cancelado(self):
+        return self._cancelar.is_set()
+
+    def verificar(self):
+        """Punto de control: espera mientras esté en pausa y lanza Cancelado si corresponde."""
+        while not self._corriendo.wait(0.1):
+            if self.cancelado:
+                break
+        if self.cancelado:
+            raise Cancelado()
+
+    def progreso(self, texto, fraccion=None):
+        self._cola.put(("progreso", {"texto": texto, "fraccion": fraccion}))
+
+    def lectura(self, datos):
+        self._cola.put(("lectura", datos))
+
+    def agregar(self, fila):
+        """Permite usar el contexto como registro de lecturas (ver Medida.medir / Campania)."""
+        self.lectura(fila)
+        self.verificar()
+
+
+class MotorEjecucion:
+    """
+    Una tarea a la vez en un hilo de trabajo. ventana: widget de Tk (para after()).
+    intervalo_ms: período con que se vacía la cola de eventos.
+    """
+
+    def __init__(self, ventana, al_evento, intervalo_ms=100):
+        self.ventana = ventana
+        self.al_evento = al_evento
+        self.intervalo_ms = intervalo_ms
+        self._cola = queue.Queue()
+        self._hilo = None
+        self._contexto = None
+        self._sondeando = False
+
+    @property
+    def ocupado(self):
+        return self._hilo is not None and self._hilo.is_alive()
+
+    @property
+    def en_pausa(self):
+        return self._contexto is not None and not self._contexto._corriendo.is_set()
+
+    def iniciar(self, tarea, *args, **kwargs):
+        if self.ocupado:
+            raise RuntimeError("Ya hay una ejecución en curso.")
+        self._contexto = Contexto(self._cola)
+        self._hilo = threading.Thread(target=self._correr, args=(tarea, self._contexto, args, kwargs),
+                                      name="MotorEjecucion", daemon=True)
+        self._cola.put(("inicio", None))
+        self._hilo.start()
+        if not self._sondeando:
+            self._sondeando = True
+            self.ventana.after(self.intervalo_ms, self._sondear)
+
+    def pausar(self):
+        if self._contexto is not None:
+            self._contexto._corriendo.clear()
+
+    def reanudar(self):
+        if self._contexto is not None:
+            self._contexto._corriendo.set()
+
+    def cancelar(self):
+        contexto = self._contexto
+        if contexto is None or contexto.cancelado:
+            return
+        # La tarea se entera en su próximo verificar(): no se interrumpe la lectura en curso
+        contexto._cancelar.set()
+        contexto._corriendo.set()
+
+    def _correr(self, tarea, contexto, args, kwargs):
+        try:
+            resultado = tarea(contexto, *args, **kwargs)
+            self._cola.put(("fin", resultado))
+        except Cancelado:
+            self._cola.put(("cancelado", None))
+        except Exception as e:
+            self._cola.put(("error", {"error": e, "traza": traceback.format_exc()}))
+
+    def _sondear(self):
+        # Se despachan todos los eventos acumulados; el hilo de trabajo nunca toca Tk
+        while True:
+            try:
+                tipo, datos = self._cola.get_nowait()
+            except queue.Empty:
+                break
+            self.al_evento(tipo, datos)
+        if self.ocupado or not self._cola.empty():
+            self.ventana.after(self.intervalo_ms, self._sondear)
+        else:
+            self._sondeando = False
+
+
+# ---------------------
+# Tareas
+# ---------------------
+CARPETA_PRUEBAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Pruebas")
+
+
+def _usar_pruebas():
+    # Los módulos de Pruebas se importan entre sí por nombre
+    if CARPETA_PRUEBAS not in sys.path:
+        sys.path.append(CARPETA_PRUEBAS)
+
+
+def validar_plan(texto):
+    """Valida el texto de un plan de medición (lanza Plan_Medicion.ErrorPlan)."""
+    _usar_pruebas()
+    from Plan_Medicion import validar_texto
+    return validar_texto(texto)
+
+
+def plantilla_plan():
+    """Plan de ejemplo con las direcciones de la última búsqueda de instrumentos, si la hay."""
+    _usar_pruebas()
+    from Plan_Medicion import PLAN_EJEMPLO
+    from Instrumental.Descubrimiento import direccion, instrumentos_en_cache
+    plan = json.loads(json.dumps(PLAN_EJEMPLO))
+    encontrados = instrumentos_en_cache()
+    plan["puente"]["direccion"] = direccion("MI60100", encontrados, plan["puente"]["direccion"])
+    plan["scanner"]["direccion"] = direccion("Scanner", encontrados, plan["scanner"]["direccion"])
+    for dmm in plan["termometros"].values():
+        dmm["direccion"] = direccion(dmm["modelo"], encontrados, dmm["direccion"])
+    return json.dumps(plan, indent=2, ensure_ascii=False)
+
+
+def tarea_para(ruta):
+    """
+    Campaña (JSON con "trabajos" o lista de trabajos) o plan de medición (ver
+    Pruebas/Plan_Medicion.py). Lanza ValueError si el JSON no es válido o no es ninguno de los dos.
+    """
+    with open(ruta, encoding="utf-8") as f:
+        datos = json.load(f)
+    if isinstance(datos, list):
+        return tarea_campania
+    if not isinstance(datos, dict):
+        raise ValueError(f"Se esperaba una lista de trabajos o un objeto JSON, no {type(datos).__name__}.")
+    return tarea_campania if "trabajos" in datos else tarea_plan
+
+
+def tarea_descubrimiento(contexto, simulado=False, forzar=True):
+    """Busca los instrumentos del bus (ver Instrumental/Descubrimiento.py)."""
+    from Instrumental.Descubrimiento import descubrir
+    rm = None
+    if simulado:
+        from Instrumental.Simulado import ResourceManagerSimulado
+        rm = ResourceManagerSimulado()
+    contexto.progreso("Buscando instrumentos...")
+    return descubrir(rm, forzar=forzar)
+
+
+def tarea_campania(contexto, ruta, simulado=False):
+    """Corre una campaña JSON (ver Pruebas/Campania.py) reportando cada lectura y cada trabajo."""
+    _usar_pruebas()
+    from Campania import Campania, CAMPOS_RESUMEN, cargar_trabajos
+    from Medida import Medida
+    from Registro import RegistroResultados
+    from Instrumental.Scanner import ScannerInti
+
+    trabajos = cargar_trabajos(ruta)
+    rm = None
+    if simulado:
+        from Instrumental.Simulado import ResourceManagerSimulado
+        rm = ResourceManagerSimulado(escala_tiempo=0.001)
+    contexto.progreso(f"Conectando instrumentos ({len(trabajos)} trabajos)...", 0.0)
+    scanner = ScannerInti(rm=rm)
+    medida = Medida(verbose=False, rm=rm)
+    base = os.path.splitext(ruta)[0]
+    try:
+        with RegistroResultados(base + "_resultados", CAMPOS_RESUMEN) as registro:
+            campania = Campania(scanner, medida, checkpoint=base + "_checkpoint.json", registro=registro,
+                                registro_lecturas=contexto, verbose=False)
+
+            def terminado(i, total, resumen):
+                contexto.progreso(f"{resumen['nombre']} terminado ({i + 1}/{total})", (i + 1) / total)
+                contexto.verificar()
+
+            return campania.ejecutar(trabajos, callback=terminado)
+    finally:
+        # También al cancelar: el puente queda en standby y el scanner abierto
+        scanner.ResetGeneral(ScannerInti.DireccionGPIB)
+        medida.close()
+
+
+def tarea_plan(contexto, ruta, simulado=False):
+    """Corre un plan de medición (compilado una vez y tomado de la cache en las siguientes)."""
+    _usar_pruebas()
+    from Plan_Medicion import cargar_plan, ejecutar_plan, campos_resumen
+    from Registro import RegistroResultados
+
+    compilado = cargar_plan(ruta)
+    rm = None
+    if simulado:
+        from Instrumental.Simulado import ResourceManagerSimulado
+        rm = ResourceManagerSimulado(escala_tiempo=0.001)
+    total = len(compilado["pasos"])
+    contexto.progreso(f"Plan '{compilado['nombre']}': conectando instrumentos ({total} mediciones)...", 0.0)
+    base = os.path.splitext(ruta)[0]
+    with RegistroResultados(base + "_resultados", campos_resumen(compilado)) as registro:
+
+        def terminado(i, total, resumen):
+            contexto.progreso(f"{resumen['nombre']} terminado ({i + 1}/{total})", (i + 1) / total)
+            contexto.verificar()
+
+        return ejecutar_plan(compilado, rm, checkpoint=base + "_checkpoint.json", registro=registro,
+                             registro_lecturas=contexto, callback=terminado, verbose=False)
@@ -0,0 +1,211 @@
+"""
+Formato binario de capturas de sweep (.cap), mapeable en memoria sin parseo.
+
+Estructura del archivo:
+    [0:8]      b"ESCCAP01"
+    [8:4096]   encabezado JSON (UTF-8, relleno con espacios): n, escala, dtype y metadatos
+    [4096:]    cuentas crudas del instrumento (int16 big-endian, tal como llegan en SINT)
+
+El voltaje es cuentas * escala (el ISCALE? del 3458A). Los archivos de texto de datos/
+(encabezado Fecha:/Temp:/Humedad:/V maxima:/V minima:/sweep time:/Mediciones: y un
+valor por línea) se convierten con convertir_archivo():
+
+    python -m Instrumental.Captura datos/
+"""
+import os
+import sys
+import json
+import numpy as np
+
+MAGIA = b"ESCCAP01"
+TAM_ENCABEZADO = 4096
+EXTENSION = ".cap"
+DTYPE = ">i2"
+
+# Claves del encabezado de texto -> clave en los metadatos
+CLAVES_TEXTO = {
+    "Fecha:": "fecha",
+    "Temp:": "temp",
+    "Humedad:": "humedad",
+    "V maxima:": "v_maxima",
+    "V minima:": "v_minima",
+    "sweep time:": "sweep_time",
+}
+
+
+def _encabezado(n, escala, metadatos):
+    cuerpo = json.dumps({"version": 1, "n": int(n), "escala": float(escala), "dtype": DTYPE,
+                         "metadatos": metadatos or {}}, ensure_ascii=False).encode()
+    if len(cuerpo) > TAM_ENCABEZADO - len(MAGIA):
+        raise ValueError("Metadatos demasiado grandes para el encabezado de la captura.")
+    return MAGIA + cuerpo.ljust(TAM_ENCABEZADO - len(MAGIA), b" ")
+
+
+class EscritorCaptura:
+    """
+    Escritura incremental de una captura: agregar() recibe los bytes crudos SINT (o un
+    array de cuentas) a medida que llegan; cerrar() completa n en el encabezado.
+    """
+
+    def __init__(self, ruta, escala, metadatos=None):
+        self.ruta = ruta
+        self.escala = escala
+        self.metadatos = dict(metadatos or {})
+        self.n = 0
+        self._archivo = open(ruta, "wb")
+        self._archivo.write(_encabezado(0, escala, self.metadatos))
+
+    def agregar(self, cuentas):
+        if isinstance(cuentas, (bytes, bytearray, memoryview)):
+            datos = bytes(cuentas)
+        else:
+            datos = np.asarray(cuentas).astype(DTYPE, copy=False).tobytes()
+        self._archivo.write(datos)
+        self.n += len(datos) // 2
+
+    def cerrar(self):
+        if self._archivo.closed:
+            return
+        self._archivo.seek(0)
+        self._archivo.write(_encabezado(self.n, self.escala, self.metadatos))
+        self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.cerrar()
+
+
+def guardar_captura(ruta, cuentas, escala, metadatos=None):
+    with EscritorCaptura(ruta, escala, metadatos) as escritor:
+        escritor.agregar(cuentas)
+    return ruta
+
+
+class Captura:
+    """Captura abierta: cuentas (memmap int16), escala y metadatos."""
+
+    def __init__(self, ruta, cuentas, escala, metadatos):
+        self.ruta = ruta
+        self.cuentas = cuentas
+        self.escala = escala
+        self.metadatos = metadatos
+
+    def __len__(self):
+        return len(self.cuentas)
+
+    def voltajes(self, inicio=0, fin=None):
+        """Tramo [inicio:fin] en voltios (solo se lee del disco ese tramo)."""
+        return self.cuentas[inicio:fin] * self.escala
+
+    def tiempos(self, inicio=0, fin=None):
+        dt = self.metadatos.get("sweep_time") or 1.0
+        fin = len(self) if fin is None else fin
+        return np.arange(inicio, fin) * dt
+
+
+def leer_encabezado(ruta):
+    with open(ruta, "rb") as f:
+        bloque = f.read(TAM_ENCABEZADO)
+    if not bloque.startswith(MAGIA):
+        raise ValueError(f"{ruta} no es una captura binaria.")
+    return json.loads(bloque[len(MAGIA):].decode())
+
+
+def abrir_captura(ruta, mmap=True):
+    """Abre una captura .cap. Con mmap=True las cuentas se mapean en memoria sin leerlas."""
+    encabezado = leer_encabezado(ruta)
+    n = encabezado["n"]
+    if mmap and n:
+        cuentas = np.memmap(ruta, dtype=encabezado["dtype"], mode="r", offset=TAM_ENCABEZADO, shape=(n,))
+    else:
+        with open(ruta, "rb") as f:
+            f.seek(TAM_ENCABEZADO)
+            cuentas = np.fromfile(f, dtype=encabezado["dtype"], count=n)
+    return Captura(ruta, cuentas, encabezado["escala"], encabezado["metadatos"])
+
+
+# ---------------------
+# Archivo de texto
+# ---------------------
+def _valor(texto):
+    try:
+        return float(texto)
+    except ValueError:
+        return texto
+
+
+def leer_texto(ruta):
+    """Lee una captura de texto. Devuelve (valores, metadatos); sin encabezado, metadatos = {}."""
+    with open(ruta, "r", encoding="utf-8") as f:
+        lineas = f.read().split("\n")
+    metadatos = {}
+    inicio = 0
+    if "Mediciones:" in lineas:
+        inicio = lineas.index("Mediciones:") + 1
+        for i, linea in enumerate(lineas[:inicio - 1]):
+            clave = CLAVES_TEXTO.get(linea.strip())
+            if clave and i + 1 < inicio:
+                metadatos[clave] = _valor(lineas[i + 1].strip())
+    valores = np.array([x for x in lineas[inicio:] if x.strip()], dtype=float)
+    return valores, metadatos
+
+
+def estimar_escala(valores, max_divisor=8):
+    """
+    Recupera el ISCALE con que se generaron los valores: son múltiplos enteros de la escala,
+    así que se prueba el menor salto entre valores dividido por 1..max_divisor y se refina
+    por mínimos cuadrados. Devuelve (escala, exacta); si no hay escala entera que reproduzca
+    los valores, se cuantiza a 16 bits sobre el rango (exacta=False).
+    """
+    valores = np.asarray(valores, dtype=float)
+    pico = float(np.abs(valores).max()) if valores.size else 0.0
+    if pico == 0.0:
+        return 1.0, True
+    saltos = np.diff(np.unique(valores))
+    saltos = saltos[saltos > 0]
+    if saltos.size:
+        for k in range(1, max_divisor + 1):
+            escala = saltos.min() / k
+            cuentas = np.round(valores / escala)
+            if np.abs(cuentas).max() > 32767:
+                break
+            escala = float(np.dot(cuentas, valores) / np.dot(cuentas, cuentas))
+            if np.abs(cuentas * escala - valores).max() <= 1e-6 * escala:
+                return escala, True
+    return pico / 32767, False
+
+
+def convertir_texto(ruta_txt, ruta_cap=None):
+    """Convierte un .txt de datos/ a .cap (mismo nombre por defecto). Devuelve la ruta nueva."""
+    valores, metadatos = leer_texto(ruta_txt)
+    escala, exacta = estimar_escala(valores)
+    metadatos.update(origen=os.path.basename(ruta_txt), escala_exacta=exacta)
+    cuentas = np.round(valores / escala)
+    ruta_cap = ruta_cap or os.path.splitext(ruta_txt)[0] + EXTENSION
+    return guardar_captura(ruta_cap, cuentas, escala, metadatos)
+
+
+def convertir_archivo(carpeta, sobrescribir=False):
+    """Convierte todos los Medicion_*.txt / CargaMedicion_*.txt bajo `carpeta`. Devuelve las rutas creadas."""
+    creadas = []
+    for raiz, _, archivos in os.walk(carpeta):
+        for nombre in sorted(archivos):
+            if not (nombre.endswith(".txt") and "Medicion_" in nombre):
+                continue
+            ruta_txt = os.path.join(raiz, nombre)
+            ruta_cap = os.path.splitext(ruta_txt)[0] + EXTENSION
+            if os.path.exists(ruta_cap) and not sobrescribir:
+                continue
+            try:
+                creadas.append(convertir_texto(ruta_txt, ruta_cap))
+            except ValueError as e:
+                print(f"[ERROR] No se pudo convertir {ruta_txt}: {e}")
+    return creadas
+
+
+if __name__ == "__main__":
+    carpeta = sys.argv[1] if len(sys.argv) > 1 else "datos"
+    for ruta in convertir_archivo(carpeta, sobrescribir="--sobrescribir" in sys.argv):
+        print(f"[INFO] Convertido: {ruta}")
@@ -0,0 +1,223 @@
+"""
+Descubrimiento de los instrumentos conectados al bus GPIB.
+
+Se listan las direcciones con list_resources() y se consultan todas en paralelo, con
+timeouts cortos, usando el comando de identificación de cada driver: *IDN? (HP34401A /
+HP34420A), ID? (HP3458A / HP3245A), Q (puente MI60100) y P3X (el scanner INTI no tiene
+identificación: contesta el canal cerrado en la salida S). La primera respuesta
+reconocida define el driver (nombre del registro, ver Instrumental.clase_driver).
+Después de cada consulta no reconocida se hace un device clear para que el comando no
+quede a medio interpretar.
+
+Las consultas pasan por el pool de Sesiones: una dirección que algún driver ya tiene
+abierta no se consulta (se conserva lo que diga la cache de esa dirección).
+
+El resultado se guarda por bus en Config/.cache/instrumentos.json: en los arranques
+siguientes, si el bus lista las mismas direcciones, se usa sin volver a consultar.
+
+    from Instrumental.Descubrimiento import descubrir, direccion
+    encontrados = descubrir()   # {"GPIB0::15::INSTR": {"driver": "MI60100", ...}, ...}
+    direccion("HP3458A")        # dirección del 3458A según la última búsqueda
+
+No usar con instrumentos abiertos por otro proceso o midiendo: las consultas se
+mezclarían con sus comandos.
+
+    python -m Instrumental.Descubrimiento [--simulado] [--forzar]
+"""
+import os
+import re
+import json
+import time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+RUTA_CACHE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          "Config", ".cache", "instrumentos.json")
+
+# Timeout de cada consulta (ms): los instrumentos contestan la identificación en decenas de ms
+TIMEOUT_MS = 300
+
+# (comando, patrón de la respuesta, driver), en el orden en que se prueban.
+# Los comandos estándar van primero y Q solo llega a lo que no contestó a ninguno: así los
+# multímetros nunca reciben la Q. El puente toma *IDN? e ID? como comandos de una letra
+# (la I sin valor es un error, no una corriente); igual se lo deja en standby al reconocerlo.
+SONDAS = (
+    ("*IDN?", re.compile(r"34401A"), "HP34401A"),
+    ("*IDN?", re.compile(r"34420A"), "HP34420A"),
+    ("ID?", re.compile(r"3458A"), "HP3458A"),
+    ("ID?", re.compile(r"3245A"), "HP3245A"),
+    ("Q", re.compile(r"^[RL]\s?[A-Z]\s?q$"), "MI60100"),
+    ("P3X", re.compile(r"^\d{1,2}$"), "ScannerInti"),
+)
+
+
+def _comandos():
+    """Comandos de SONDAS sin repetir, cada uno con sus (patrón, driver)."""
+    comandos = {}
+    for comando, patron, driver in SONDAS:
+        comandos.setdefault(comando, []).append((patron, driver))
+    return list(comandos.items())
+
+
+def bus_de(recurso):
+    """'GPIB0::15::INSTR' -> 'GPIB0'."""
+    return recurso.split("::", 1)[0]
+
+
+def orden(recurso):
+    """Clave para ordenar direcciones por número ('GPIB0::5' antes que 'GPIB0::10')."""
+    return [int(p) if p.isdigit() else p for p in re.split(r"(\d+)", recurso)]
+
+
+def sondear(rm, recurso, timeout_ms=TIMEOUT_MS):
+    """
+    Identifica el instrumento en `recurso`. Devuelve {"driver", "comando", "respuesta",
+    "tiempo_s"}; driver es None si nada contestó algo reconocible. Si un driver ya tiene
+    la dirección abierta en el pool de Sesiones no se consulta y se devuelve en_uso=True.
+    """
+    import pyvisa
+    from . import Sesiones
+    t0 = time.perf_counter()
+    resultado = {"driver": None, "comando": None, "respuesta": None}
+    try:
+        instrumento, nueva = Sesiones.abrir(recurso, rm)
+    except pyvisa.errors.VisaIOError as e:
+        resultado.update(error=str(e), tiempo_s=time.perf_counter() - t0)
+        return resultado
+    if not nueva:
+        # Las consultas se mezclarían con los comandos del driver que la está usando
+        Sesiones.liberar(recurso, rm)
+        resultado.update(en_uso=True, tiempo_s=time.perf_counter() - t0)
+        return resultado
+    try:
+        instrumento.timeout = timeout_ms
+        instrumento.read_termination = "\n"
+        instrumento.write_termination = "\r\n"
+        for comando, candidatos in _comandos():
+            try:
+                respuesta = instrumento.query(comando).strip()
+            except pyvisa.errors.VisaIOError:
+                respuesta = None
+            if respuesta:
+                for patron, driver in candidatos:
+                    if patron.search(respuesta):
+                        resultado.update(driver=driver, comando=comando, respuesta=respuesta)
+                        if driver == "MI60100":
+                            instrumento.write("s")
+                        return resultado
+                # Contestó algo que no es de este comando: se guarda por si nada más coincide
+                resultado["respuesta"] = respuesta
+            try:
+                instrumento.clear()
+            except pyvisa.errors.VisaIOError:
+                pass
+        return resultado
+    finally:
+        resultado["tiempo_s"] = time.perf_counter() - t0
+        # Se cierra: el driver que la abra después hace su configuración inicial
+        Sesiones.liberar(recurso, rm, cerrar=True)
+
+
+def leer_cache(ruta_cache=RUTA_CACHE):
+    """{bus: {"actualizado", "recursos", "instrumentos"}} de la última búsqueda ({} si no hay)."""
+    if not ruta_cache or not os.path.exists(ruta_cache):
+        return {}
+    try:
+        with open(ruta_cache, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] No se pudo leer la cache de instrumentos {ruta_cache}: {e}")
+        return {}
+
+
+def _guardar_cache(cache, ruta_cache):
+    os.makedirs(os.path.dirname(ruta_cache), exist_ok=True)
+    temporal = ruta_cache + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=2)
+    os.replace(temporal, ruta_cache)
+
+
+def instrumentos_en_cache(ruta_cache=RUTA_CACHE):
+    """Instrumentos de la última búsqueda de todos los buses, sin tocar el bus (ni importar pyvisa)."""
+    encontrados = {}
+    for entrada in leer_cache(ruta_cache).values():
+        encontrados.update(entrada.get("instrumentos", {}))
+    return encontrados
+
+
+def descubrir(rm=None, consulta="GPIB?*::INSTR", timeout_ms=TIMEOUT_MS, max_hilos=8,
+              ruta_cache=RUTA_CACHE, forzar=False, verbose=False):
+    """
+    Devuelve {recurso: {"driver", "comando", "respuesta", "tiempo_s"}} de todos los buses.
+    Un bus se vuelve a consultar solo si cambió la lista de direcciones o con forzar=True.
+    ruta_cache=None no lee ni guarda cache.
+    """
+    if rm is None:
+        from . import Sesiones
+        rm = Sesiones.obtener_rm()
+    recursos = sorted((r for r in rm.list_resources(consulta) if r.endswith("::INSTR")), key=orden)
+    por_bus = {}
+    for recurso in recursos:
+        por_bus.setdefault(bus_de(recurso), []).append(recurso)
+
+    cache = leer_cache(ruta_cache)
+    encontrados = {}
+    a_sondear = []
+    for bus, lista in por_bus.items():
+        entrada = cache.get(bus)
+        if not forzar and entrada and entrada.get("recursos") == lista:
+            if verbose:
+                print(f"[INFO] {bus}: instrumentos tomados de la cache ({entrada['actualizado']}).")
+            encontrados.update(entrada["instrumentos"])
+        else:
+            a_sondear += lista
+
+    if a_sondear:
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, min(max_hilos, len(a_sondear)))) as ejecutor:
+            resultados = list(ejecutor.map(lambda r: sondear(rm, r, timeout_ms), a_sondear))
+        if verbose:
+            print(f"[INFO] {len(a_sondear)} direcciones consultadas en {time.perf_counter() - t0:.2f} s.")
+        ahora = datetime.now().isoformat(timespec="seconds")
+        for recurso, resultado in zip(a_sondear, resultados):
+            anterior = cache.get(bus_de(recurso), {}).get("instrumentos", {}).get(recurso)
+            if resultado.get("en_uso") and anterior:
+                resultado = anterior
+            encontrados[recurso] = resultado
+            bus = bus_de(recurso)
+            cache[bus] = {"actualizado": ahora, "recursos": por_bus[bus],
+                          "instrumentos": {r: encontrados[r] for r in por_bus[bus] if r in encontrados}}
+        if ruta_cache:
+            _guardar_cache(cache, ruta_cache)
+    return encontrados
+
+
+def direccion(driver, encontrados=None, defecto=None):
+    """Primera dirección donde se encontró `driver` (nombre de clase o de modelo, ver Instrumental.MODELOS)."""
+    from . import MODELOS
+    driver = MODELOS.get(driver, driver)
+    encontrados = instrumentos_en_cache() if encontrados is None else encontrados
+    for recurso in sorted(encontrados, key=orden):
+        if encontrados[recurso].get("driver") == driver:
+            return recurso
+    return defecto
+
+
+def imprimir(encontrados):
+    print(f"{'dirección':<20}{'driver':<14}{'ms':>7}  respuesta")
+    for recurso in sorted(encontrados, key=orden):
+        r = encontrados[recurso]
+        detalle = r.get("respuesta") or r.get("error") or ("(en uso)" if r.get("en_uso") else "(sin respuesta)")
+        print(f"{recurso:<20}{r.get('driver') or '-':<14}{r.get('tiempo_s', 0) * 1e3:>7.0f}  {detalle}")
+
+
+if __name__ == "__main__":
+    import sys
+    rm = None
+    ruta = RUTA_CACHE
+    if "--simulado" in sys.argv:
+        from .Simulado import ResourceManagerSimulado
+        rm = ResourceManagerSimulado()
+        ruta = None
+    imprimir(descubrir(rm, ruta_cache=ruta, forzar="--forzar" in sys.argv, verbose=True))
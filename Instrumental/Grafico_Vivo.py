@@ -0,0 +1,142 @@
+"""
+Gráfico en vivo de sweeps largos del HP3458A con decimación min/max por píxel.
+
+Por cada columna de píxeles del eje se dibujan solo el mínimo y el máximo de las
+muestras que caen en ella: la forma (picos incluidos) es la misma que con todos los
+puntos, pero la línea nunca tiene más de 2 x ancho_en_píxeles vértices. Al hacer zoom
+se vuelve a decimar solo el tramo visible, con lo que se recupera el detalle.
+
+La adquisición corre en un hilo aparte y escribe directo en el array de datos; el
+hilo de la ventana redibuja a lo sumo cada `intervalo_s` lo que haya llegado:
+
+    datos = np.empty(n)
+    grafico = GraficoVivo(datos, dt)
+    grafico.seguir(hp.measure_sweep_stream(n, dt, aper, destino=datos))
+"""
+import time
+import threading
+import numpy as np
+import matplotlib.pyplot as plt
+
+
+def decimar_minmax(y, inicio, fin, n_columnas):
+    """
+    Índices y valores (min y max alternados) de y[inicio:fin] agrupado en n_columnas.
+    Si el tramo tiene menos de 2*n_columnas muestras se devuelve completo.
+    """
+    n = fin - inicio
+    if n <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+    if n <= 2 * n_columnas:
+        return np.arange(inicio, fin), y[inicio:fin]
+    bordes = np.linspace(inicio, fin, n_columnas + 1).astype(np.int64)[:-1]
+    tramo = y[inicio:fin]
+    relativos = bordes - inicio
+    minimos = np.minimum.reduceat(tramo, relativos)
+    maximos = np.maximum.reduceat(tramo, relativos)
+    centros = bordes + np.diff(np.append(bordes, fin)) // 2
+    indices = np.repeat(centros, 2)
+    valores = np.empty(2 * n_columnas)
+    valores[0::2] = minimos
+    valores[1::2] = maximos
+    return indices, valores
+
+
+class GraficoVivo:
+    """
+    datos: array preasignado que se va llenando (p.ej. el `destino` de measure_sweep_stream).
+    dt: período de muestreo (s) para el eje de tiempo.
+    """
+
+    def __init__(self, datos, dt, titulo="Medición Sweep Binary del HP3458A", intervalo_s=0.1):
+        self.datos = datos
+        self.dt = dt
+        self.intervalo_s = intervalo_s
+        self.n_validas = 0
+        self._cambios = True
+        self._ultimo_dibujo = 0.0
+        self._ajustando_limites = False
+        plt.ion()
+        self.figura, self.eje = plt.subplots(figsize=(10, 5))
+        self.linea, = self.eje.plot([], [], lw=0.8)
+        self.eje.set_title(titulo)
+        self.eje.set_xlabel("Tiempo (s)")
+        self.eje.set_ylabel("Voltaje (V)")
+        self.eje.grid(True)
+        self.eje.set_xlim(0, max(len(datos) - 1, 1) * dt)
+        self._zoom = False
+        self._terminado = False
+        # Con una lambda (y no el método) la figura mantiene vivo al gráfico: matplotlib solo
+        # guarda referencias débiles a métodos y el zoom dejaría de refinar al salir de seguir()
+        self.eje.callbacks.connect("xlim_changed", lambda eje: self._al_cambiar_limites(eje))
+
+    def _al_cambiar_limites(self, _eje):
+        # Zoom o desplazamiento del operador: hay que volver a decimar el tramo visible
+        if not self._ajustando_limites:
+            self._zoom = True
+            self._cambios = True
+            # Con la adquisición terminada nadie más redibuja: se hace acá
+            if self._terminado:
+                self.actualizar(forzar=True)
+
+    def marcar(self, n_validas):
+        """Indica cuántas muestras de `datos` ya son válidas (lo llama el hilo de adquisición)."""
+        self.n_validas = n_validas
+        self._cambios = True
+
+    def actualizar(self, forzar=False):
+        """Redibuja si hay datos nuevos o cambió el zoom, como mucho cada intervalo_s."""
+        ahora = time.monotonic()
+        if not self._cambios or (not forzar and ahora - self._ultimo_dibujo < self.intervalo_s):
+            return
+        self._cambios = False
+        self._ultimo_dibujo = ahora
+        n = self.n_validas
+        x0, x1 = self.eje.get_xlim()
+        inicio = max(0, int(np.floor(x0 / self.dt)))
+        fin = min(n, int(np.ceil(x1 / self.dt)) + 1)
+        columnas = max(int(self.eje.get_window_extent().width), 100)
+        indices, valores = decimar_minmax(self.datos, inicio, fin, columnas)
+        self.linea.set_data(indices * self.dt, valores)
+        if n and not self._zoom:
+            visibles = self.datos[:n]
+            bajo, alto = float(np.min(visibles)), float(np.max(visibles))
+            margen = (alto - bajo) * 0.05 or 1e-6
+            self._ajustando_limites = True
+            try:
+                self.eje.set_ylim(bajo - margen, alto + margen)
+            finally:
+                self._ajustando_limites = False
+        self.figura.canvas.draw_idle()
+
+    def seguir(self, bloques, bloquear=True):
+        """
+        Consume el generador `bloques` (measure_sweep_stream con destino=datos) en un hilo
+        y mantiene la ventana viva y actualizada mientras llegan. Con bloquear=True, al
+        terminar deja la ventana abierta como plt.show(). Devuelve `datos`.
+        """
+        error = []
+
+        def adquirir():
+            leidas = 0
+            try:
+                for bloque in bloques:
+                    leidas += len(bloque)
+                    self.marcar(leidas)
+            except Exception as e:
+                error.append(e)
+
+        hilo = threading.Thread(target=adquirir, name="GraficoVivo", daemon=True)
+        hilo.start()
+        while hilo.is_alive():
+            self.actualizar()
+            self.figura.canvas.flush_events()
+            time.sleep(self.intervalo_s / 4)
+        self._terminado = True
+        self.actualizar(forzar=True)
+        if error:
+            raise error[0]
+        if bloquear:
+            plt.ioff()
+            plt.show()
+        return self.datos
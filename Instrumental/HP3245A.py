@@ -1,17 +1,21 @@
 
-import pyvisa
 import time
+from . import Sesiones
+from .Lotes import Lote, ReglaLote
 
 class HP3245A:
-    def __init__(self, resource_name, verbose=True):
+    # Comandos separados por ';'. RESET va solo: tarda y reinicia el intérprete
+    REGLA_LOTE = ReglaLote(separador=";", largo_max=255, solos=("RESET",))
+
+    def __init__(self, resource_name, verbose=True, rm=None):
         self.resource_name = resource_name
         self.verbose = verbose
-        self.rm = pyvisa.ResourceManager()
+        self.rm = rm if rm is not None else Sesiones.obtener_rm()
         self.instrument = None
 
     def __enter__(self):
         try:
-            self.instrument = self.rm.open_resource(self.resource_name)
+            self.instrument, _ = Sesiones.abrir(self.resource_name, rm=self.rm)
             self.instrument.read_termination = '\n'
             self.instrument.write_termination = '\n'
             if self.verbose:
@@ -25,12 +29,27 @@ class HP3245A:
     def __exit__(self, exc_type, exc_value, traceback):
         try:
             if self.instrument:
-                self.instrument.close()
+                Sesiones.liberar(self.resource_name, rm=self.rm)
+                self.instrument = None
                 if self.verbose:
                     print("[INFO] Conexión cerrada correctamente.")
         except Exception as e:
             print(f"[ERROR] Al cerrar el instrumento: {e}")
 
+    def lote(self):
+        """Agrupa comandos en la menor cantidad de escrituras (ver Instrumental.Lotes)."""
+        return Lote(self.instrument.write, self.REGLA_LOTE)
+
+    @staticmethod
+    def comandos_generador(Frec, vpp_cha=1, offset_cha=0.5, vpp_chb=5, offset_chb=2.5):
+        """Comandos para dos cuadradas sincronizadas (CHA y CHB) a Frec Hz."""
+        return [
+            "RESET", "CLR", "SCRATCH", "BEEP OFF",
+            "USE CHANA", f"FREQ {Frec}", f"DCOFF {offset_cha}", f"APPLY SQV {vpp_cha}",
+            "USE CHANB", f"FREQ {Frec}", f"DCOFF {offset_chb}", f"APPLY SQV {vpp_chb}",
+            "PHSYNC",
+        ]
+
     def configurar_generador_full(self, Frec, Sweep_Time):
 
         if self.verbose:
@@ -40,22 +59,9 @@ class HP3245A:
         vpp_cha, offset_cha = 1, 0.5
         vpp_chb, offset_chb = 5, 2.5
 
-        self.instrument.write("RESET")
-        self.instrument.write("CLR")
-        self.instrument.write("SCRATCH")
-        self.instrument.write("BEEP OFF")
-
-        self.instrument.write("USE CHANA")
-        self.instrument.write(f"FREQ {Frec}")
-        self.instrument.write(f"DCOFF {offset_cha}")
-        self.instrument.write(f"APPLY SQV {vpp_cha}")
-
-        self.instrument.write("USE CHANB")
-        self.instrument.write(f"FREQ {Frec}")
-        self.instrument.write(f"DCOFF {offset_chb}")
-        self.instrument.write(f"APPLY SQV {vpp_chb}")
-
-        self.instrument.write("PHSYNC")
+        with self.lote() as lote:
+            for cmd in self.comandos_generador(Frec, vpp_cha, offset_cha, vpp_chb, offset_chb):
+                lote.write(cmd)
 
         print(f"[INFO] CHA configurado: {vpp_cha} Vpp, {Frec} Hz, Offset {offset_cha} V")
         print(f"[INFO] CHB configurado: {vpp_chb} Vpp, {Frec} Hz, Offset {offset_chb} V")
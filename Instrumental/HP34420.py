@@ -1,11 +1,21 @@
-import pyvisa
+from . import Sesiones
+from .Lotes import Lote, ReglaLote
 
 class HP34420A:
-    def __init__(self, gpib_address: str = "GPIB0::10::INSTR"):
-        self.rm = pyvisa.ResourceManager()
-        self.instrument = self.rm.open_resource(gpib_address)
+    # SCPI: comandos unidos con ';' y ':' para volver a la raíz del árbol
+    REGLA_LOTE = ReglaLote(separador=";:", largo_max=255, solos=("*",))
+
+    def __init__(self, gpib_address: str = "GPIB0::10::INSTR", rm=None):
+        self.gpib_address = gpib_address
+        self.rm = rm if rm is not None else Sesiones.obtener_rm()
+        # Sesión del pool: el reset solo se hace la primera vez que se abre
+        self.instrument, nueva = Sesiones.abrir(gpib_address, rm=self.rm)
         self.instrument.timeout = 5000
-        self.reset()
+        if nueva:
+            self.reset()
+
+    def lote(self):
+        return Lote(self.instrument.write, self.REGLA_LOTE)
 
     def reset(self):
         self.instrument.write("*RST")
@@ -14,14 +24,17 @@ class HP34420A:
     def identify(self) -> str:
         return self.instrument.query("*IDN?")
 
+    @staticmethod
+    def comandos_voltage_dc(range_val=0.01, resolution=1e-7):
+        return ["CONF:VOLT:DC", f"VOLT:DC:RANG {range_val}", f"VOLT:DC:RES {resolution}"]
+
     def configure_voltage_dc(self, range_val=0.01, resolution=1e-7):
-        self.instrument.write("CONF:VOLT:DC")
-        self.instrument.write(f"VOLT:DC:RANG {range_val}")
-        self.instrument.write(f"VOLT:DC:RES {resolution}")
+        with self.lote() as lote:
+            for cmd in self.comandos_voltage_dc(range_val, resolution):
+                lote.write(cmd)
 
     def read(self):
         return float(self.instrument.query("READ?"))
 
     def close(self):
-        self.instrument.close()
-        self.rm.close()
\ No newline at end of file
+        Sesiones.liberar(self.gpib_address, rm=self.rm)
\ No newline at end of file
@@ -1,23 +1,29 @@
 
 import pyvisa
 import time
+from datetime import datetime
 import numpy as np
-import struct
-import matplotlib.pyplot as plt
+from . import Sesiones
+from .Lotes import Lote, ReglaLote
+from .Captura import EscritorCaptura
 
 class HP3458A:
-    def __init__(self, gpib_address: str = "GPIB0::26::INSTR", do_reset=True, verbose=True):
+    # El 3458A acepta varios comandos separados por ';' en una misma línea
+    REGLA_LOTE = ReglaLote(separador="; ", largo_max=255, solos=("*RST", "RESET"))
+
+    def __init__(self, gpib_address: str = "GPIB0::26::INSTR", do_reset=True, verbose=True, rm=None):
         self.gpib_address = gpib_address
         self.verbose = verbose
-        self.rm = pyvisa.ResourceManager()
+        self.rm = rm if rm is not None else Sesiones.obtener_rm()
         try:
-            self.instrument = self.rm.open_resource(self.gpib_address)
+            # Sesión del pool: el reset (lento) solo se hace la primera vez que se abre
+            self.instrument, nueva = Sesiones.abrir(self.gpib_address, rm=self.rm)
             self.instrument.timeout = 50000
             self.instrument.read_termination = '\n'
             self.instrument.write_termination = '\n'
             if self.verbose:
                 print(f"[INFO] Conectado a {self.gpib_address}")
-            if do_reset:
+            if do_reset and nueva:
                 self.reset()
         except pyvisa.VisaIOError as e:
             raise ConnectionError(f"[ERROR] No se pudo abrir el recurso {self.gpib_address}: {e}")
@@ -30,12 +36,14 @@ class HP3458A:
 
     def close(self):
         if hasattr(self, 'instrument'):
-            self.instrument.close()
-        if hasattr(self, 'rm'):
-            self.rm.close()
+            Sesiones.liberar(self.gpib_address, rm=self.rm)
         if self.verbose:
             print("[INFO] Conexión cerrada correctamente.")
 
+    def lote(self):
+        """Agrupa comandos en la menor cantidad de escrituras (ver Instrumental.Lotes)."""
+        return Lote(self.instrument.write, self.REGLA_LOTE)
+
     def reset(self):
         self.instrument.write("*RST")
         self.instrument.write("*CLS")
@@ -62,14 +70,16 @@ class HP3458A:
         if self.verbose:
             print(f"[INFO] Medición configurada: {mode}, rango {range_val}, resolución {resolution}, NPLC {nplc}")
     '''
-    def configure_measurement(self, mode="DCV", range_val=10, resolution=0.00001):
+    @staticmethod
+    def comandos_medicion(mode="DCV", range_val=10, resolution=0.00001):
         mode = mode.upper()
-        if mode == "DCV":      
-            self.instrument.write(f"DCV {range_val},{resolution}")
-        elif mode == "ACV":
-            self.instrument.write(f"ACV {range_val},{resolution}")
-        else:
+        if mode not in ("DCV", "ACV"):
             raise ValueError(f"Modo de medición '{mode}' no soportado.")
+        return [f"{mode} {range_val},{resolution}"]
+
+    def configure_measurement(self, mode="DCV", range_val=10, resolution=0.00001):
+        for cmd in self.comandos_medicion(mode, range_val, resolution):
+            self.instrument.write(cmd)
 
     def measure_once(self) -> float:
         self.instrument.write("INIT")
@@ -87,47 +97,120 @@ class HP3458A:
         except KeyboardInterrupt:
             print("\n[INFO] Medición interrumpida por el usuario.")
 
-    def read_buffer(self, count=10) -> list:
-        self.instrument.write("MFORMAT ASCII")
-        self.instrument.write(f"MEM {count}")
-        self.instrument.write("TARM SGL,1")
-        self.instrument.write("TRIG")
-        time.sleep(0.5)
-        data = self.instrument.query("RMEM?")
-        return [float(val) for val in data.strip().split(",") if val]
+    # Formatos de memoria binarios: tipo NumPy (big-endian) de cada lectura
+    FORMATOS_BINARIOS = {"SINT": ">i2", "DINT": ">i4", "DREAL": ">f8"}
+
+    def wait_memory(self, count, timeout_s=None, intervalo_s=0.05):
+        """Espera hasta que la memoria tenga `count` lecturas (consulta MCOUNT?)."""
+        limite = time.monotonic() + (self.instrument.timeout / 1000.0 if timeout_s is None else timeout_s)
+        while int(float(self.instrument.query("MCOUNT?"))) < count:
+            if time.monotonic() >= limite:
+                raise TimeoutError(f"[ERROR] El 3458A no completó {count} lecturas a tiempo.")
+            time.sleep(intervalo_s)
+
+    def read_buffer(self, count=10, formato="SINT", timeout_s=None) -> np.ndarray:
+        """
+        Toma `count` lecturas en memoria y las transfiere como array de NumPy (en voltios).
+        formato: SINT (2 bytes), DINT (4 bytes), DREAL (8 bytes) o ASCII. Los formatos
+        enteros se escalan con ISCALE?; la decodificación es vectorizada con np.frombuffer.
+        En lugar de una pausa fija se espera a que MCOUNT? llegue a `count`.
+        """
+        formato = formato.upper()
+        if formato != "ASCII" and formato not in self.FORMATOS_BINARIOS:
+            raise ValueError(f"Formato de memoria '{formato}' no soportado.")
+        with self.lote() as lote:
+            lote.write(f"MFORMAT {formato}")
+            lote.write(f"OFORMAT {formato}")
+            lote.write("MEM FIFO")                 # MEM elige el modo de memoria, no la cantidad
+            lote.write(f"NRDGS {count},AUTO")      # count lecturas por disparo
+            lote.write("TARM SGL,1")
+            lote.write("TRIG")
+        self.wait_memory(count, timeout_s)
+        if formato == "ASCII":
+            data = self.instrument.query("RMEM?")
+            return np.array([val for val in data.strip().split(",") if val], dtype=float)
+        tipo = np.dtype(self.FORMATOS_BINARIOS[formato])
+        escala = float(self.instrument.query("ISCALE?")) if formato != "DREAL" else 1.0
+        self.instrument.write("RMEM?")
+        crudo = self.instrument.read_bytes(count * tipo.itemsize)
+        return np.frombuffer(crudo, dtype=tipo) * escala
 
-    def measure_sweep_binary(self, cant_muestras, sweep_time, aper_time) -> np.ndarray:
+    def _configurar_sweep(self, cant_muestras, sweep_time, aper_time):
         self.instrument.timeout = 30000
-        self.instrument.write('TRIG HOLD')
-        self.instrument.write('TARM HOLD')
-        cmd = (
-            f"AZERO OFF; PRESET FAST; MEM FIFO; MFORMAT SINT; OFORMAT SINT; TBUFF OFF; DELAY 0; "
-            f"TRIG HOLD; TARM HOLD; DISP OFF, SAMPLING; "
-            f"APER {aper_time}; DCV 1; SWEEP {sweep_time}, {cant_muestras}; "
-            f"TARM SYN; TRIG EXT; MATH OFF"
-        )
-        self.instrument.write(cmd)
-        self.instrument.write("TARM")
-        time.sleep(0.2)
-        self.instrument.write("MEM:START?")
-        raw_data = self.instrument.read_bytes(cant_muestras * 2)
-        muestras = struct.unpack(">" + "h" * cant_muestras, raw_data)
+        with self.lote() as lote:
+            lote.write('TRIG HOLD')
+            lote.write('TARM HOLD')
+            for cmd in (
+                f"AZERO OFF; PRESET FAST; MEM FIFO; MFORMAT SINT; OFORMAT SINT; TBUFF OFF; DELAY 0; "
+                f"TRIG HOLD; TARM HOLD; DISP OFF, SAMPLING; "
+                f"APER {aper_time}; DCV 1; SWEEP {sweep_time}, {cant_muestras}; "
+                f"TARM SYN; TRIG EXT; MATH OFF"
+            ).split("; "):
+                lote.write(cmd)
+
+    def measure_sweep_stream(self, cant_muestras, sweep_time, aper_time, tam_bloque=4096, destino=None,
+                             archivo=None, metadatos=None):
+        """
+        Adquiere un sweep vaciando la memoria FIFO de a bloques mientras el barrido sigue
+        corriendo, y entrega cada bloque (en voltios) apenas llega. Permite barridos más
+        largos que la memoria de lecturas del instrumento.
+
+        Los datos SINT (int16 big-endian) se decodifican con una vista de NumPy directo
+        sobre un buffer preasignado, sin crear objetos Python por muestra:
+        - destino=None: se reutiliza un único buffer de tam_bloque (memoria constante);
+          cada bloque entregado se sobrescribe en la iteración siguiente, copiarlo si se guarda.
+        - destino=array de cant_muestras: cada bloque es una vista de destino[i:i+k].
+        archivo: si se indica, las cuentas crudas se guardan además en una captura binaria
+        (ver Instrumental.Captura) con `metadatos` y los parámetros del sweep.
+        """
+        if destino is not None and len(destino) < cant_muestras:
+            raise ValueError("destino debe tener lugar para cant_muestras lecturas.")
+        self._configurar_sweep(cant_muestras, sweep_time, aper_time)
         escala = float(self.instrument.query("ISCALE?"))
-        return np.asarray(muestras) * escala
+        buffer = np.empty(tam_bloque) if destino is None else None
+        escritor = None
+        if archivo is not None:
+            datos_captura = {"fecha": datetime.now().strftime("%Y-%m-%d/%H:%M:%S"),
+                             "sweep_time": sweep_time, "aper_time": aper_time}
+            datos_captura.update(metadatos or {})
+            escritor = EscritorCaptura(archivo, escala, datos_captura)
+        try:
+            self.instrument.write("TARM")
+            self.instrument.write("MEM:START?")
+            leidas = 0
+            while leidas < cant_muestras:
+                k = min(tam_bloque, cant_muestras - leidas)
+                crudo = self.instrument.read_bytes(k * 2)
+                if escritor is not None:
+                    escritor.agregar(crudo)
+                cuentas = np.frombuffer(crudo, dtype=">i2")
+                bloque = buffer[:k] if destino is None else destino[leidas:leidas + k]
+                np.multiply(cuentas, escala, out=bloque)
+                leidas += k
+                yield bloque
+        finally:
+            if escritor is not None:
+                escritor.cerrar()
 
-    def measure_and_plot_sweep(self, cant_muestras, sweep_time, aper_time):
-        print("[INFO] Iniciando medición sweep...")
-        datos = self.measure_sweep_binary(cant_muestras, sweep_time, aper_time)
-        tiempo = np.arange(cant_muestras) * sweep_time
-        plt.figure(figsize=(10, 5))
-        plt.plot(tiempo, datos)
-        plt.title("Medición Sweep Binary del HP3458A")
-        plt.xlabel("Tiempo (s)")
-        plt.ylabel("Voltaje (V)")
-        plt.grid(True)
-        plt.show()
+    def measure_sweep_binary(self, cant_muestras, sweep_time, aper_time, archivo=None, metadatos=None) -> np.ndarray:
+        datos = np.empty(cant_muestras)
+        for _ in self.measure_sweep_stream(cant_muestras, sweep_time, aper_time, destino=datos,
+                                           archivo=archivo, metadatos=metadatos):
+            pass
         return datos
 
+    def measure_and_plot_sweep(self, cant_muestras, sweep_time, aper_time, bloquear=True):
+        """
+        Mide el sweep y lo grafica en vivo a medida que llegan los bloques, con decimación
+        min/max por píxel (ver Instrumental.Grafico_Vivo). La adquisición corre en otro hilo.
+        """
+        from .Grafico_Vivo import GraficoVivo
+        print("[INFO] Iniciando medición sweep...")
+        datos = np.empty(cant_muestras)
+        grafico = GraficoVivo(datos, sweep_time)
+        return grafico.seguir(self.measure_sweep_stream(cant_muestras, sweep_time, aper_time, destino=datos),
+                              bloquear=bloquear)
+
     def configurar_y_medir_sweep(self,Cant_Muestras, Sweep_time, Aper_Time):
         """Ejecuta el flujo clásico: reset, identificación, configuración, medición y gráfico."""
         self.reset()
@@ -0,0 +1,89 @@
+"""
+Agrupado de comandos de configuración en la menor cantidad de transacciones GPIB.
+
+Cada driver declara una ReglaLote con lo que su instrumento acepta en una sola
+línea (separador, largo máximo, comandos que deben ir solos) y expone lote():
+
+    with dmm.lote() as lote:
+        lote.write("CONF:VOLT:DC")
+        lote.write("VOLT:DC:RANG 10")
+"""
+
+
+class ReglaLote:
+    """
+    separador: texto entre comandos ('; ' en el 3458A, '' en el 60100, ';:' en SCPI).
+    largo_max: largo máximo de la línea enviada (sin terminador).
+    solos: prefijos de comandos que se envían en una transacción propia (p.ej. RESET).
+    puede_unirse: función opcional cmd -> bool para excluir comandos puntuales.
+    """
+
+    def __init__(self, separador=";", largo_max=255, solos=(), puede_unirse=None):
+        self.separador = separador
+        self.largo_max = largo_max
+        self.solos = tuple(s.upper() for s in solos)
+        self.puede_unirse = puede_unirse
+
+    def es_solo(self, cmd):
+        if self.solos and cmd.upper().startswith(self.solos):
+            return True
+        return self.puede_unirse is not None and not self.puede_unirse(cmd)
+
+    def agrupar(self, comandos):
+        """Devuelve las líneas a enviar para la lista de comandos, respetando el orden."""
+        lineas = []
+        actual = []
+        largo = 0
+        for cmd in comandos:
+            if self.es_solo(cmd):
+                if actual:
+                    lineas.append(self.separador.join(actual))
+                    actual, largo = [], 0
+                lineas.append(cmd)
+                continue
+            extra = len(cmd) + (len(self.separador) if actual else 0)
+            if actual and largo + extra > self.largo_max:
+                lineas.append(self.separador.join(actual))
+                actual, largo = [], 0
+                extra = len(cmd)
+            actual.append(cmd)
+            largo += extra
+        if actual:
+            lineas.append(self.separador.join(actual))
+        return lineas
+
+
+# Una regla que no une nada: cada comando en su propia transacción
+SIN_AGRUPAR = ReglaLote(largo_max=0)
+
+
+class Lote:
+    """Acumula comandos y los envía agrupados con enviar(linea) al hacer flush() o al salir del with."""
+
+    def __init__(self, enviar, regla: ReglaLote):
+        self.enviar = enviar
+        self.regla = regla
+        self.comandos = []
+
+    def write(self, cmd: str):
+        cmd = cmd.strip()
+        if cmd:
+            self.comandos.append(cmd)
+        return self
+
+    def flush(self):
+        """Envía lo acumulado. Devuelve las líneas enviadas."""
+        lineas = self.regla.agrupar(self.comandos)
+        self.comandos = []
+        for linea in lineas:
+            self.enviar(linea)
+        return lineas
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.flush()
+        else:
+            self.comandos = []
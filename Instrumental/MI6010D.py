@@ -1,7 +1,14 @@
 import time
 import re
+import threading
 import pyvisa
 import warnings
+import numpy as np
+from collections import namedtuple
+from . import Sesiones
+from .Metricas import METRICAS, clave_comando
+from .Lotes import Lote, ReglaLote
+from concurrent.futures import ThreadPoolExecutor
 warnings.filterwarnings("ignore", message="read string doesn't end with termination characters")
 
 class MI60100Error(Exception):
@@ -11,15 +18,161 @@ class MI60100Error(Exception):
         self.code = code
         self.message = message
 
+# Campos de un reporte de medición (mismos nombres que las columnas del CSV de resultados)
+CAMPOS_REPORTE = ("ratio", "Rs", "Rx", "media", "std_ppm", "incertidumbre_ppm")
+
+# Reporte decodificado. error=True para los mensajes Ecnn (codigo = nn, o None si no se entiende)
+Reporte = namedtuple("Reporte", CAMPOS_REPORTE + ("error", "codigo", "crudo"))
+
+_ETIQUETAS = {b"R": "ratio", b"RS": "Rs", b"RX": "Rx", b"MEAN": "media", b"STD": "std_ppm",
+              b"UNC": "incertidumbre_ppm"}
+_CAMPO = re.compile(rb"(RS|RX|R|MEAN|STD|UNC)\s*[=:]\s*([+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)")
+_CODIGO_ERROR = re.compile(r"E(.)(\d{1,2})")
+
+
+def codigo_error(texto):
+    """
+    Si `texto` es un mensaje de error del 60100 ('Ecnn') devuelve (True, nn); si el
+    formato no se entiende el código es None. Para cualquier otra respuesta, (False, None).
+    """
+    if isinstance(texto, bytes):
+        texto = texto.decode(errors="replace")
+    if not (texto.startswith("E") and len(texto) >= 2):
+        return False, None
+    m = _CODIGO_ERROR.search(texto)
+    return True, (int(m.group(2)) if m else None)
+
+
+class DecodificadorReportes:
+    """
+    Decodificador incremental de los reportes del 60100.
+
+    alimentar() recibe los bytes tal como llegan del bus (lecturas parciales, varias
+    líneas juntas o un reporte partido en varias líneas) y devuelve los reportes que
+    quedaron completos. Cada línea se mira una sola vez: '&<relación>' se convierte
+    directo, 'Ecnn' se reconoce por el primer carácter y el formato largo
+    ('R= RS= RX= MEAN= STD= UNC=') se recorre con una única expresión regular.
+    Un reporte largo se cierra al llegar UNC, al repetirse un campo o con terminar().
+
+    Los valores quedan además en columnas de NumPy (una por campo de CAMPOS_REPORTE,
+    NaN si el reporte no lo trae) que crecen por duplicación; columnas() devuelve
+    vistas sin copiar. Los errores se guardan aparte en `errores` como
+    (cantidad de reportes previos, código). Con acumular=False no se guardan columnas
+    (memoria constante para corridas sin límite; los valores solo salen en los Reporte).
+    """
+
+    def __init__(self, capacidad=1024, guardar_crudo=False, acumular=True):
+        self.guardar_crudo = guardar_crudo
+        self.acumular = acumular
+        if not acumular:
+            capacidad = 0
+        self._columnas = {campo: np.full(int(capacidad), np.nan) for campo in CAMPOS_REPORTE}
+        self.n = 0
+        self.errores = []
+        self.ignoradas = 0
+        self._resto = b""
+        self._actual = {}
+        self._lineas_actual = []
+
+    def alimentar(self, datos):
+        """Procesa un fragmento (bytes o str). Devuelve la lista de Reporte completos en él."""
+        if isinstance(datos, str):
+            datos = datos.encode()
+        lineas = (self._resto + datos).split(b"\n")
+        self._resto = lineas.pop()
+        completos = []
+        for linea in lineas:
+            linea = linea.strip()
+            if linea:
+                self._linea(linea, completos)
+        return completos
+
+    def terminar(self):
+        """Procesa lo que quedó sin terminador y cierra el reporte en curso."""
+        completos = []
+        resto, self._resto = self._resto.strip(), b""
+        if resto:
+            self._linea(resto, completos)
+        self._cerrar(completos)
+        return completos
+
+    def columnas(self):
+        """Vistas de las columnas con los n reportes decodificados hasta ahora."""
+        return {campo: columna[:self.n] for campo, columna in self._columnas.items()}
+
+    def _linea(self, linea, completos):
+        primero = linea[:1]
+        if primero == b"&":
+            self._cerrar(completos)
+            self._emitir({"ratio": float(linea[1:])}, linea, completos)
+        elif primero == b"E":
+            self._cerrar(completos)
+            _, codigo = codigo_error(linea)
+            self.errores.append((self.n, codigo))
+            completos.append(Reporte(*(None,) * len(CAMPOS_REPORTE), True, codigo,
+                                     linea.decode(errors="replace")))
+        else:
+            encontrado = False
+            for m in _CAMPO.finditer(linea):
+                encontrado = True
+                campo = _ETIQUETAS[m.group(1)]
+                if campo in self._actual:
+                    self._cerrar(completos)
+                self._actual[campo] = float(m.group(2))
+                if campo == "incertidumbre_ppm":
+                    self._lineas_actual.append(linea)
+                    self._cerrar(completos)
+            if not encontrado:
+                self.ignoradas += 1
+            elif self._actual:
+                self._lineas_actual.append(linea)
+
+    def _cerrar(self, completos):
+        if self._actual:
+            crudo = b" ".join(self._lineas_actual)
+            self._emitir(self._actual, crudo, completos)
+            self._actual = {}
+        self._lineas_actual = []
+
+    def _emitir(self, valores, crudo, completos):
+        if self.acumular:
+            if self.n == len(self._columnas["ratio"]):
+                for campo, columna in self._columnas.items():
+                    nueva = np.full(max(2 * len(columna), 16), np.nan)
+                    nueva[:self.n] = columna
+                    self._columnas[campo] = nueva
+            for campo, valor in valores.items():
+                self._columnas[campo][self.n] = valor
+        self.n += 1
+        completos.append(Reporte(*(valores.get(campo) for campo in CAMPOS_REPORTE), False, None,
+                                 crudo.decode(errors="replace") if self.guardar_crudo else None))
+
+
+def decodificar_reporte(texto):
+    """Decodifica un reporte ya leído (str). Devuelve un Reporte (el último si hay varios) o None."""
+    decodificador = DecodificadorReportes(capacidad=1, guardar_crudo=True)
+    reportes = decodificador.alimentar(texto + "\n") + decodificador.terminar()
+    return reportes[-1] if reportes else None
+
+
+# Comando de una letra con su valor opcional, p.ej. "I0.001" dentro de "A1I0.001T5R"
+_TOKEN_COMANDO = re.compile(r"([A-Za-z])([+-]?(?:\d+\.?\d*|\.\d+)(?:[Ee][+-]?\d+)?)?")
+
+
 class MI60100:
     """
     Wrapper simple para controlar el MI-60100 por GPIB usando pyvisa.
 
     Constructor:
-        MI60100(gpib_address, visa_backendspec=None, timeout_ms=20000)
+        MI60100(gpib_address, visa_backendspec=None, timeout_ms=20000, rm=None, debug=False)
 
     gpib_address: entero GPIB (ej: 15) o resource string completa "GPIB0::15::INSTR".
     timeout_ms: timeout de lectura/escritura (ms).
+    rm: ResourceManager a usar (p.ej. Instrumental.Simulado.ResourceManagerSimulado).
+    La sesión se toma del pool compartido (Instrumental.Sesiones) y close() la devuelve.
+    debug: imprime cada comando enviado (los tiempos quedan siempre en Metricas.METRICAS).
+    ix_actual: corriente primaria encendida según los comandos enviados (I/l/j); None si está
+    apagada o no se sabe (después de standby, de un error del puente o al abrir).
     """
 
     # Mapeo parcial de errores (ver Apéndice A4). Completar según necesidad.
@@ -40,13 +193,19 @@ class MI60100:
         25: "ERROR UNKNOWN",
     }
 
-    def __init__(self, gpib_address, visa_backendspec=None, timeout_ms=20000):
-        self.rm = pyvisa.ResourceManager(visa_backendspec) if visa_backendspec else pyvisa.ResourceManager()
+    # El 60100 acepta comandos concatenados sin separador (p.ej. "M1R"). Los valores con
+    # exponente van solos: la 'e' se confundiría con el comando de calibración.
+    REGLA_LOTE = ReglaLote(separador="", largo_max=64,
+                           puede_unirse=lambda cmd: not re.search(r"\d[eE]", cmd))
+
+    def __init__(self, gpib_address, visa_backendspec=None, timeout_ms=20000, rm=None, debug=False):
+        self.debug = debug
+        self.rm = rm if rm is not None else Sesiones.obtener_rm(visa_backendspec)
         if isinstance(gpib_address, int):
             self.resource_name = f'GPIB0::{gpib_address}::INSTR'
         else:
             self.resource_name = gpib_address
-        self.instr = self.rm.open_resource(self.resource_name)
+        self.instr, _ = Sesiones.abrir(self.resource_name, rm=self.rm)
         self.instr.timeout = int(timeout_ms)  # ms
         # Termination: manual reports in manual appear to be ASCII text (use default)
         # A menudo los dispositivos GPIB usan '\n' terminador; si hace falta, ajustar.
@@ -55,6 +214,12 @@ class MI60100:
         #self.instr.read_termination = '\n'
         #self.instr.write_termination = '\n'
         #print(f"DEBUG: Write termination set to: '{self.instr.write_termination}'") # ¡Añade esta línea!
+        # Acceso al bus serializado: el modo asíncrono lee desde otro hilo
+        self._lock = threading.RLock()
+        self._ejecutor = None
+        self.ix_actual = None
+        # Último comando escrito: los errores Ecnn se cuentan a su nombre en METRICAS
+        self._ultimo_comando = None
 
     # ---------------------
     # Low level helpers
@@ -63,27 +228,48 @@ class MI60100:
     def _write(self, cmd: str):
         if not cmd.endswith("\r\n"):
             cmd = cmd + "\r\n"
-        print(f"[DEBUG] Enviando: {repr(cmd)}")
-        self.instr.write_raw(cmd.encode())  # fuerza bytes con CRLF
+        if self.debug:
+            print(f"[DEBUG] Enviando: {repr(cmd)}")
+        with self._lock:
+            self.instr.write_raw(cmd.encode())  # fuerza bytes con CRLF
+            self._ultimo_comando = clave_comando(cmd)
+            self._seguir_corriente(cmd)
+
+    def _seguir_corriente(self, cmd):
+        # Standby ('s') apaga Ix: la próxima medición tiene que volver a mandarla
+        for letra, valor in _TOKEN_COMANDO.findall(cmd):
+            if letra in "lIj" and valor:
+                self.ix_actual = float(valor)
+            elif letra == "s":
+                self.ix_actual = None
     """
     def _write(self, cmd: str):
         print(f"[DEBUG] Enviando: {repr(cmd)}")
         self.instr.write(cmd)
     """
     def _read(self, timeout_s=None):
-        resp = self.instr.read().strip()
+        with self._lock:
+            resp = self.instr.read().strip()
         # Si no termina con terminador esperado, añadirlo virtualmente
         if self.instr.read_termination and not resp.endswith(self.instr.read_termination.strip()):
             resp += self.instr.read_termination.strip()
-        if resp.startswith('E') and len(resp) >= 2:
-            m = re.search(r'E(.)(\d{1,2})', resp)
-            if m:
-                code = int(m.group(2))
-                raise MI60100Error(code, self.ERROR_LOOKUP.get(code, "Unknown"))
-            else:
-                raise MI60100Error(None, f"Unknown error format: {resp}")
+        es_error, code = codigo_error(resp)
+        if es_error:
+            self._lanzar_error(code, resp)
         return resp
 
+    def _lanzar_error(self, code, resp):
+        # Tras un error no se sabe si la corriente quedó encendida
+        self.ix_actual = None
+        METRICAS.registrar_error(self.resource_name, code, self._ultimo_comando)
+        if code is None:
+            raise MI60100Error(None, f"Unknown error format: {resp}")
+        raise MI60100Error(code, self.ERROR_LOOKUP.get(code, "Unknown"))
+
+    def lote(self):
+        """Agrupa comandos en la menor cantidad de escrituras (ver Instrumental.Lotes)."""
+        return Lote(self._write, self.REGLA_LOTE)
+
     def _query(self, cmd: str, read=True):
         """Escribe y lee (si read=True) — combina write+read."""
         self._write(cmd)
@@ -114,7 +300,30 @@ class MI60100:
         # El manual indica que el dispositivo responde con 3 caracteres, e.g. 'RSq' (R S q).
         self._write('Q')
         return self._read()
-    
+
+    def esperar_listo(self, timeout_s=10.0, intervalo_ms=500):
+        """
+        Espera a que el puente haya procesado los comandos enviados antes.
+        El 60100 atiende los comandos en orden, así que la respuesta a Q funciona como
+        barrera: en cuanto contesta, lo anterior ya fue aceptado. Reemplaza a las pausas
+        fijas entre comandos. No usar con reportes de medición pendientes de leer.
+        Devuelve la cadena de estado; lanza VisaIOError si no contesta en timeout_s.
+        """
+        limite = time.monotonic() + timeout_s
+        original_timeout = self.instr.timeout
+        self.instr.timeout = intervalo_ms
+        try:
+            # Q se escribe una sola vez: reenviarlo dejaría respuestas 'RSq' de más en el
+            # buffer de salida, que después se leerían en lugar de un reporte
+            self._write('Q')
+            while True:
+                try:
+                    return self._read()
+                except pyvisa.errors.VisaIOError:
+                    if time.monotonic() >= limite:
+                        raise
+        finally:
+            self.instr.timeout = original_timeout
 
     def set_primary_current(self, value):
         """
@@ -225,7 +434,81 @@ class MI60100:
         puede ser necesario hacer serial poll/handle SRQ en el controlador.
         """
         return self._read()
-    
+
+    def leer_reportes(self, n, decodificador=None):
+        """
+        Generador que lee del bus los próximos `n` reportes y los entrega como Reporte
+        a medida que se completan (p.ej. tras set_num_measurements(n) + 'R').
+        Lee bytes crudos y los pasa por un DecodificadorReportes. Por defecto no se
+        guardan columnas (n puede ser solo un tope muy grande); para tenerlas al final en
+        decodificador.columnas() pasar un DecodificadorReportes(acumular=True).
+        Un mensaje Ecnn corta la lectura con MI60100Error.
+        """
+        if decodificador is None:
+            decodificador = DecodificadorReportes(acumular=False)
+        entregados = 0
+        while entregados < n:
+            with self._lock:
+                datos = self.instr.read_raw()
+            for reporte in decodificador.alimentar(datos):
+                if reporte.error:
+                    self._lanzar_error(reporte.codigo, reporte.crudo)
+                yield reporte
+                entregados += 1
+                if entregados == n:
+                    break
+
+    def reporte_unico(self):
+        """Como single_measurement() pero devuelve el reporte decodificado (Reporte)."""
+        return decodificar_reporte(self.single_measurement())
+
+    def esperar_srq(self, timeout_s=None, intervalo_s=0.05):
+        """
+        Bloquea (sin ocupar el bus) hasta que el 60100 pide servicio (SRQ) con un reporte listo.
+        Usa wait_for_srq del recurso si existe; si no, hace serial poll del byte de estado
+        (bit 6, RQS) cada intervalo_s. timeout_s=None usa el timeout del instrumento.
+        """
+        if timeout_s is None:
+            timeout_s = self.instr.timeout / 1000.0
+        if hasattr(self.instr, "wait_for_srq"):
+            self.instr.wait_for_srq(int(timeout_s * 1000))
+            return
+        limite = time.monotonic() + timeout_s
+        while True:
+            with self._lock:
+                stb = self.instr.read_stb()
+            if stb & 0x40:
+                return
+            if time.monotonic() >= limite:
+                raise pyvisa.errors.VisaIOError(pyvisa.constants.StatusCode.error_timeout)
+            time.sleep(intervalo_s)
+
+    def read_report_async(self, callback=None, timeout_s=None):
+        """
+        Versión por eventos de read_report: devuelve un concurrent.futures.Future que se
+        completa con el reporte (o con la excepción, p.ej. MI60100Error) cuando el puente
+        hace SRQ. callback(reporte) se llama desde el hilo del driver al llegar el reporte
+        (no se llama si el futuro se cancela o termina con excepción).
+        Mientras tanto el hilo llamador queda libre para atender otros instrumentos.
+        """
+        if self._ejecutor is None:
+            self._ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="MI60100")
+
+        def tarea():
+            self.esperar_srq(timeout_s)
+            return self.read_report()
+
+        futuro = self._ejecutor.submit(tarea)
+        if callback is not None:
+            futuro.add_done_callback(
+                lambda f: not f.cancelled() and f.exception() is None and callback(f.result()))
+        return futuro
+
+    def single_measurement_async(self, callback=None, timeout_s=None):
+        """Dispara M1R y devuelve un Future con el reporte (ver read_report_async)."""
+        self._write("M1R")
+        return self.read_report_async(callback, timeout_s)
+
     # ---------------------
     # Método de reinicio
     # ---------------------
@@ -243,8 +526,8 @@ class MI60100:
             # 1. Poner en STANDBY [7, A1]
             print("Enviando comando 'standby'...")
             self.standby()
-            # Una pequeña pausa puede ser útil para que el instrumento procese el comando [conversación anterior]
-            time.sleep(0.1) 
+            # Esperar a que el instrumento procese el comando antes de limpiar el búfer
+            self.esperar_listo()
 
             # 2. Intentar limpiar cualquier mensaje de error o reporte pendiente
             # Se usa un timeout más corto para esta operación de limpieza.
@@ -301,11 +584,10 @@ class MI60100:
     # Cierre
     # ---------------------
     def close(self):
+        if self._ejecutor is not None:
+            self._ejecutor.shutdown(wait=False, cancel_futures=True)
+            self._ejecutor = None
         try:
-            self.instr.close()
-        except Exception:
-            pass
-        try:
-            self.rm.close()
+            Sesiones.liberar(self.resource_name, rm=self.rm)
         except Exception:
             pass
@@ -0,0 +1,225 @@
+"""
+Instrumentación del transporte VISA: latencia por comando, bytes, timeouts y errores.
+
+Sesiones.abrir() envuelve cada sesión en un RecursoInstrumentado que registra en
+METRICAS (global del proceso) cada write/read/query. El costo es un par de
+perf_counter y un incremento de histograma por transacción, así que queda siempre
+activo; se apaga con METRICAS.habilitado = False antes de abrir los instrumentos.
+
+    print(METRICAS.resumen())
+    METRICAS.exportar_json("metricas.json")
+"""
+import re
+import csv
+import json
+import time
+import bisect
+import threading
+
+# Bordes del histograma: 1 µs a 100 s, 4 cubetas por década
+_BORDES = [1e-6 * 10 ** (k / 4) for k in range(33)]
+_NUMERO = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+
+
+def clave_comando(cmd):
+    """Agrupa comandos que solo difieren en sus valores: 'r1.0001' -> 'r#', 'DCV 10,1E-5' -> 'DCV'."""
+    if isinstance(cmd, bytes):
+        cmd = cmd.decode(errors="replace")
+    cmd = cmd.strip()
+    if " " in cmd and not cmd.startswith(("*", ":")) and ";" not in cmd:
+        cmd = cmd.split(None, 1)[0]
+    return _NUMERO.sub("#", cmd)[:32] or "?"
+
+
+class Histograma:
+    def __init__(self):
+        self.cubetas = [0] * (len(_BORDES) + 1)
+        self.n = 0
+        self.suma = 0.0
+        self.minimo = float("inf")
+        self.maximo = 0.0
+
+    def agregar(self, valor):
+        self.cubetas[bisect.bisect_left(_BORDES, valor)] += 1
+        self.n += 1
+        self.suma += valor
+        if valor < self.minimo:
+            self.minimo = valor
+        if valor > self.maximo:
+            self.maximo = valor
+
+    def percentil(self, p):
+        """Percentil aproximado (borde superior de la cubeta que lo contiene)."""
+        if not self.n:
+            return 0.0
+        objetivo = p / 100.0 * self.n
+        acumulado = 0
+        for i, cuenta in enumerate(self.cubetas):
+            acumulado += cuenta
+            if acumulado >= objetivo:
+                return min(_BORDES[i] if i < len(_BORDES) else self.maximo, self.maximo)
+        return self.maximo
+
+    def a_dict(self):
+        return {
+            "n": self.n,
+            "total_s": self.suma,
+            "media_s": self.suma / self.n if self.n else 0.0,
+            "min_s": self.minimo if self.n else 0.0,
+            "p50_s": self.percentil(50),
+            "p95_s": self.percentil(95),
+            "max_s": self.maximo,
+        }
+
+
+class EstadisticasComando:
+    def __init__(self):
+        self.latencia = Histograma()
+        self.bytes_enviados = 0
+        self.bytes_recibidos = 0
+        self.timeouts = 0
+        self.errores = 0
+
+    def a_dict(self):
+        d = self.latencia.a_dict()
+        d.update(bytes_enviados=self.bytes_enviados, bytes_recibidos=self.bytes_recibidos,
+                 timeouts=self.timeouts, errores=self.errores)
+        return d
+
+
+class Metricas:
+    def __init__(self):
+        self.habilitado = True
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self.por_recurso = {}           # recurso -> {clave comando -> EstadisticasComando}
+            self.errores_instrumento = {}   # recurso -> {código -> cantidad}
+            self.t_inicio = time.time()
+
+    def _estadisticas(self, recurso, comando):
+        comandos = self.por_recurso.setdefault(recurso, {})
+        est = comandos.get(comando)
+        if est is None:
+            est = comandos[comando] = EstadisticasComando()
+        return est
+
+    def registrar(self, recurso, comando, duracion, bytes_enviados=0, bytes_recibidos=0, timeout=False):
+        with self._lock:
+            est = self._estadisticas(recurso, comando)
+            est.latencia.agregar(duracion)
+            est.bytes_enviados += bytes_enviados
+            est.bytes_recibidos += bytes_recibidos
+            est.timeouts += bool(timeout)
+
+    def registrar_error(self, recurso, codigo, comando=None):
+        """Error informado por el instrumento (p.ej. código Ecnn del 60100)."""
+        with self._lock:
+            errores = self.errores_instrumento.setdefault(recurso, {})
+            errores[codigo] = errores.get(codigo, 0) + 1
+            if comando is not None:
+                self._estadisticas(recurso, comando).errores += 1
+
+    def a_dict(self):
+        with self._lock:
+            return {
+                "duracion_s": time.time() - self.t_inicio,
+                "recursos": {
+                    recurso: {cmd: est.a_dict() for cmd, est in comandos.items()}
+                    for recurso, comandos in self.por_recurso.items()
+                },
+                "errores_instrumento": {r: {str(c): n for c, n in e.items()}
+                                        for r, e in self.errores_instrumento.items()},
+            }
+
+    def resumen(self):
+        """Tabla de texto con el tiempo de bus por recurso y comando, ordenada por tiempo total."""
+        datos = self.a_dict()
+        lineas = [f"=== Métricas de transporte ({datos['duracion_s']:.1f} s de corrida) ==="]
+        for recurso, comandos in datos["recursos"].items():
+            total = sum(c["total_s"] for c in comandos.values())
+            lineas.append(f"{recurso}: {total:.3f} s en el bus")
+            lineas.append(f"  {'comando':<24}{'n':>7}{'total s':>10}{'p50 ms':>9}{'p95 ms':>9}"
+                          f"{'max ms':>9}{'B out':>9}{'B in':>10}{'tmo':>5}{'err':>5}")
+            for cmd, c in sorted(comandos.items(), key=lambda kv: -kv[1]["total_s"]):
+                lineas.append(f"  {cmd:<24}{c['n']:>7}{c['total_s']:>10.3f}{c['p50_s'] * 1e3:>9.2f}"
+                              f"{c['p95_s'] * 1e3:>9.2f}{c['max_s'] * 1e3:>9.2f}{c['bytes_enviados']:>9}"
+                              f"{c['bytes_recibidos']:>10}{c['timeouts']:>5}{c['errores']:>5}")
+        for recurso, errores in datos["errores_instrumento"].items():
+            lineas.append(f"{recurso}: errores del instrumento {errores}")
+        return "\n".join(lineas)
+
+    def exportar_json(self, ruta):
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(self.a_dict(), f, indent=2)
+
+    def exportar_csv(self, ruta):
+        datos = self.a_dict()["recursos"]
+        campos = ["recurso", "comando", "n", "total_s", "media_s", "min_s", "p50_s", "p95_s", "max_s",
+                  "bytes_enviados", "bytes_recibidos", "timeouts", "errores"]
+        with open(ruta, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=campos)
+            writer.writeheader()
+            for recurso, comandos in datos.items():
+                for cmd, c in comandos.items():
+                    writer.writerow({"recurso": recurso, "comando": cmd, **c})
+
+
+METRICAS = Metricas()
+
+
+def _es_timeout(e):
+    import pyvisa
+    return isinstance(e, pyvisa.errors.VisaIOError) and e.error_code == pyvisa.constants.StatusCode.error_timeout
+
+
+class RecursoInstrumentado:
+    """
+    Envuelve un recurso VISA y mide cada transacción. El resto de los atributos
+    (timeout, terminaciones, clear, close...) se delegan tal cual al recurso.
+    Las lecturas se registran con la clave del último comando escrito ('M#R <'),
+    así el tiempo de espera del reporte queda asociado al comando que lo pidió.
+    """
+
+    _ESCRITURAS = ("write", "write_raw")
+    _LECTURAS = ("read", "read_raw", "read_bytes", "read_stb", "wait_for_srq")
+
+    def __init__(self, recurso, nombre=None, metricas=None):
+        object.__setattr__(self, "_recurso", recurso)
+        object.__setattr__(self, "_nombre", nombre or getattr(recurso, "resource_name", "?"))
+        object.__setattr__(self, "_metricas", metricas or METRICAS)
+        object.__setattr__(self, "_ultimo", "?")
+
+    def __getattr__(self, nombre):
+        atributo = getattr(self._recurso, nombre)
+        if nombre in self._ESCRITURAS:
+            return lambda mensaje, *a, **k: self._medir(atributo, nombre, mensaje, a, k)
+        if nombre in self._LECTURAS or nombre == "query":
+            return lambda *a, **k: self._medir(atributo, nombre, None, a, k)
+        return atributo
+
+    def __setattr__(self, nombre, valor):
+        setattr(self._recurso, nombre, valor)
+
+    def _medir(self, funcion, nombre, mensaje, args, kwargs):
+        if nombre in self._ESCRITURAS or nombre == "query":
+            texto = mensaje if mensaje is not None else args[0]
+            clave = clave_comando(texto)
+            object.__setattr__(self, "_ultimo", clave)
+            enviados = len(texto)
+        else:
+            clave = "SRQ" if nombre == "wait_for_srq" else "STB" if nombre == "read_stb" else f"{self._ultimo} <"
+            enviados = 0
+        llamada = (mensaje,) + args if mensaje is not None else args
+        t0 = time.perf_counter()
+        try:
+            resultado = funcion(*llamada, **kwargs)
+        except Exception as e:
+            self._metricas.registrar(self._nombre, clave, time.perf_counter() - t0, enviados, 0,
+                                     timeout=_es_timeout(e))
+            raise
+        recibidos = len(resultado) if isinstance(resultado, (str, bytes)) and nombre not in self._ESCRITURAS else 0
+        self._metricas.registrar(self._nombre, clave, time.perf_counter() - t0, enviados, recibidos)
+        return resultado
@@ -1,5 +1,6 @@
 import time
-import pyvisa
+from . import Sesiones
+from .Lotes import Lote, ReglaLote
 
 class ScannerInti:
     # Constantes del instrumento
@@ -9,22 +10,41 @@ class ScannerInti:
     NADA = 63
     RESET_TODO = 112
 
+    # Cada comando termina en 'X' y la placa los ejecuta en orden: se pueden concatenar
+    REGLA_LOTE = ReglaLote(separador="", largo_max=64)
+
+    # Tiempos de asentamiento de los relés (s), configurables por constructor
+    TIEMPO_CAMBIO_ESTADO = 0.01
+    TIEMPO_RESET = 0.02
+    TIEMPO_SETEO = 0.04
+
     DireccionGPIB = None  # Será el recurso VISA
 
-    def __init__(self):
-        # Inicializa conexión con PyVISA
-        self.rm = pyvisa.ResourceManager()
+    def __init__(self, rm=None, direccion=None, tiempo_reset=None, tiempo_seteo=None, tiempo_cambio_estado=None):
+        # Inicializa conexión con PyVISA (rm permite usar un ResourceManager simulado)
+        self.rm = rm if rm is not None else Sesiones.obtener_rm()
+        if direccion is not None:
+            self.ADDRESS_GPIB = direccion
+        if tiempo_reset is not None:
+            self.TIEMPO_RESET = tiempo_reset
+        if tiempo_seteo is not None:
+            self.TIEMPO_SETEO = tiempo_seteo
+        if tiempo_cambio_estado is not None:
+            self.TIEMPO_CAMBIO_ESTADO = tiempo_cambio_estado
+        # Espejo en memoria del canal cerrado en cada salida (None = ninguno)
+        self.estado = {self.SALIDA_1: None, self.SALIDA_2: None}
         try:
-            ScannerInti.DireccionGPIB = self.rm.open_resource(self.ADDRESS_GPIB)
+            ScannerInti.DireccionGPIB, _ = Sesiones.abrir(self.ADDRESS_GPIB, rm=self.rm)
             ScannerInti.DireccionGPIB.timeout = 1000  # Timeout en ms
             print(f"Conectado a {self.ADDRESS_GPIB}")
             self.Configuracion(ScannerInti.DireccionGPIB)
+            self.Sincronizar(ScannerInti.DireccionGPIB)
         except Exception as e:
             raise RuntimeError(f"No se pudo conectar al instrumento: {e}")
 
     def __del__(self):
         if ScannerInti.DireccionGPIB is not None:
-            ScannerInti.DireccionGPIB.close()
+            Sesiones.liberar(self.ADDRESS_GPIB, rm=self.rm)
             print("Conexión cerrada")
 
     # ---------------------------------------------------
@@ -34,6 +54,9 @@ class ScannerInti:
         cmd = command % args if args else command
         handle.write(cmd)
 
+    def lote(self, handle):
+        return Lote(lambda cmd: self._iprintf(handle, cmd + "\n"), self.REGLA_LOTE)
+
     def _iscanf(self, handle, fmt=None):
         # fmt no se usa porque VISA maneja strings directamente
         return handle.read().strip()
@@ -55,8 +78,10 @@ class ScannerInti:
         return 0
 
     def EnviarDato(self, direccion, dato):
-        self._iprintf(direccion, "P1X\n")
-        self._iprintf(direccion, f"D{dato}ZX\n")
+        # P1X y D..ZX en una sola escritura
+        with self.lote(direccion) as lote:
+            lote.write("P1X")
+            lote.write(f"D{dato}ZX")
         return 0
 
     def ResetPlacaGpib(self, direccion):
@@ -66,11 +91,12 @@ class ScannerInti:
 
     def ResetGeneral(self, direccion):
         self.EnviarDato(direccion, self.RESET_TODO)
+        self.estado = {self.SALIDA_1: None, self.SALIDA_2: None}
         return 0
 
     def CambiarEstado(self, direccion):
         self._iprintf(direccion, "A9X\n")
-        time.sleep(0.01)
+        time.sleep(self.TIEMPO_CAMBIO_ESTADO)
         self._iprintf(direccion, "B9X\n")
         return 0
 
@@ -102,21 +128,40 @@ class ScannerInti:
             dato = "0"
         return int(dato)
 
-    def InvertirCanal(self, direccion):
-        temporal1 = self.Ver(direccion, self.SALIDA_1)
-        temporal2 = self.Ver(direccion, self.SALIDA_2)
-        if temporal1 != self.NADA and temporal2 != self.NADA:
-            temporal2 -= 24
-            self.ResetCanal(direccion, self.SALIDA_1, temporal1 + 1)
-            time.sleep(0.02)
-            self.SetearCanal(direccion, self.SALIDA_2, temporal1 + 1)
-            time.sleep(0.04)
-            self.SetearCanal(direccion, self.SALIDA_1, temporal2 + 1)
+    def Estado(self, salida):
+        """Canal cerrado en la salida según el espejo en memoria (None = ninguno), sin consultar al instrumento."""
+        return self.estado.get(salida)
+
+    def Sincronizar(self, direccion):
+        """Lee las dos salidas del instrumento (P3X/P4X) y actualiza el espejo."""
+        for salida in (self.SALIDA_1, self.SALIDA_2):
+            dato = self.Ver(direccion, salida)
+            self.estado[salida] = None if dato == self.NADA else self.Codificacion(salida, dato)
+        return dict(self.estado)
+
+    def Verificar(self, direccion):
+        """Compara el espejo con el instrumento. Devuelve True si coinciden (y resincroniza si no)."""
+        esperado = dict(self.estado)
+        return self.Sincronizar(direccion) == esperado
+
+    def InvertirCanal(self, direccion, verificar=False):
+        # Usa el espejo en memoria en lugar de consultar P3X/P4X en cada inversión
+        if verificar:
+            self.Verificar(direccion)
+        canal_s = self.estado[self.SALIDA_1]
+        canal_x = self.estado[self.SALIDA_2]
+        if canal_s is not None and canal_x is not None:
+            self.ResetCanal(direccion, self.SALIDA_1, canal_s)
+            time.sleep(self.TIEMPO_RESET)
+            self.SetearCanal(direccion, self.SALIDA_2, canal_s)
+            time.sleep(self.TIEMPO_SETEO)
+            self.SetearCanal(direccion, self.SALIDA_1, canal_x)
 
     def SetearCanal(self, direccion, puerto, entrada):
         datoaescribir = self.Decodificacion(puerto, entrada)
         if datoaescribir != 0:
             self.EnviarDato(direccion, datoaescribir)
+            self.estado[puerto] = entrada
         return 0
 
     def ResetCanal(self, direccion, puerto, entrada):
@@ -124,4 +169,73 @@ class ScannerInti:
         if datoaescribir != 0:
             datoaescribir += 64
             self.EnviarDato(direccion, datoaescribir)
-        return 0
\ No newline at end of file
+            if self.estado.get(puerto) == entrada:
+                self.estado[puerto] = None
+        return 0
+
+    # ---------------------------------------------------
+    # Planificación de barridos
+    # ---------------------------------------------------
+    @staticmethod
+    def CostoTransicion(desde, hasta):
+        """Operaciones de relé para pasar del par (s, x) `desde` al par `hasta`."""
+        costo = 0
+        for actual, nuevo in zip(desde, hasta):
+            if actual != nuevo:
+                costo += (actual is not None) + (nuevo is not None)
+        return costo
+
+    def PlanificarBarrido(self, pares, inicial=None):
+        """
+        Ordena la lista de pares (canal_s, canal_x) para minimizar las operaciones de relé
+        partiendo del estado actual (o de `inicial`). Vecino más cercano: en cada paso toma
+        el par pendiente más barato; ante empate conserva el orden original.
+        """
+        actual = inicial if inicial is not None else (self.estado[self.SALIDA_1], self.estado[self.SALIDA_2])
+        pendientes = list(pares)
+        plan = []
+        while pendientes:
+            i = min(range(len(pendientes)), key=lambda k: self.CostoTransicion(actual, pendientes[k]))
+            actual = pendientes.pop(i)
+            plan.append(actual)
+        return plan
+
+    def MoverA(self, direccion, canal_s, canal_x):
+        """
+        Lleva las salidas al par (canal_s, canal_x) tocando solo los relés que cambian.
+        Primero abre todo lo que sale (y espera TIEMPO_RESET) y después cierra lo nuevo
+        (y espera TIEMPO_SETEO), para no conectar un resistor a las dos salidas a la vez.
+        Devuelve la cantidad de operaciones de relé.
+        """
+        objetivo = {self.SALIDA_1: canal_s, self.SALIDA_2: canal_x}
+        cambios = [s for s in objetivo if self.estado[s] != objetivo[s]]
+        operaciones = 0
+        aperturas = [s for s in cambios if self.estado[s] is not None]
+        for salida in aperturas:
+            self.ResetCanal(direccion, salida, self.estado[salida])
+            operaciones += 1
+        if aperturas:
+            time.sleep(self.TIEMPO_RESET)
+        cierres = [s for s in cambios if objetivo[s] is not None]
+        for salida in cierres:
+            self.SetearCanal(direccion, salida, objetivo[salida])
+            operaciones += 1
+        if cierres:
+            time.sleep(self.TIEMPO_SETEO)
+        return operaciones
+
+    def EjecutarBarrido(self, direccion, pares, medir=None, planificar=True, verificar=False):
+        """
+        Recorre los pares (canal_s, canal_x), en el orden planificado si planificar=True.
+        medir(canal_s, canal_x) se llama en cada posición; devuelve [(par, resultado)].
+        Con verificar=True se compara el espejo con el instrumento en cada paso.
+        """
+        plan = self.PlanificarBarrido(pares) if planificar else list(pares)
+        resultados = []
+        for canal_s, canal_x in plan:
+            self.MoverA(direccion, canal_s, canal_x)
+            if verificar and not self.Verificar(direccion):
+                raise RuntimeError(f"El scanner no quedó en el estado esperado ({canal_s}, {canal_x}).")
+            resultado = medir(canal_s, canal_x) if medir is not None else None
+            resultados.append(((canal_s, canal_x), resultado))
+        return resultados
\ No newline at end of file
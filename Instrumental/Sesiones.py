@@ -0,0 +1,118 @@
+"""
+Pool de sesiones VISA compartido por todos los drivers del proceso.
+
+Un único ResourceManager por backend y una sola sesión abierta por resource string.
+Los drivers piden la sesión con abrir() y la devuelven con liberar(); la sesión queda
+abierta (y el instrumento configurado) para el próximo driver que la pida, hasta
+cerrar_todo(), que se ejecuta automáticamente al salir del proceso.
+Cada sesión se entrega envuelta en Metricas.RecursoInstrumentado mientras
+METRICAS.habilitado sea True.
+"""
+import atexit
+import threading
+from .Metricas import METRICAS, RecursoInstrumentado
+
+_lock = threading.RLock()
+_rms = {}        # backend -> ResourceManager
+_sesiones = {}   # (id(rm), resource_name) -> _Sesion
+_rm_por_defecto = None
+
+
+class _Sesion:
+    def __init__(self, rm, recurso):
+        self.rm = rm
+        self.recurso = recurso
+        self.usos = 0
+
+
+def configurar(rm):
+    """Usa `rm` (p.ej. ResourceManagerSimulado) como ResourceManager por defecto del proceso."""
+    global _rm_por_defecto
+    with _lock:
+        _rm_por_defecto = rm
+
+
+def obtener_rm(visa_backendspec=None):
+    """ResourceManager compartido (se crea una sola vez por backend)."""
+    with _lock:
+        if visa_backendspec is None and _rm_por_defecto is not None:
+            return _rm_por_defecto
+        if visa_backendspec not in _rms:
+            # pyvisa se importa recién al conectar el primer instrumento real
+            import pyvisa
+            _rms[visa_backendspec] = (pyvisa.ResourceManager(visa_backendspec) if visa_backendspec
+                                      else pyvisa.ResourceManager())
+        return _rms[visa_backendspec]
+
+
+def abrir(resource_name, rm=None, visa_backendspec=None):
+    """
+    Devuelve (recurso, nueva). Reutiliza la sesión abierta si existe; `nueva` es True
+    solo la primera vez, para que el driver haga el reset/configuración inicial una vez.
+    """
+    with _lock:
+        rm = rm if rm is not None else obtener_rm(visa_backendspec)
+        clave = (id(rm), resource_name)
+        sesion = _sesiones.get(clave)
+        nueva = sesion is None
+        if nueva:
+            recurso = rm.open_resource(resource_name)
+            if METRICAS.habilitado:
+                recurso = RecursoInstrumentado(recurso, resource_name)
+            sesion = _sesiones[clave] = _Sesion(rm, recurso)
+        sesion.usos += 1
+        return sesion.recurso, nueva
+
+
+def liberar(resource_name, rm=None, cerrar=False, visa_backendspec=None):
+    """Devuelve la sesión al pool. Con cerrar=True la cierra si nadie más la usa."""
+    with _lock:
+        rm = rm if rm is not None else obtener_rm(visa_backendspec)
+        clave = (id(rm), resource_name)
+        sesion = _sesiones.get(clave)
+        if sesion is None:
+            return
+        sesion.usos = max(sesion.usos - 1, 0)
+        if cerrar and sesion.usos == 0:
+            del _sesiones[clave]
+            sesion.recurso.close()
+
+
+def descartar(resource_name, rm=None, visa_backendspec=None):
+    """Cierra la sesión aunque esté en uso (p.ej. tras un error de bus irrecuperable)."""
+    with _lock:
+        rm = rm if rm is not None else obtener_rm(visa_backendspec)
+        sesion = _sesiones.pop((id(rm), resource_name), None)
+        if sesion is not None:
+            try:
+                sesion.recurso.close()
+            except Exception:
+                pass
+
+
+def sesiones_abiertas():
+    """Resource strings con sesión abierta y cantidad de drivers que las usan."""
+    with _lock:
+        return {nombre: s.usos for (_, nombre), s in _sesiones.items()}
+
+
+def cerrar_todo():
+    """Cierra todas las sesiones y los ResourceManager creados por el pool."""
+    global _rm_por_defecto
+    with _lock:
+        for sesion in _sesiones.values():
+            try:
+                sesion.recurso.close()
+            except Exception:
+                pass
+        _sesiones.clear()
+        for rm in _rms.values():
+            try:
+                rm.close()
+            except Exception:
+                pass
+        _rms.clear()
+        _rm_por_defecto = None
+
+
+atexit.register(cerrar_todo)
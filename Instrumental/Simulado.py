@@ -0,0 +1,730 @@
+import re
+import time
+import bisect
+import random
+import threading
+
+import numpy as np
+import pyvisa
+
+
+def _error_timeout():
+    return pyvisa.errors.VisaIOError(pyvisa.constants.StatusCode.error_timeout)
+
+
+class _Mensaje:
+    """Respuesta de texto (o bloque binario) que queda disponible completa en t_listo."""
+    def __init__(self, t_listo, datos: bytes):
+        self.t_listo = t_listo
+        self.datos = datos
+        self.pos = 0
+
+    def disponibles(self, ahora):
+        return len(self.datos) - self.pos if ahora >= self.t_listo else 0
+
+    def proximo(self, ahora):
+        return self.t_listo if ahora < self.t_listo else None
+
+    def agotado(self):
+        return self.pos >= len(self.datos)
+
+
+class _Flujo(_Mensaje):
+    """Bloque binario que se va generando de a una muestra cada dt (p.ej. un SWEEP en FIFO)."""
+    def __init__(self, t0, dt, datos: bytes, tam_muestra=2):
+        super().__init__(t0 + dt, datos)
+        self.t0 = t0
+        self.dt = dt
+        self.tam_muestra = tam_muestra
+
+    def disponibles(self, ahora):
+        if ahora < self.t_listo:
+            return 0
+        generadas = int((ahora - self.t0) / self.dt) * self.tam_muestra
+        return min(len(self.datos), generadas) - self.pos
+
+    def proximo(self, ahora):
+        if self.agotado():
+            return None
+        k = int((ahora - self.t0) / self.dt) + 1
+        return self.t0 + k * self.dt
+
+
+class InstrumentoSimulado:
+    """
+    Recurso VISA simulado. Imita la interfaz de un recurso de pyvisa (write, write_raw,
+    read, read_raw, read_bytes, query, read_stb, wait_for_srq, clear, close) sobre un
+    modelo del instrumento con tiempos realistas.
+
+    latencia: tiempo fijo por transacción GPIB (s).
+    tiempo_por_byte: tiempo de bus por byte transferido (s).
+    ruido: desviación estándar del ruido de la lectura (unidades propias de cada modelo).
+    escala_tiempo: factor aplicado a todas las demoras (1.0 = tiempo real, 0.01 = 100x más rápido).
+    """
+
+    IDENTIFICACION = "SIMULADO"
+
+    def __init__(self, nombre, latencia=0.002, tiempo_por_byte=2e-6, ruido=0.0,
+                 escala_tiempo=1.0, semilla=None):
+        self.resource_name = nombre
+        self.latencia = latencia
+        self.tiempo_por_byte = tiempo_por_byte
+        self.ruido = ruido
+        self.escala_tiempo = escala_tiempo
+        self.timeout = 2000
+        self.read_termination = '\n'
+        self.write_termination = '\n'
+        self.abierto = True
+        self.srq_habilitado = True
+        self.comandos_recibidos = 0
+        self._rnd = random.Random(semilla)
+        self._cond = threading.Condition()
+        self._salida = []  # _Mensaje ordenados por t_listo
+
+    # ---------------------
+    # Tiempo simulado
+    # ---------------------
+    def _ahora(self):
+        return time.monotonic()
+
+    def _en(self, segundos):
+        """Instante (reloj monotónico) dentro de `segundos` de tiempo de instrumento."""
+        return self._ahora() + segundos * self.escala_tiempo
+
+    def _dormir(self, segundos):
+        if segundos > 0 and self.escala_tiempo > 0:
+            time.sleep(segundos * self.escala_tiempo)
+
+    def _transaccion(self, n_bytes):
+        self._dormir(self.latencia + n_bytes * self.tiempo_por_byte)
+
+    def _gauss(self, sigma=None):
+        sigma = self.ruido if sigma is None else sigma
+        return self._rnd.gauss(0.0, sigma) if sigma else 0.0
+
+    # ---------------------
+    # Cola de salida
+    # ---------------------
+    def _encolar(self, mensaje: _Mensaje):
+        with self._cond:
+            claves = [m.t_listo for m in self._salida]
+            self._salida.insert(bisect.bisect_right(claves, mensaje.t_listo), mensaje)
+            self._cond.notify_all()
+
+    def _responder(self, texto, demora=0.0, t_listo=None):
+        """Encola una respuesta de texto (con terminador) disponible dentro de `demora` s."""
+        t = self._en(demora) if t_listo is None else t_listo
+        self._encolar(_Mensaje(t, (str(texto) + self.read_termination).encode()))
+
+    def _responder_binario(self, datos: bytes, demora=0.0, t_listo=None):
+        t = self._en(demora) if t_listo is None else t_listo
+        self._encolar(_Mensaje(t, datos))
+
+    def _descartar_salida(self, desde=None):
+        """Borra la salida pendiente (toda, o solo la que aún no estaba lista en `desde`)."""
+        with self._cond:
+            if desde is None:
+                self._salida = []
+            else:
+                self._salida = [m for m in self._salida if m.t_listo <= desde]
+
+    def _generar_salida(self):
+        """Punto para modelos que producen la salida a medida que se lee (p.ej. reportes del puente)."""
+
+    def _salida_lista(self):
+        self._generar_salida()
+        ahora = self._ahora()
+        with self._cond:
+            return any(m.disponibles(ahora) > 0 for m in self._salida[:1])
+
+    def _extraer(self, cantidad=None, terminador=None):
+        """
+        Extrae bytes de la cola de salida bloqueando hasta completar `cantidad` bytes
+        o hasta encontrar `terminador`. Si ninguno se indica, devuelve el primer mensaje.
+        """
+        limite = self._ahora() + self.timeout / 1000.0
+        datos = bytearray()
+        with self._cond:
+            while True:
+                self._generar_salida()
+                ahora = self._ahora()
+                while self._salida:
+                    m = self._salida[0]
+                    n = m.disponibles(ahora)
+                    if n <= 0:
+                        break
+                    if cantidad is not None:
+                        n = min(n, cantidad - len(datos))
+                    trozo = m.datos[m.pos:m.pos + n]
+                    if terminador:
+                        i = trozo.find(terminador)
+                        if i >= 0:
+                            trozo = trozo[:i + len(terminador)]
+                    m.pos += len(trozo)
+                    datos += trozo
+                    if m.agotado():
+                        self._salida.pop(0)
+                    if cantidad is not None and len(datos) >= cantidad:
+                        return bytes(datos)
+                    if terminador and datos.endswith(terminador):
+                        return bytes(datos)
+                    if cantidad is None and terminador is None and m.agotado():
+                        return bytes(datos)
+                    if not m.agotado():
+                        break
+                proximos = [p for p in (m.proximo(ahora) for m in self._salida[:1]) if p is not None]
+                espera = limite - ahora
+                if proximos:
+                    espera = min(espera, proximos[0] - ahora)
+                if self._ahora() >= limite:
+                    raise _error_timeout()
+                self._cond.wait(max(espera, 1e-4))
+
+    # ---------------------
+    # Interfaz tipo pyvisa
+    # ---------------------
+    def write_raw(self, message: bytes):
+        texto = message.decode(errors="replace")
+        self._transaccion(len(message))
+        self.comandos_recibidos += 1
+        self._procesar(texto.rstrip("\r\n"))
+        return len(message)
+
+    def write(self, message: str, termination=None, encoding=None):
+        term = self.write_termination if termination is None else termination
+        if term and not message.endswith(term):
+            message += term
+        return self.write_raw(message.encode())
+
+    def read_raw(self, size=None):
+        datos = self._extraer(cantidad=size)
+        self._transaccion(len(datos))
+        return datos
+
+    def read_bytes(self, count, chunk_size=None, break_on_termchar=False):
+        term = self.read_termination.encode() if break_on_termchar and self.read_termination else None
+        datos = self._extraer(cantidad=count, terminador=term)
+        self._transaccion(len(datos))
+        return datos
+
+    def read(self, termination=None, encoding=None):
+        term = self.read_termination if termination is None else termination
+        datos = self._extraer(terminador=term.encode() if term else None)
+        self._transaccion(len(datos))
+        texto = datos.decode(errors="replace")
+        if term and texto.endswith(term):
+            texto = texto[:-len(term)]
+        return texto
+
+    def query(self, message: str, delay=None):
+        self.write(message)
+        if delay:
+            time.sleep(delay)
+        return self.read()
+
+    def read_stb(self):
+        """Byte de estado: bit 4 (MAV) si hay salida lista, bit 6 (RQS) si además hay SRQ habilitado."""
+        self._transaccion(1)
+        stb = 0
+        if self._salida_lista():
+            stb |= 0x10
+            if self.srq_habilitado:
+                stb |= 0x40
+        return stb
+
+    @property
+    def stb(self):
+        return self.read_stb()
+
+    def wait_for_srq(self, timeout=25000):
+        limite = self._ahora() + (timeout / 1000.0 if timeout is not None else float("inf"))
+        with self._cond:
+            while not self._salida_lista():
+                ahora = self._ahora()
+                if ahora >= limite:
+                    raise _error_timeout()
+                proximos = [m.t_listo for m in self._salida[:1]]
+                espera = min([limite - ahora] + [p - ahora for p in proximos])
+                self._cond.wait(max(espera, 1e-4))
+
+    def clear(self):
+        self._transaccion(1)
+        self._descartar_salida()
+
+    def close(self):
+        self.abierto = False
+
+    # ---------------------
+    # Modelo del instrumento
+    # ---------------------
+    def _procesar(self, texto: str):
+        raise NotImplementedError
+
+
+class PuenteMI60100Simulado(InstrumentoSimulado):
+    """
+    Modelo del puente MI 6010D/60100. Acepta varios comandos concatenados ("M1R").
+    Cada medición dura 2*T (dos inversiones) + tiempo_conversion y emite un reporte
+    '&<relación>' (o el formato completo 'R= RS= RX= MEAN= STD= UNC=').
+
+    ruido: ruido de la relación en ppm.
+    calentamiento_ppm/tau_calentamiento: deriva exponencial inicial tras encender Ix.
+    demora_estado: demora (s) de la respuesta a Q, para simular un puente ocupado.
+    """
+
+    IDENTIFICACION = "MI 60100"
+    _TOKEN = re.compile(r"([A-Za-z])([+-]?(?:\d+\.?\d*|\.\d+)(?:[Ee][+-]?\d+)?)?")
+
+    def __init__(self, nombre="GPIB0::15::INSTR", ruido=0.05, tiempo_conversion=1.0,
+                 calentamiento_ppm=0.0, tau_calentamiento=60.0, formato_reporte="relacion", demora_estado=0.0,
+                 **kwargs):
+        super().__init__(nombre, ruido=ruido, **kwargs)
+        self.read_termination = '\r\n'
+        self.write_termination = '\r\n'
+        self.tiempo_conversion = tiempo_conversion
+        self.calentamiento_ppm = calentamiento_ppm
+        self.tau_calentamiento = tau_calentamiento
+        self.formato_reporte = formato_reporte
+        self.demora_estado = demora_estado
+        self.remoto = True
+        self.standby = True
+        self.ix = 0.0
+        self.t_ix = None
+        self.rs = 1.0
+        self.rx = 1.0
+        self.delay = 4
+        self.n_medidas = 1
+        self.n_stats = 10
+        self._relaciones = []
+        self._fin_medicion = 0.0
+        # Reportes de la medición en curso que todavía no se encolaron
+        self._restantes = 0
+        self._proximo = 0.0
+        self._ciclo = 0.0
+
+    def _error(self, code):
+        self._responder(f"E0{code:02d}")
+
+    def _midiendo(self):
+        return not self.standby and self._ahora() < self._fin_medicion
+
+    def _procesar(self, texto):
+        for letra, valor in self._TOKEN.findall(texto.strip()):
+            self._comando(letra, valor)
+
+    def _comando(self, letra, valor):
+        try:
+            v = float(valor) if valor else None
+        except ValueError:
+            return self._error(10)
+        if letra == "K":
+            self.remoto = False
+        elif letra == "u":
+            self.remoto = True
+        elif letra == "s":
+            # Standby: corta la medición en curso, apaga Ix y descarta los reportes no emitidos
+            self.standby = True
+            self.ix = 0.0
+            ahora = self._ahora()
+            self._generar_salida()
+            self._restantes = 0
+            self._fin_medicion = 0.0
+            self._descartar_salida(desde=ahora)
+        elif letra == "Q":
+            estado = ("R" if self.remoto else "L") + ("M" if self._midiendo() else "S") + "q"
+            self._responder(estado, demora=self.demora_estado)
+        elif letra == "r":
+            if v is None:
+                return self._error(2)
+            self.rx = v
+        elif letra == "A":
+            if v is None:
+                return self._error(2)
+            self.rs = v
+        elif letra in "lIj":
+            if v is None:
+                return self._error(2)
+            self.ix = v
+            self.standby = False
+            self.t_ix = self._ahora()
+        elif letra == "T":
+            if v is None or not 4 <= v <= 1000:
+                return self._error(9)
+            self.delay = int(v)
+        elif letra == "M":
+            if v is None or v < 1:
+                return self._error(9)
+            self.n_medidas = int(v)
+        elif letra == "J":
+            if v is None:
+                return self._error(2)
+            self.n_stats = int(v)
+        elif letra == "R":
+            self._iniciar_medicion()
+        elif letra in "xVXzGabcdefghi":
+            pass
+        else:
+            self._error(25)
+
+    def _relacion(self, t):
+        nominal = self.rx / self.rs
+        ppm = self._gauss()
+        if self.calentamiento_ppm and self.t_ix is not None:
+            transcurrido = (t - self.t_ix) / max(self.escala_tiempo, 1e-12)
+            ppm += self.calentamiento_ppm * np.exp(-transcurrido / self.tau_calentamiento)
+        return nominal * (1.0 + ppm * 1e-6)
+
+    def _iniciar_medicion(self):
+        if not self.remoto:
+            return self._error(7)
+        if self.ix == 0.0:
+            return self._error(12)
+        self.standby = False
+        # Los reportes se encolan a medida que vencen (ver _generar_salida): M puede ser 1e9
+        self._ciclo = (2 * self.delay + self.tiempo_conversion) * self.escala_tiempo
+        if self._restantes == 0:
+            self._proximo = max(self._ahora(), self._fin_medicion) + self._ciclo
+        self._restantes += self.n_medidas
+        self._fin_medicion = self._proximo + (self._restantes - 1) * self._ciclo
+
+    def _generar_salida(self):
+        # Todo lo vencido más el próximo reporte, para que quien espera sepa cuándo llega
+        limite = self._ahora() + self._ciclo
+        while self._restantes > 0 and self._proximo <= limite:
+            self._responder(self._reporte(self._proximo), t_listo=self._proximo)
+            self._proximo += self._ciclo
+            self._restantes -= 1
+
+    def _reporte(self, t):
+        r = self._relacion(t)
+        self._relaciones.append(r)
+        if self.formato_reporte != "completo":
+            return f"&{r:.9E}"
+        ventana = np.asarray(self._relaciones[-self.n_stats:])
+        media = float(ventana.mean())
+        std_ppm = float(ventana.std(ddof=1) / media * 1e6) if len(ventana) > 1 else 0.0
+        unc_ppm = std_ppm / np.sqrt(len(ventana))
+        return (f"R={r:.9E} RS={self.rs:.9E} RX={r * self.rs:.9E} "
+                f"MEAN={media:.9E} STD={std_ppm:.6E} UNC={unc_ppm:.6E}")
+
+
+class ScannerIntiSimulado(InstrumentoSimulado):
+    """
+    Modelo del scanner INTI (placa GPIB de E/S digital). Comandos terminados en 'X':
+    C2X, F3X, P1X, D<dato>ZX, P3X (lee salida S), P4X (lee salida X), A9X, B9X.
+    Una salida tiene a lo sumo un canal cerrado; NADA (63) indica ninguno.
+    """
+
+    IDENTIFICACION = "SCANNER INTI"
+    NADA = 63
+
+    def __init__(self, nombre="GPIB0::18::INSTR", tiempo_rele=0.01, **kwargs):
+        super().__init__(nombre, **kwargs)
+        self.tiempo_rele = tiempo_rele
+        self.canal_s = None
+        self.canal_x = None
+        self.operaciones_rele = 0
+
+    def _procesar(self, texto):
+        for cmd in texto.replace("\n", "").split("X"):
+            cmd = cmd.strip()
+            if cmd:
+                self._comando(cmd)
+
+    def _comando(self, cmd):
+        if cmd == "P3":
+            self._responder(self.NADA if self.canal_s is None else self.canal_s - 1)
+        elif cmd == "P4":
+            self._responder(self.NADA if self.canal_x is None else self.canal_x - 1 + 24)
+        elif cmd.startswith("D") and cmd.endswith("Z"):
+            self._dato(int(cmd[1:-1]))
+        # C2, F3, P1, A9, B9: configuración de puertos/formato, sin efecto en el modelo
+
+    def _dato(self, dato):
+        if dato == 112:
+            cambios = (self.canal_s is not None) + (self.canal_x is not None)
+            self.canal_s = self.canal_x = None
+        else:
+            abrir = dato >= 64
+            dato -= 64 if abrir else 0
+            canal = (dato & 0x0F) + 1
+            atributo = "canal_s" if 16 <= dato < 32 else "canal_x" if 32 <= dato < 48 else None
+            if atributo is None:
+                return
+            actual = getattr(self, atributo)
+            if abrir:
+                cambios = int(actual == canal)
+                if cambios:
+                    setattr(self, atributo, None)
+            else:
+                cambios = int(actual != canal)
+                setattr(self, atributo, canal)
+        if cambios:
+            self.operaciones_rele += cambios
+            self._dormir(self.tiempo_rele)
+
+
+class _MultimetroSimulado(InstrumentoSimulado):
+    """Base para multímetros con comandos separados por ';'."""
+
+    def __init__(self, nombre, valor=0.0, senal=None, tiempo_integracion=0.2, **kwargs):
+        super().__init__(nombre, **kwargs)
+        self.valor = valor
+        self.senal = senal
+        self.tiempo_integracion = tiempo_integracion
+        self.rango = 10.0
+        self._t0 = self._ahora()
+
+    def _tiempo(self, t):
+        """Tiempo de instrumento (s) desde la creación, para evaluar la señal."""
+        return (t - self._t0) / max(self.escala_tiempo, 1e-12)
+
+    def _lecturas(self, t):
+        """Lecturas en los instantes t (array de reloj monotónico)."""
+        t = np.atleast_1d(np.asarray(t, dtype=float))
+        if self.senal is not None:
+            base = np.broadcast_to(np.asarray(self.senal(self._tiempo(t)), dtype=float), t.shape)
+        else:
+            base = np.full(t.shape, float(self.valor))
+        if self.ruido:
+            base = base + np.array([self._gauss() for _ in range(t.size)])
+        return base
+
+    def _procesar(self, texto):
+        for cmd in texto.split(";"):
+            cmd = cmd.strip().lstrip(":")  # SCPI: ';:' vuelve a la raíz del árbol
+            if cmd:
+                partes = cmd.split(None, 1)
+                args = [a.strip() for a in partes[1].split(",")] if len(partes) > 1 else []
+                self._comando(partes[0].upper(), args)
+
+    def _comando(self, nombre, args):
+        raise NotImplementedError
+
+
+class HP34401ASimulado(_MultimetroSimulado):
+    IDENTIFICACION = "HEWLETT-PACKARD,34401A,0,11-5-2"
+
+    def __init__(self, nombre="GPIB0::5::INSTR", valor=0.1, tiempo_integracion=0.2, **kwargs):
+        super().__init__(nombre, valor=valor, tiempo_integracion=tiempo_integracion, **kwargs)
+
+    def _comando(self, nombre, args):
+        if nombre == "*IDN?":
+            self._responder(self.IDENTIFICACION)
+        elif nombre == "*RST":
+            self._dormir(0.5)
+        elif nombre == "*CLS":
+            self._descartar_salida()
+        elif nombre == "VOLT:DC:RANG" and args:
+            self.rango = float(args[0])
+        elif nombre == "READ?":
+            t = self._en(self.tiempo_integracion)
+            self._responder(f"{self._lecturas(t)[0]:+.8E}", t_listo=t)
+        elif nombre == "SYST:ERR?":
+            self._responder('+0,"No error"')
+
+
+class HP34420ASimulado(HP34401ASimulado):
+    IDENTIFICACION = "HEWLETT-PACKARD,34420A,0,3-1-1"
+
+    def __init__(self, nombre="GPIB0::10::INSTR", valor=1e-3, tiempo_integracion=0.4, **kwargs):
+        super().__init__(nombre, valor=valor, tiempo_integracion=tiempo_integracion, **kwargs)
+
+
+class HP3458ASimulado(_MultimetroSimulado):
+    """
+    Modelo del HP3458A: lecturas únicas (INIT/FETCH?), memoria de lecturas (MEM <modo>,
+    NRDGS <n>, TARM SGL, TRIG, MCOUNT?, RMEM?) en ASCII/SINT/DINT/DREAL y barridos SWEEP con volcado binario
+    SINT por MEM:START?. `senal(t)` recibe un array de tiempos (s) y devuelve voltajes.
+    """
+
+    IDENTIFICACION = "HP3458A"
+    FRECUENCIA_RED = 50.0
+
+    def __init__(self, nombre="GPIB0::26::INSTR", valor=0.5, **kwargs):
+        super().__init__(nombre, valor=valor, **kwargs)
+        self._preset()
+
+    def _preset(self):
+        self.rango = 10.0
+        self.nplc = 10.0
+        self.aper = None
+        self.mformat = "ASCII"
+        self.oformat = "ASCII"
+        self.mem = "OFF"
+        self.nrdgs = 1
+        self.tarm = "AUTO"
+        self.trig = "AUTO"
+        self.sweep = None
+        self.memoria = np.empty(0)
+        self.t_memoria = np.empty(0)
+        self._ultima = (0.0, 0.0)
+
+    def _t_integracion(self):
+        return self.aper if self.aper is not None else self.nplc / self.FRECUENCIA_RED
+
+    def _escala(self, formato):
+        bits = {"SINT": 15, "DINT": 31}.get(formato)
+        return self.rango * 1.2 / 2 ** bits if bits else 1.0
+
+    def _codificar(self, valores, formato):
+        if formato == "ASCII":
+            return ",".join(f"{v:+.9E}" for v in valores).encode()
+        if formato == "DREAL":
+            return np.asarray(valores, dtype=">f8").tobytes()
+        tipo = ">i2" if formato == "SINT" else ">i4"
+        info = np.iinfo(tipo)
+        cuentas = np.clip(np.round(np.asarray(valores) / self._escala(formato)), info.min, info.max)
+        return cuentas.astype(tipo).tobytes()
+
+    def _adquirir(self, n, dt):
+        """Agenda n lecturas en memoria, una cada dt s (tiempo de instrumento)."""
+        t0 = self._ahora()
+        paso = max(dt, self._t_integracion()) * self.escala_tiempo
+        t = t0 + paso * np.arange(1, n + 1)
+        self.memoria = self._lecturas(t)
+        self.t_memoria = t
+        return t0, paso
+
+    def _comando(self, nombre, args):
+        if nombre == "ID?":
+            self._responder(self.IDENTIFICACION)
+        elif nombre in ("*RST", "RESET"):
+            self._preset()
+            self._dormir(0.5)
+        elif nombre == "PRESET":
+            self._preset()
+        elif nombre == "*CLS":
+            self._descartar_salida()
+        elif nombre in ("DCV", "ACV"):
+            if args:
+                self.rango = float(args[0])
+        elif nombre == "NPLC" and args:
+            self.nplc = float(args[0])
+        elif nombre == "APER" and args:
+            self.aper = float(args[0])
+        elif nombre == "MFORMAT" and args:
+            self.mformat = args[0].upper()
+        elif nombre == "OFORMAT" and args:
+            self.oformat = args[0].upper()
+        elif nombre == "MEM" and args:
+            # Modo de memoria (OFF/LIFO/FIFO/CONT); un número no es válido en el 3458A real
+            self.mem = args[0].upper()
+        elif nombre == "NRDGS" and args:
+            self.nrdgs = int(float(args[0]))
+        elif nombre == "SWEEP" and len(args) == 2:
+            self.sweep = (float(args[0]), int(float(args[1])))
+        elif nombre == "TARM":
+            if args:
+                self.tarm = args[0].upper()
+            elif self.sweep is not None:
+                self._adquirir(self.sweep[1], self.sweep[0])
+        elif nombre == "TRIG":
+            if args:
+                self.trig = args[0].upper()
+            elif self.tarm == "SGL":
+                self._adquirir(self.nrdgs, self._t_integracion())
+        elif nombre == "INIT":
+            t = self._en(self._t_integracion())
+            self._ultima = (t, self._lecturas(t)[0])
+        elif nombre == "FETCH?":
+            t, v = self._ultima
+            self._responder(f"{v:+.9E}", t_listo=max(t, self._ahora()))
+        elif nombre == "MCOUNT?":
+            self._responder(int(np.count_nonzero(self.t_memoria <= self._ahora())))
+        elif nombre == "ISCALE?":
+            self._responder(f"{self._escala(self.oformat):.9E}")
+        elif nombre in ("RMEM?", "RMEM"):
+            t = float(self.t_memoria[-1]) if self.t_memoria.size else self._ahora()
+            datos = self._codificar(self.memoria, self.mformat)
+            if self.mformat == "ASCII":
+                self._responder(datos.decode(), t_listo=t)
+            else:
+                self._responder_binario(datos, t_listo=t)
+        elif nombre == "MEM:START?":
+            if self.t_memoria.size:
+                paso = float(self.t_memoria[1] - self.t_memoria[0]) if self.t_memoria.size > 1 else 1e-6
+                t0 = float(self.t_memoria[0]) - paso
+                self._encolar(_Flujo(t0, paso, self._codificar(self.memoria, "SINT"), 2))
+        # AZERO, TBUFF, DELAY, DISP, MATH, *WAI: sin efecto en el modelo
+
+
+class HP3245ASimulado(InstrumentoSimulado):
+    """Modelo del generador HP3245A (dos canales, comandos separados por ';')."""
+
+    IDENTIFICACION = "HP3245A"
+
+    def __init__(self, nombre="GPIB0::13::INSTR", **kwargs):
+        super().__init__(nombre, **kwargs)
+        self.canal = "CHANA"
+        self.canales = {"CHANA": {}, "CHANB": {}}
+
+    def _procesar(self, texto):
+        for cmd in texto.split(";"):
+            cmd = cmd.strip().upper()
+            if not cmd:
+                continue
+            if cmd == "ID?":
+                self._responder(self.IDENTIFICACION)
+            elif cmd == "RESET":
+                self.canales = {"CHANA": {}, "CHANB": {}}
+                self._dormir(0.5)
+            elif cmd.startswith("USE "):
+                self.canal = cmd.split()[1]
+            elif cmd.split()[0] in ("FREQ", "DCOFF", "APPLY"):
+                nombre, valor = cmd.split(None, 1)
+                self.canales.setdefault(self.canal, {})[nombre] = valor
+            # CLR, SCRATCH, BEEP, PHSYNC: sin efecto en el modelo
+
+
+def crear_banco(escala_tiempo=1.0, semilla=None, **por_instrumento):
+    """
+    Banco simulado con las direcciones por defecto del laboratorio.
+    por_instrumento: kwargs por clave ('puente', 'scanner', 'hp3458a', 'hp3245a',
+    'hp34401a', 'hp34420a'), p.ej. puente={'ruido': 0.1}.
+    """
+    clases = {
+        "puente": (PuenteMI60100Simulado, "GPIB0::15::INSTR"),
+        "scanner": (ScannerIntiSimulado, "GPIB0::18::INSTR"),
+        "hp3458a": (HP3458ASimulado, "GPIB0::26::INSTR"),
+        "hp3245a": (HP3245ASimulado, "GPIB0::13::INSTR"),
+        "hp34401a": (HP34401ASimulado, "GPIB0::5::INSTR"),
+        "hp34420a": (HP34420ASimulado, "GPIB0::10::INSTR"),
+    }
+    banco = {}
+    for i, (clave, (clase, direccion)) in enumerate(clases.items()):
+        kwargs = dict(escala_tiempo=escala_tiempo,
+                      semilla=None if semilla is None else semilla + i)
+        kwargs.update(por_instrumento.get(clave, {}))
+        direccion = kwargs.pop("nombre", direccion)
+        banco[direccion] = clase(direccion, **kwargs)
+    return banco
+
+
+class ResourceManagerSimulado:
+    """
+    Reemplazo de pyvisa.ResourceManager para los drivers de Instrumental/.
+
+    rm = ResourceManagerSimulado(escala_tiempo=0.01)
+    puente = MI60100(15, rm=rm)
+    """
+
+    def __init__(self, instrumentos=None, escala_tiempo=1.0, semilla=None):
+        self.instrumentos = instrumentos if instrumentos is not None else crear_banco(escala_tiempo, semilla)
+
+    def list_resources(self, query="?*::INSTR"):
+        return tuple(self.instrumentos)
+
+    def open_resource(self, resource_name, **kwargs):
+        try:
+            instr = self.instrumentos[resource_name]
+        except KeyError:
+            raise pyvisa.errors.VisaIOError(pyvisa.constants.StatusCode.error_resource_not_found)
+        instr.abierto = True
+        for clave, valor in kwargs.items():
+            setattr(instr, clave, valor)
+        return instr
+
+    def close(self):
+        for instr in self.instrumentos.values():
+            instr.close()
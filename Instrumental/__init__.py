@@ -0,0 +1,63 @@
+"""
+Drivers de los instrumentos del banco, importados recién cuando se usan.
+
+Importar el paquete no carga pyvisa, NumPy ni matplotlib: cada driver (y lo que
+necesita) se importa la primera vez que se pide su clase.
+
+    import Instrumental
+    puente = Instrumental.MI60100(15)
+    Multimetro = Instrumental.clase_driver("HP34401")   # nombres de la interfaz / planes
+
+HP3245A y HP3458A se llaman igual que su módulo: como atributo del paquete son el
+módulo, así que sus clases se piden con clase_driver().
+"""
+import importlib
+
+# Clase -> módulo del paquete que la define
+DRIVERS = {
+    "MI60100": "MI6010D",
+    "ScannerInti": "Scanner",
+    "HP3245A": "HP3245A",
+    "HP3458A": "HP3458A",
+    "HP34401A": "HP34401",
+    "HP34420A": "HP34420",
+}
+
+# Nombres de modelo que usan Interface.py y los planes de medición
+MODELOS = {
+    "MI60100": "MI60100",
+    "Scanner": "ScannerInti",
+    "HP3245A": "HP3245A",
+    "HP3458A": "HP3458A",
+    "HP34401": "HP34401A",
+    "HP34420": "HP34420A",
+}
+
+__all__ = ["DRIVERS", "MODELOS", "clase_driver", "lector_multimetro", "MI60100", "ScannerInti", "HP34401A", "HP34420A"]
+
+
+def clase_driver(nombre):
+    """Clase del driver por nombre de clase o de modelo; importa su módulo la primera vez."""
+    clase = MODELOS.get(nombre, nombre)
+    if clase not in DRIVERS:
+        raise ValueError(f"Dispositivo '{nombre}' no soportado.")
+    modulo = importlib.import_module(f"{__name__}.{DRIVERS[clase]}")
+    return getattr(modulo, clase)
+
+
+def lector_multimetro(multimetro):
+    """Función de lectura única de cada multímetro (read() en los 344xx, measure_once() en el 3458A)."""
+    return multimetro.read if hasattr(multimetro, "read") else multimetro.measure_once
+
+
+def __getattr__(nombre):
+    # Solo se llama si el atributo no existe todavía (el primer uso de cada driver)
+    if nombre in DRIVERS and DRIVERS[nombre] != nombre:
+        clase = clase_driver(nombre)
+        globals()[nombre] = clase
+        return clase
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,22 +1,36 @@
+import os
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from pathlib import Path
 import datetime
+from Ejecucion import MotorEjecucion, tarea_para, validar_plan, plantilla_plan, tarea_descubrimiento
+from Instrumental import MODELOS
+from Instrumental.Descubrimiento import instrumentos_en_cache, orden
 
 # Carpeta predeterminada donde se guardarán los archivos
 ruta_predeterminada = Path.cwd() / "Config"
 ruta_predeterminada.mkdir(exist_ok=True)  # Crear la carpeta si no existe
 
+# Archivo cargado en la pestaña "Ejecución"
+ruta_cargada = None
+
 def generar_nombre_archivo():
     """ Genera un nombre de archivo con fecha y hora. """
     fecha_hora = datetime.datetime.now()
     return fecha_hora.strftime("Medicion_%Y-%m-%d_%H-%M-%S.txt")
 
 def guardar_texto():
-    """ Guarda el contenido del TextBox en la ruta seleccionada. """
+    """ Guarda el contenido del TextBox en la ruta seleccionada (los planes JSON se validan antes). """
     texto = entrada.get("1.0", tk.END).strip()
     if texto:
         nombre_archivo = generar_nombre_archivo()
+        if texto.startswith("{"):
+            try:
+                validar_plan(texto)
+            except ValueError as e:
+                messagebox.showerror("Plan inválido", str(e))
+                return
+            nombre_archivo = nombre_archivo.replace(".txt", ".json")
         ruta_archivo = ruta_predeterminada / nombre_archivo
         with open(ruta_archivo, "w", encoding="utf-8") as archivo:
             archivo.write(texto)
@@ -24,6 +38,11 @@ def guardar_texto():
     else:
         messagebox.showwarning("Advertencia", "La caja de texto está vacía.")
 
+def insertar_plantilla():
+    """ Pone en la caja un plan de medición de ejemplo para editar. """
+    entrada.delete("1.0", tk.END)
+    entrada.insert("1.0", plantilla_plan())
+
 def cambiar_carpeta():
     """ Permite al usuario seleccionar una nueva carpeta y actualiza la ruta predeterminada. """
     global ruta_predeterminada
@@ -38,12 +57,14 @@ def limpiar_texto():
 
 def cargar_texto():
     """ Permite seleccionar un archivo y carga su contenido en la caja de salida. """
+    global ruta_cargada
     ruta_archivo = filedialog.askopenfilename(
         title="Seleccionar archivo de texto",
-        filetypes=[("Archivos de texto", "*.txt")]
+        filetypes=[("Campañas y planes", "*.json"), ("Archivos de texto", "*.txt")]
     )
     
     if ruta_archivo:
+        ruta_cargada = ruta_archivo
         with open(ruta_archivo, "r", encoding="utf-8") as archivo:
             contenido = archivo.read()
         
@@ -54,6 +75,115 @@ def cargar_texto():
 
         messagebox.showinfo("Éxito", f"Archivo cargado:\n{ruta_archivo}")
 
+def ejecutar_programa():
+    """ Corre el archivo cargado en segundo plano (ver Ejecucion.MotorEjecucion). """
+    if ruta_cargada is None:
+        messagebox.showwarning("Advertencia", "Primero cargue un archivo.")
+        return
+    if motor.ocupado:
+        messagebox.showwarning("Advertencia", "Ya hay una ejecución en curso.")
+        return
+    registro_ejecucion.config(state=tk.NORMAL)
+    registro_ejecucion.delete("1.0", tk.END)
+    registro_ejecucion.config(state=tk.DISABLED)
+    try:
+        tarea = tarea_para(ruta_cargada)
+    except ValueError as e:
+        messagebox.showerror("Error", f"El archivo no es una campaña ni un plan válido:\n{e}")
+        return
+    motor.iniciar(tarea, ruta_cargada, simulado=bool(simulado.get()))
+
+def pausar_reanudar():
+    """ Alterna pausa/continuación de la ejecución en curso. """
+    if motor.en_pausa:
+        motor.reanudar()
+        boton_pausar.config(text="Pausar")
+        label_estado.config(text="Ejecutando...")
+    elif motor.ocupado:
+        motor.pausar()
+        boton_pausar.config(text="Reanudar")
+        label_estado.config(text="En pausa")
+
+def cancelar_programa():
+    if motor.ocupado:
+        motor.cancelar()
+        label_estado.config(text="Cancelando...")
+
+def mostrar(texto):
+    """ Agrega una línea al registro de la pestaña (se descartan las más viejas). """
+    registro_ejecucion.config(state=tk.NORMAL)
+    registro_ejecucion.insert(tk.END, texto + "\n")
+    if int(registro_ejecucion.index("end-1c").split(".")[0]) > 500:
+        registro_ejecucion.delete("1.0", "2.0")
+    registro_ejecucion.see(tk.END)
+    registro_ejecucion.config(state=tk.DISABLED)
+
+def al_evento(tipo, datos):
+    """ Eventos del motor de ejecución (siempre en el hilo de Tk). """
+    en_curso = tipo in ("inicio", "progreso", "lectura")
+    boton_ejecutar.config(state=tk.DISABLED if en_curso else tk.NORMAL)
+    if tipo == "inicio":
+        label_estado.config(text="Ejecutando...")
+    elif tipo == "progreso":
+        fraccion = datos["fraccion"]
+        label_estado.config(text=datos["texto"] if fraccion is None else f"{datos['texto']} - {fraccion:.0%}")
+        mostrar(datos["texto"])
+    elif tipo == "lectura":
+        mostrar(f"{datos.get('indice', '')}: relación {datos.get('ratio')}")
+    elif tipo == "fin":
+        label_estado.config(text="Terminado")
+        boton_pausar.config(text="Pausar")
+    elif tipo == "cancelado":
+        label_estado.config(text="Cancelado")
+        boton_pausar.config(text="Pausar")
+    elif tipo == "error":
+        label_estado.config(text="Error")
+        boton_pausar.config(text="Pausar")
+        mostrar(datos["traza"])
+        messagebox.showerror("Error", str(datos["error"]))
+
+# Direcciones del laboratorio, usadas hasta la primera búsqueda de instrumentos
+DIRECCIONES_POR_DEFECTO = ["GPIB0::13::INSTR", "GPIB0::14::INSTR", "GPIB0::15::INSTR", "GPIB0::18::INSTR", "GPIB0::26::INSTR"]
+
+# Driver encontrado -> nombre de modelo de la interfaz (HP34401A -> HP34401)
+MODELO_DE_DRIVER = {driver: modelo for modelo, driver in MODELOS.items()}
+
+def direcciones_gpib(encontrados):
+    """ Direcciones que contestaron en la última búsqueda. """
+    return sorted((r for r, datos in encontrados.items() if datos.get("driver")), key=orden) or DIRECCIONES_POR_DEFECTO
+
+def mostrar_instrumentos(encontrados):
+    """ Completa las direcciones y preselecciona los multímetros encontrados para Rs y Rx. """
+    direcciones = direcciones_gpib(encontrados)
+    combobox_direccion1.config(values=direcciones)
+    combobox_direccion2.config(values=direcciones)
+    multimetros = [(r, MODELO_DE_DRIVER[encontrados[r]["driver"]]) for r in direcciones
+                   if r in encontrados and MODELO_DE_DRIVER.get(encontrados[r]["driver"]) in opciones_dispositivos]
+    for (direccion, modelo), combo_modelo, combo_direccion in zip(
+            multimetros, (combobox_dispositivo1, combobox_dispositivo2), (combobox_direccion1, combobox_direccion2)):
+        combo_modelo.set(modelo)
+        combo_direccion.set(direccion)
+    if encontrados:
+        label_busqueda.config(text="\n".join(f"{r}: {MODELO_DE_DRIVER.get(encontrados[r].get('driver'), 'sin identificar')}"
+                                              for r in sorted(encontrados, key=orden)))
+
+def buscar_instrumentos():
+    """ Consulta el bus en segundo plano (ver Instrumental/Descubrimiento.py). """
+    if not motor_busqueda.ocupado:
+        motor_busqueda.iniciar(tarea_descubrimiento, simulado=bool(simulado.get()))
+
+def al_evento_busqueda(tipo, datos):
+    boton_buscar.config(state=tk.DISABLED if tipo in ("inicio", "progreso") else tk.NORMAL)
+    if tipo == "progreso":
+        label_busqueda.config(text=datos["texto"])
+    elif tipo == "fin":
+        if not datos:
+            label_busqueda.config(text="No se encontraron instrumentos.")
+        mostrar_instrumentos(datos)
+    elif tipo == "error":
+        label_busqueda.config(text="Error en la búsqueda")
+        messagebox.showerror("Error", str(datos["error"]))
+
 # Crear la ventana principal
 ventana = tk.Tk()
 ventana.title("Programador de Escáner")
@@ -97,6 +227,9 @@ boton_guardar.grid(row=0, column=0, padx=5)
 boton_limpiar = tk.Button(frame_botones, text="Limpiar", command=limpiar_texto)
 boton_limpiar.grid(row=0, column=1, padx=5)
 
+boton_plantilla = tk.Button(frame_botones, text="Plantilla", command=insertar_plantilla)
+boton_plantilla.grid(row=0, column=2, padx=5)
+
 # ========== Pestaña "Ejecucion" ==========
 boton_cargar = tk.Button(frame_ejecucion, text="Cargar Archivo", command=cargar_texto)
 boton_cargar.pack(pady=5, anchor="w")
@@ -104,8 +237,27 @@ boton_cargar.pack(pady=5, anchor="w")
 salida = tk.Text(frame_ejecucion, height=5, width=50, wrap="word", state=tk.DISABLED, font=("Arial", 10))
 salida.pack(pady=5, fill="x", padx=10)
 
-boton_ejecutar = tk.Button(frame_ejecucion, text="Ejecutar programa", command=cargar_texto)
-boton_ejecutar.pack(pady=5, anchor="w")
+frame_control = tk.Frame(frame_ejecucion)
+frame_control.pack(pady=5, anchor="w")
+
+boton_ejecutar = tk.Button(frame_control, text="Ejecutar programa", command=ejecutar_programa)
+boton_ejecutar.grid(row=0, column=0, padx=5)
+
+boton_pausar = tk.Button(frame_control, text="Pausar", command=pausar_reanudar)
+boton_pausar.grid(row=0, column=1, padx=5)
+
+boton_cancelar = tk.Button(frame_control, text="Cancelar", command=cancelar_programa)
+boton_cancelar.grid(row=0, column=2, padx=5)
+
+simulado = tk.IntVar()
+check_simulado = tk.Checkbutton(frame_control, text="Simulado", variable=simulado)
+check_simulado.grid(row=0, column=3, padx=5)
+
+label_estado = tk.Label(frame_control, text="", font=("Arial", 10))
+label_estado.grid(row=0, column=4, padx=10)
+
+registro_ejecucion = tk.Text(frame_ejecucion, height=6, width=50, wrap="none", state=tk.DISABLED, font=("Courier", 9))
+registro_ejecucion.pack(pady=5, fill="x", padx=10)
 
 frame_checkbuttons = tk.Frame(frame_ejecucion)
 frame_checkbuttons.pack(pady=5, anchor="w")
@@ -137,12 +289,16 @@ label_dispositivo1 = tk.Label(frame_dispositivos, text="Medición de Temperatura
 label_dispositivo1.pack(pady=5, anchor="w")
 
 opciones_dispositivos = ["HP3458A", "HP34401", "HP34420"]
-opciones_GPIB = ["GPIB0::13::INSTR", "GPIB0::14::INSTR","GPIB0::15::INSTR", "GPIB0::18::INSTR", "GPIB0::26::INSTR"]
+# Direcciones de la última búsqueda (cache); las del laboratorio si nunca se buscó
+opciones_GPIB = direcciones_gpib(instrumentos_en_cache())
 
 combobox_dispositivo1 = ttk.Combobox(frame_dispositivos, values=opciones_dispositivos, state="readonly")
 combobox_dispositivo1.pack(pady=5, anchor="w")
 combobox_dispositivo1.current(0)  # Seleccionar el primer elemento por defecto
 
+combobox_direccion1 = ttk.Combobox(frame_dispositivos, values=opciones_GPIB)
+combobox_direccion1.pack(pady=5, anchor="w")
+
 label_dispositivo2 = tk.Label(frame_dispositivos, text="Medición de Temperatura de Rx:", font=("Arial", 12))
 label_dispositivo2.pack(pady=5, anchor="w")
 
@@ -150,8 +306,32 @@ combobox_dispositivo2 = ttk.Combobox(frame_dispositivos, values=opciones_disposi
 combobox_dispositivo2.pack(pady=5, anchor="w")
 combobox_dispositivo2.current(0)  # Seleccionar el primer elemento por defecto
 
+combobox_direccion2 = ttk.Combobox(frame_dispositivos, values=opciones_GPIB)
+combobox_direccion2.pack(pady=5, anchor="w")
+
+frame_busqueda = tk.Frame(frame_dispositivos)
+frame_busqueda.pack(pady=5, anchor="w")
+
+boton_buscar = tk.Button(frame_busqueda, text="Buscar instrumentos", command=buscar_instrumentos)
+boton_buscar.grid(row=0, column=0, padx=5)
+
+label_busqueda = tk.Label(frame_busqueda, text="", font=("Arial", 10), justify="left")
+label_busqueda.grid(row=0, column=1, padx=5, sticky="w")
+
+mostrar_instrumentos(instrumentos_en_cache())
+
+# Búsqueda en su propio motor: no interfiere con la ejecución de la otra pestaña
+motor_busqueda = MotorEjecucion(ventana, al_evento_busqueda)
+
+# Motor de ejecución en segundo plano (la ventana sigue respondiendo durante la medición)
+motor = MotorEjecucion(ventana, al_evento)
+
+# Para medir el arranque (Pruebas/Benchmark_Arranque.py): se cierra apenas se dibuja la ventana
+if os.environ.get("ESCANER_SALIR_AL_INICIAR"):
+    ventana.after_idle(ventana.destroy)
+
 # Ejecutar la ventana
 ventana.mainloop()
 
 
-#pyinstaller --onefile --windowed Text_box.py#
\ No newline at end of file
+#pyinstaller Text_box.spec#
\ No newline at end of file
@@ -0,0 +1,211 @@
+"""
+Ajuste en lote de constantes de tiempo de las capturas de carga/descarga RC (datos/Carga).
+
+Cada captura se parte en tramos de subida y bajada y cada tramo se ajusta con
+v(t) = C + A * exp(-t / tau). La estimación inicial de tau es log-lineal; después se
+refina con una búsqueda en grilla vectorizada donde, para cada tau candidato, A y C
+salen por mínimos cuadrados en forma cerrada. Los archivos se reparten en un pool de
+procesos.
+
+    python Pruebas/Ajuste_Exponencial.py datos/Carga
+"""
+import os
+import sys
+import csv
+import glob
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+# Hay que poner esto para que me tome el paquete Instrumental
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Instrumental.Captura import EXTENSION, leer_texto, abrir_captura
+
+CAMPOS = ["archivo", "n_tramos", "tau_s", "tau_desvio_s", "tau_subida_s", "tau_bajada_s",
+          "amplitud", "offset_alto", "offset_bajo", "rms_residuo"]
+
+
+def leer_captura(ruta):
+    """(valores, metadatos) de un .txt o .cap del archivo de datos."""
+    if ruta.endswith(EXTENSION):
+        captura = abrir_captura(ruta)
+        return np.asarray(captura.voltajes()), dict(captura.metadatos)
+    return leer_texto(ruta)
+
+
+def segmentar(v, histeresis=0.05, salto=0.05, min_excursion=0.1, min_muestras=10):
+    """
+    Parte la señal en tramos monótonos (subida/bajada) entre extremos sucesivos.
+    Un extremo se confirma cuando la señal se aleja de él más de `histeresis` x rango.
+    Los saltos bruscos (más de `salto` x rango entre dos muestras, p.ej. la descarga por
+    cortocircuito) también cortan el tramo, porque no forman parte de la respuesta RC.
+    Se descartan los tramos de menos de `min_muestras` o con excursión menor a
+    `min_excursion` x rango. Devuelve [(inicio, fin, +1 subida / -1 bajada)].
+    """
+    v = np.asarray(v, dtype=float)
+    n = len(v)
+    if n < 2:
+        return []
+    rango = v.max() - v.min()
+    h = histeresis * rango
+    # Entre extremos locales la señal es monótona: la histéresis solo hace falta evaluarla
+    # en ellos (cambios de signo de la derivada, tomando el primer punto de cada meseta)
+    signo = np.sign(np.diff(v))
+    no_nulos = np.flatnonzero(signo)
+    giros = no_nulos[:-1][signo[no_nulos[1:]] != signo[no_nulos[:-1]]] + 1
+    candidatos = np.concatenate(([0], giros, [n - 1])).tolist()
+    x = v[candidatos].tolist()
+    pivotes = []
+    direccion = 0
+    jmax = jmin = 0
+    for j in range(1, len(x)):
+        if x[j] > x[jmax]:
+            jmax = j
+        if x[j] < x[jmin]:
+            jmin = j
+        if direccion == 0:
+            if x[jmax] - x[jmin] > h:
+                direccion = 1 if jmax > jmin else -1
+                pivotes.append(candidatos[jmin if direccion == 1 else jmax])
+        elif direccion == 1 and x[jmax] - x[j] > h:
+            pivotes.append(candidatos[jmax])
+            direccion, jmin = -1, j
+        elif direccion == -1 and x[j] - x[jmin] > h:
+            pivotes.append(candidatos[jmin])
+            direccion, jmax = 1, j
+    if not pivotes:
+        return []
+    pivotes.append(n - 1)
+    saltos = np.flatnonzero(np.abs(np.diff(v)) > salto * rango)
+    tramos = []
+    for a, b in zip(pivotes[:-1], pivotes[1:]):
+        cortes = saltos[(saltos >= a) & (saltos < b)]
+        inicios = [a] + list(cortes + 1)
+        fines = list(cortes) + [b]
+        for i, f in zip(inicios, fines):
+            if f - i >= min_muestras and abs(v[f] - v[i]) >= min_excursion * rango:
+                tramos.append((int(i), int(f), 1 if v[f] > v[i] else -1))
+    return tramos
+
+
+def _ajuste_lineal(e, y):
+    """Para cada fila de e (K x N) resuelve y = A*e + C por mínimos cuadrados. Devuelve A, C, RSS."""
+    n = y.size
+    se = e.sum(axis=1)
+    see = np.einsum("ij,ij->i", e, e)
+    sy = y.sum()
+    sey = e @ y
+    syy = y @ y
+    det = n * see - se * se
+    det = np.where(np.abs(det) < 1e-300, np.nan, det)
+    a = (n * sey - se * sy) / det
+    c = (sy - a * se) / n
+    rss = syy - a * sey - c * sy
+    return a, c, rss
+
+
+def ajustar_tramo(t, y, iteraciones=4, puntos=41):
+    """
+    Ajusta y = C + A*exp(-t/tau). Devuelve dict con tau, A, C y rms del residuo.
+    """
+    t = np.asarray(t, dtype=float) - t[0]
+    y = np.asarray(y, dtype=float)
+    span = t[-1] if t[-1] > 0 else 1.0
+    # Estimación log-lineal con la asíntota apenas más allá del último valor
+    salto = y[0] - y[-1]
+    c0 = y[-1] - 0.01 * salto
+    z = np.abs(y - c0)
+    validos = z > 0.05 * np.abs(y[0] - c0)
+    tau = span / 3
+    if validos.sum() >= 3:
+        pendiente = np.polyfit(t[validos], np.log(z[validos]), 1)[0]
+        if pendiente < 0:
+            tau = -1.0 / pendiente
+    # Refinamiento: grillas logarítmicas cada vez más finas alrededor del mejor tau
+    factor = 10.0
+    for _ in range(iteraciones):
+        candidatos = tau * np.logspace(-np.log10(factor), np.log10(factor), puntos)
+        e = np.exp(-t[None, :] / candidatos[:, None])
+        a, c, rss = _ajuste_lineal(e, y)
+        k = int(np.nanargmin(rss))
+        tau = candidatos[k]
+        # La próxima grilla cubre tres pasos de la actual a cada lado del mínimo
+        factor = factor ** (3.0 / (puntos - 1))
+    return {"tau": float(tau), "A": float(a[k]), "C": float(c[k]),
+            "rms": float(np.sqrt(max(rss[k], 0.0) / y.size))}
+
+
+def ajustar_archivo(ruta, dt=None):
+    """Ajusta todos los tramos de una captura. dt: período de muestreo (por defecto el sweep time)."""
+    valores, metadatos = leer_captura(ruta)
+    dt = dt or metadatos.get("sweep_time") or 1.0
+    resultados = []
+    for a, b, direccion in segmentar(valores):
+        # Se saltea la meseta previa al flanco: el ajuste arranca cuando la señal se despega
+        y = valores[a:b + 1]
+        inicio = int(np.argmax(np.abs(y - y[0]) > 0.02 * abs(y[-1] - y[0])))
+        y = y[max(inicio, 1):]
+        ajuste = ajustar_tramo(np.arange(y.size) * dt, y)
+        ajuste["direccion"] = direccion
+        resultados.append(ajuste)
+    fila = {"archivo": ruta, "n_tramos": len(resultados)}
+    if not resultados:
+        return fila
+    tau = np.array([r["tau"] for r in resultados])
+    subida = [r for r in resultados if r["direccion"] > 0]
+    bajada = [r for r in resultados if r["direccion"] < 0]
+    fila.update(
+        tau_s=float(np.median(tau)),
+        tau_desvio_s=float(tau.std(ddof=1)) if tau.size > 1 else 0.0,
+        tau_subida_s=float(np.median([r["tau"] for r in subida])) if subida else None,
+        tau_bajada_s=float(np.median([r["tau"] for r in bajada])) if bajada else None,
+        amplitud=float(np.median([abs(r["A"]) for r in resultados])),
+        offset_alto=float(np.median([r["C"] for r in subida])) if subida else None,
+        offset_bajo=float(np.median([r["C"] for r in bajada])) if bajada else None,
+        rms_residuo=float(np.sqrt(np.mean([r["rms"] ** 2 for r in resultados]))),
+    )
+    return fila
+
+
+def ajustar_archivos(rutas, dt=None, procesos=None):
+    """Ajusta muchas capturas en paralelo (un proceso por núcleo). Devuelve la tabla de resultados."""
+    rutas = list(rutas)
+    if procesos == 1 or len(rutas) <= 1:
+        return [ajustar_archivo(r, dt) for r in rutas]
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        return list(pool.map(ajustar_archivo, rutas, [dt] * len(rutas),
+                             chunksize=max(1, len(rutas) // (4 * (procesos or os.cpu_count() or 1)))))
+
+
+def guardar_tabla(resultados, ruta):
+    with open(ruta, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CAMPOS)
+        writer.writeheader()
+        for fila in resultados:
+            writer.writerow(fila)
+
+
+def buscar_capturas(carpeta):
+    """Capturas bajo la carpeta; si un .txt ya fue convertido se ajusta solo su .cap (como Catalogo)."""
+    capturas = set(glob.glob(os.path.join(carpeta, "**", "*Medicion_*" + EXTENSION), recursive=True))
+    textos = [ruta for ruta in glob.glob(os.path.join(carpeta, "**", "*Medicion_*.txt"), recursive=True)
+              if os.path.splitext(ruta)[0] + EXTENSION not in capturas]
+    return sorted(textos + list(capturas))
+
+
+def main():
+    carpeta = sys.argv[1] if len(sys.argv) > 1 else os.path.join("datos", "Carga")
+    rutas = buscar_capturas(carpeta)
+    resultados = ajustar_archivos(rutas)
+    print(f"{'archivo':<60}{'tramos':>7}{'tau':>14}{'desvío':>12}{'amplitud':>10}")
+    for fila in resultados:
+        if fila["n_tramos"]:
+            print(f"{fila['archivo']:<60}{fila['n_tramos']:>7}{fila['tau_s']:>14.6g}"
+                  f"{fila['tau_desvio_s']:>12.3g}{fila['amplitud']:>10.4f}")
+        else:
+            print(f"{fila['archivo']:<60}{0:>7}   sin tramos")
+    if len(sys.argv) > 2:
+        guardar_tabla(resultados, sys.argv[2])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Estabilidad de series de relaciones del puente: desviación de Allan solapada, desviación
+de Allan modificada y deriva lineal/cuadrática.
+
+Todo se calcula sobre la suma acumulada X de la serie (X[k] = y[0] + ... + y[k-1]):
+el promedio de m lecturas que empieza en k es (X[k+m] - X[k]) / m, así que para cada
+tau = m*tau0 las diferencias entre promedios vecinos salen de tres vistas desplazadas
+de X, sin lazos por ventana: O(n) por tau. La varianza modificada suma a su vez
+ventanas de m de esas diferencias con otra suma acumulada.
+
+AllanIncremental guarda solo las sumas de cuadrados y la cola de X necesaria para el
+tau más largo, así que se puede ir alimentando mientras la corrida avanza:
+
+    allan = AllanIncremental(m_octavas(10**6), tau0=10.0, relativa=True)
+    allan.agregar(bloque_de_relaciones)
+    allan.resultado()   # {"tau", "adev", "mdev", "n_adev", "n_mdev"}
+
+    python Pruebas/Allan.py Medicion_2025-06-01_000.csv [tau0_s]
+"""
+import os
+import sys
+import csv
+import numpy as np
+
+
+def m_octavas(n, maximo=None):
+    """Factores de promediado 1, 2, 4, ... válidos para una serie de n lecturas (3m <= n)."""
+    tope = n // 3 if maximo is None else min(maximo, n // 3)
+    m = []
+    k = 1
+    while k <= tope:
+        m.append(k)
+        k *= 2
+    return np.array(m, dtype=int)
+
+
+class AllanIncremental:
+    """
+    Varianzas de Allan solapada y modificada para los factores `m` (tau = m*tau0).
+    relativa=True divide las desviaciones por el primer valor (p.ej. x1e6 para ppm).
+    La memoria es O(max(m)), independiente del largo de la serie.
+    """
+
+    def __init__(self, m, tau0=1.0, relativa=False):
+        self.m = np.unique(np.asarray(m, dtype=int))
+        if self.m.size == 0 or self.m[0] < 1:
+            raise ValueError("Los factores m deben ser enteros >= 1.")
+        self.tau0 = float(tau0)
+        self.relativa = relativa
+        self.n = 0
+        self.referencia = None
+        # Cola de X: alcanza con 3*max(m) valores para las ventanas de la modificada
+        self._largo_cola = 3 * int(self.m[-1]) + 1
+        self._cola = np.zeros(1)
+        self._suma_a = np.zeros(self.m.size)
+        self._n_a = np.zeros(self.m.size, dtype=np.int64)
+        self._suma_m = np.zeros(self.m.size)
+        self._n_m = np.zeros(self.m.size, dtype=np.int64)
+
+    def agregar(self, valores):
+        """Agrega un bloque de lecturas (o una sola). Costo O(len(bloque) + max(m)) por factor."""
+        y = np.atleast_1d(np.asarray(valores, dtype=float))
+        if y.size == 0:
+            return self
+        if self.referencia is None:
+            self.referencia = float(y[0])
+        # Se resta la primera lectura: X queda chico y no se pierde resolución en las diferencias
+        nuevos = self._cola[-1] + np.cumsum(y - self.referencia)
+        x = np.concatenate((self._cola, nuevos))
+        k = nuevos.size
+        for i, m in enumerate(self.m):
+            if x.size <= 2 * m:
+                continue
+            d = x[2 * m:] - 2.0 * x[m:-m] + x[:-2 * m]
+            nuevas = min(k, d.size)
+            self._suma_a[i] += np.dot(d[-nuevas:], d[-nuevas:])
+            self._n_a[i] += nuevas
+            if d.size < m:
+                continue
+            acumulada = np.concatenate(([0.0], np.cumsum(d)))
+            ventanas = acumulada[m:] - acumulada[:-m]
+            nuevas = min(k, ventanas.size)
+            self._suma_m[i] += np.dot(ventanas[-nuevas:], ventanas[-nuevas:])
+            self._n_m[i] += nuevas
+        self._cola = x[-self._largo_cola:]
+        self.n += y.size
+        return self
+
+    def resultado(self):
+        """tau, adev y mdev (NaN donde todavía no hay datos) y la cantidad de términos de cada una."""
+        m = self.m.astype(float)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            adev = np.sqrt(self._suma_a / self._n_a / (2.0 * m ** 2))
+            mdev = np.sqrt(self._suma_m / self._n_m / (2.0 * m ** 4))
+        if self.relativa and self.referencia:
+            adev = adev / abs(self.referencia)
+            mdev = mdev / abs(self.referencia)
+        return {"tau": m * self.tau0, "adev": adev, "mdev": mdev,
+                "n_adev": self._n_a.copy(), "n_mdev": self._n_m.copy()}
+
+
+def allan(y, tau0=1.0, m=None, relativa=False):
+    """Desviaciones de Allan solapada y modificada de una serie completa (ver AllanIncremental)."""
+    y = np.asarray(y, dtype=float)
+    if m is None:
+        m = m_octavas(y.size)
+    return AllanIncremental(m, tau0, relativa).agregar(y).resultado()
+
+
+# ---------------------
+# Deriva
+# ---------------------
+def _ajustar(sumas_t, sumas_ty, syy, n, grado):
+    """Mínimos cuadrados a partir de los momentos: devuelve coeficientes, covarianza y desvío residual."""
+    normal = np.array([[sumas_t[i + j] for j in range(grado + 1)] for i in range(grado + 1)])
+    b = np.array(sumas_ty[:grado + 1])
+    coef = np.linalg.solve(normal, b)
+    rss = max(syy - coef @ b, 0.0)
+    gl = n - (grado + 1)
+    s2 = rss / gl if gl > 0 else np.nan
+    return coef, s2 * np.linalg.inv(normal), np.sqrt(s2)
+
+
+class DerivaIncremental:
+    """
+    Deriva polinómica (grado 1 o 2) acumulando momentos: memoria constante.
+    Los tiempos se toman relativos al primero y los valores relativos al primer valor.
+    resultado() devuelve coeficientes en potencias crecientes de (t - t_inicio):
+    c0 (valor en t_inicio), c1 (deriva por unidad de t) y c2, con sus incertidumbres.
+    """
+
+    def __init__(self, grado=1):
+        if grado not in (1, 2):
+            raise ValueError("grado debe ser 1 (lineal) o 2 (cuadrática)")
+        self.grado = grado
+        self.n = 0
+        self.t_inicio = None
+        self.referencia = None
+        self._t = np.zeros(2 * grado + 1)
+        self._ty = np.zeros(grado + 1)
+        self._yy = 0.0
+
+    def agregar(self, t, y):
+        t = np.atleast_1d(np.asarray(t, dtype=float))
+        y = np.atleast_1d(np.asarray(y, dtype=float))
+        if t.shape != y.shape:
+            raise ValueError("t e y deben tener el mismo largo.")
+        if t.size == 0:
+            return self
+        if self.t_inicio is None:
+            self.t_inicio = float(t[0])
+            self.referencia = float(y[0])
+        t = t - self.t_inicio
+        y = y - self.referencia
+        potencia = np.ones_like(t)
+        for k in range(2 * self.grado + 1):
+            self._t[k] += potencia.sum()
+            if k <= self.grado:
+                self._ty[k] += np.dot(potencia, y)
+            potencia = potencia * t
+        self._yy += np.dot(y, y)
+        self.n += t.size
+        return self
+
+    def resultado(self):
+        if self.n <= self.grado + 1:
+            raise ValueError("Faltan lecturas para ajustar la deriva.")
+        # Escala de t para que la matriz normal quede bien condicionada
+        escala = (self._t[2] / self._t[0]) ** 0.5 or 1.0
+        potencias = escala ** np.arange(2 * self.grado + 1)
+        coef, cov, residuo = _ajustar(self._t / potencias, self._ty / potencias[:self.grado + 1],
+                                      self._yy, self.n, self.grado)
+        factor = escala ** np.arange(self.grado + 1)
+        coef = coef / factor
+        incert = np.sqrt(np.diag(cov)) / factor
+        coef[0] += self.referencia
+        return {"t_inicio": self.t_inicio, "coeficientes": coef, "incertidumbres": incert,
+                "deriva": coef[1], "deriva_incertidumbre": incert[1], "desvio_residual": residuo,
+                "n": self.n}
+
+
+def deriva(y, t=None, grado=1):
+    """Deriva lineal (grado=1) o cuadrática (grado=2) de una serie; t por defecto 0, 1, 2, ..."""
+    y = np.asarray(y, dtype=float)
+    t = np.arange(y.size, dtype=float) if t is None else np.asarray(t, dtype=float)
+    return DerivaIncremental(grado).agregar(t, y).resultado()
+
+
+# ---------------------
+# Uso desde la línea de comandos
+# ---------------------
+def leer_relaciones(ruta, columna="ratio"):
+    """Columna de relaciones de un CSV de resultados (ver Registro.RegistroResultados)."""
+    with open(ruta, newline="", encoding="utf-8") as f:
+        return np.array([float(fila[columna]) for fila in csv.DictReader(f) if fila.get(columna)])
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(f"Uso: python {os.path.basename(__file__)} resultados.csv [tau0_s]")
+        return
+    y = leer_relaciones(sys.argv[1])
+    tau0 = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    res = allan(y, tau0=tau0, relativa=True)
+    print(f"{len(y)} relaciones, media {y.mean():.10f}")
+    print(f"{'tau s':>12}{'ADEV ppm':>14}{'MDEV ppm':>14}")
+    for tau, a, m in zip(res["tau"], res["adev"], res["mdev"]):
+        print(f"{tau:>12.6g}{a * 1e6:>14.6g}{m * 1e6:>14.6g}")
+    for grado, nombre in ((1, "lineal"), (2, "cuadrática")):
+        d = deriva(y, np.arange(y.size) * tau0, grado)
+        print(f"Deriva {nombre}: {d['deriva'] / y.mean() * 1e6:.6g} ± "
+              f"{d['deriva_incertidumbre'] / y.mean() * 1e6:.2g} ppm/s (en t_inicio)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Tiempo de arranque en frío de la interfaz y de las corridas sin ventana.
+
+Cada escenario se corre `repeticiones` veces en un proceso nuevo; se informa el mínimo
+y la mediana del tiempo total y qué módulos pesados (pyvisa, NumPy, matplotlib) quedaron
+importados al terminar. "python" es el piso: arrancar el intérprete sin hacer nada.
+La interfaz se abre con ESCANER_SALIR_AL_INICIAR=1 (se cierra apenas se dibuja) y se
+saltea si no hay pantalla.
+
+    python Pruebas/Benchmark_Arranque.py [repeticiones] [--csv datos/arranque.csv]
+
+Con --csv se agrega una fila por escenario, para seguir la evolución entre versiones.
+"""
+import os
+import sys
+import csv
+import json
+import time
+import statistics
+import subprocess
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PESADOS = ("pyvisa", "numpy", "matplotlib")
+MARCA = "@@modulos@@"
+
+# nombre -> (script relativo a la raíz o None, código a correr)
+ESCENARIOS = {
+    "python": (None, "pass"),
+    "paquete": (None, "import Instrumental"),
+    "puente": (None, "import Instrumental; Instrumental.MI60100"),
+    "scanner": (None, "import Instrumental; Instrumental.ScannerInti"),
+    "campania_cli": ("Pruebas/Campania.py", None),
+    "plan_cli": ("Pruebas/Plan_Medicion.py", None),
+    "interfaz": ("Interface.py", None),
+}
+
+# Corre el escenario y al final informa los módulos pesados cargados
+_ENVOLTORIO = """
+import sys, json, runpy
+try:
+    if {script!r}:
+        sys.path[0] = {carpeta!r}
+        sys.argv = [{script!r}]
+        runpy.run_path({script!r}, run_name="__main__")
+    else:
+        sys.path.insert(0, {raiz!r})
+        exec({codigo!r})
+finally:
+    print({marca!r} + json.dumps([m for m in {pesados!r} if m in sys.modules]))
+"""
+
+
+def correr(nombre, repeticiones=5):
+    """Devuelve {"tiempos": [...], "modulos": [...]} o {"error": texto} si el escenario falla."""
+    script, codigo = ESCENARIOS[nombre]
+    ruta = os.path.join(RAIZ, script) if script else ""
+    programa = _ENVOLTORIO.format(script=ruta, carpeta=os.path.dirname(ruta), raiz=RAIZ, codigo=codigo,
+                                  marca=MARCA, pesados=PESADOS)
+    entorno = dict(os.environ, ESCANER_SALIR_AL_INICIAR="1")
+    tiempos, modulos = [], []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        proceso = subprocess.run([sys.executable, "-c", programa], cwd=RAIZ, env=entorno,
+                                 capture_output=True, text=True)
+        tiempos.append(time.perf_counter() - t0)
+        if proceso.returncode != 0:
+            ultima = (proceso.stderr.strip().splitlines() or ["código %d" % proceso.returncode])[-1]
+            return {"error": ultima}
+        for linea in proceso.stdout.splitlines():
+            if linea.startswith(MARCA):
+                modulos = json.loads(linea[len(MARCA):])
+    return {"tiempos": tiempos, "modulos": modulos}
+
+
+def main():
+    argumentos = sys.argv[1:]
+    ruta_csv = None
+    if "--csv" in argumentos:
+        i = argumentos.index("--csv")
+        ruta_csv = argumentos[i + 1]
+        del argumentos[i:i + 2]
+    repeticiones = int(argumentos[0]) if argumentos else 5
+
+    filas = []
+    print(f"{'escenario':<14}{'mín ms':>9}{'mediana ms':>12}  módulos pesados")
+    for nombre in ESCENARIOS:
+        resultado = correr(nombre, repeticiones)
+        if "error" in resultado:
+            print(f"{nombre:<14}{'-':>9}{'-':>12}  [salteado] {resultado['error']}")
+            continue
+        minimo = min(resultado["tiempos"]) * 1e3
+        mediana = statistics.median(resultado["tiempos"]) * 1e3
+        print(f"{nombre:<14}{minimo:>9.0f}{mediana:>12.0f}  {', '.join(resultado['modulos']) or '-'}")
+        filas.append({"timestamp": datetime.now().isoformat(timespec="seconds"), "escenario": nombre,
+                      "repeticiones": repeticiones, "min_ms": round(minimo, 1), "mediana_ms": round(mediana, 1),
+                      "modulos": " ".join(resultado["modulos"])})
+
+    if ruta_csv and filas:
+        nuevo = not os.path.exists(ruta_csv)
+        with open(ruta_csv, "a", newline="", encoding="utf-8") as f:
+            escritor = csv.DictWriter(f, fieldnames=list(filas[0]))
+            if nuevo:
+                escritor.writeheader()
+            escritor.writerows(filas)
+        print(f"[INFO] Resultados agregados a {ruta_csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""
+Campaña de calibración de varios resistores sin operador: scanner INTI + puente MI60100.
+
+Cada trabajo es un par (Rx, Rs, Ix) conectado en los canales (canal_s, canal_x) del
+scanner. El orden de ejecución se elige para cambiar la corriente lo menos posible
+(cada cambio de Ix reinicia el autocalentamiento) y, dentro de la misma corriente,
+para mover la menor cantidad de relés (ver ScannerInti.CostoTransicion).
+
+El progreso se guarda en un checkpoint JSON después de cada trabajo: si la campaña se
+corta, al volver a correrla con el mismo checkpoint se saltean los trabajos ya hechos.
+El resumen de cada trabajo se agrega además a un CSV (Registro.RegistroResultados).
+
+    python Pruebas/Campania.py campania.json [--simulado]
+
+campania.json: {"trabajos": [{"nombre": "R1", "Rx": 1, "Rs": 1, "Ix": 0.001,
+                              "canal_s": 1, "canal_x": 2, "n_medidas": 50, "n_stats": 10,
+                              "t": 5, "objetivo_ppm": 0.05}, ...]}
+"""
+import os
+import sys
+import json
+import time
+from datetime import datetime
+# Hay que poner esto para que me tome el paquete Instrumental
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyvisa
+
+from Instrumental import lector_multimetro
+from Instrumental.Scanner import ScannerInti
+from Instrumental.MI6010D import MI60100Error
+from Medida import Medida
+from Registro import RegistroResultados
+
+# Costo de un cambio de corriente frente a una operación de relé (es mucho más caro:
+# hay que esperar que los resistores vuelvan a asentarse)
+PESO_CORRIENTE = 100
+
+CAMPOS_RESUMEN = ["timestamp", "nombre", "Rx", "Rs", "Ix", "canal_s", "canal_x", "n", "rel_prom",
+                  "media", "desvio", "incertidumbre_ppm", "asentamiento_s", "objetivo_alcanzado",
+                  "t_scanner_s", "t_medicion_s", "t_total_s", "error"]
+
+
+def campos_resumen(canales_termometros=()):
+    """CAMPOS_RESUMEN más las temperaturas al inicio y al final de cada trabajo."""
+    return CAMPOS_RESUMEN + [f"T_{canal}_{momento}" for canal in canales_termometros
+                             for momento in ("inicio", "fin")]
+
+
+class Trabajo:
+    """Un par a medir. canal=(canal_s, canal_x) es un atajo para los dos canales."""
+
+    def __init__(self, Rx, Rs, Ix, canal_s=None, canal_x=None, canal=None, nombre=None, t=5,
+                 n_medidas=50, n_stats=10, objetivo_ppm=None, asentamiento=False):
+        if canal is not None:
+            canal_s, canal_x = canal
+        self.Rx = Rx
+        self.Rs = Rs
+        self.Ix = Ix
+        self.canal_s = canal_s
+        self.canal_x = canal_x
+        self.t = t
+        self.n_medidas = n_medidas
+        self.n_stats = n_stats
+        self.objetivo_ppm = objetivo_ppm
+        self.asentamiento = asentamiento
+        self.nombre = nombre or f"Rx{Rx}_Rs{Rs}_Ix{Ix}_S{canal_s}_X{canal_x}"
+
+    @property
+    def canales(self):
+        return (self.canal_s, self.canal_x)
+
+    @classmethod
+    def desde_dict(cls, datos):
+        return cls(**datos)
+
+    def a_dict(self):
+        return dict(nombre=self.nombre, Rx=self.Rx, Rs=self.Rs, Ix=self.Ix, canal_s=self.canal_s,
+                    canal_x=self.canal_x, t=self.t, n_medidas=self.n_medidas, n_stats=self.n_stats,
+                    objetivo_ppm=self.objetivo_ppm, asentamiento=self.asentamiento)
+
+
+def cargar_trabajos(ruta):
+    with open(ruta, encoding="utf-8") as f:
+        datos = json.load(f)
+    trabajos = [Trabajo.desde_dict(t) for t in (datos["trabajos"] if isinstance(datos, dict) else datos)]
+    nombres = [t.nombre for t in trabajos]
+    if len(set(nombres)) != len(nombres):
+        raise ValueError("Los nombres de los trabajos deben ser únicos (se usan en el checkpoint).")
+    return trabajos
+
+
+def costo(desde_canales, desde_ix, trabajo, costo_reles):
+    """Costo de pasar del estado (canales, Ix) al trabajo: relés + PESO_CORRIENTE por cambio de Ix."""
+    return costo_reles(desde_canales, trabajo.canales) + PESO_CORRIENTE * (desde_ix != trabajo.Ix)
+
+
+def planificar(trabajos, costo_reles, canales_iniciales=(None, None), ix_inicial=None):
+    """
+    Orden de ejecución por vecino más cercano con el costo combinado corriente + relés
+    (costo_reles: p.ej. ScannerInti.CostoTransicion). Ante empate se conserva el orden de la lista.
+    """
+    canales, ix = canales_iniciales, ix_inicial
+    pendientes = list(trabajos)
+    plan = []
+    while pendientes:
+        i = min(range(len(pendientes)), key=lambda k: costo(canales, ix, pendientes[k], costo_reles))
+        trabajo = pendientes.pop(i)
+        plan.append(trabajo)
+        canales, ix = trabajo.canales, trabajo.Ix
+    return plan
+
+
+class Checkpoint:
+    """Resultados de los trabajos terminados, persistidos con escritura atómica (tmp + rename)."""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.hechos = {}
+        if ruta and os.path.exists(ruta):
+            with open(ruta, encoding="utf-8") as f:
+                self.hechos = json.load(f).get("hechos", {})
+
+    def __contains__(self, nombre):
+        return nombre in self.hechos
+
+    def marcar(self, nombre, resumen):
+        self.hechos[nombre] = resumen
+        if not self.ruta:
+            return
+        temporal = self.ruta + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump({"actualizado": datetime.now().isoformat(), "hechos": self.hechos}, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, self.ruta)
+
+
+class Campania:
+    """
+    Corre una lista de Trabajo con un scanner y una Medida ya abiertos.
+    checkpoint: ruta del JSON de progreso (None = sin checkpoint).
+    registro: RegistroResultados opcional para el resumen por trabajo.
+    registro_lecturas: destino opcional de cada reporte del puente (cualquier objeto con
+    agregar(fila), p.ej. otro RegistroResultados o la cola de la interfaz).
+    termometros: dict canal -> multímetro ya configurado; cada uno se lee al empezar y al
+    terminar cada trabajo (T_<canal>_inicio / T_<canal>_fin, ver campos_resumen).
+    Un error del puente, un timeout de cualquier instrumento o un trabajo que junta menos de
+    n_medidas sin llegar al objetivo quedan en resumen["error"]: el trabajo no se marca en el
+    checkpoint y la campaña sigue con el próximo.
+    """
+
+    def __init__(self, scanner, medida, checkpoint=None, registro=None, registro_lecturas=None, verbose=True,
+                 termometros=None):
+        self.scanner = scanner
+        self.medida = medida
+        self.termometros = termometros or {}
+        self.checkpoint = Checkpoint(checkpoint)
+        self.registro = registro
+        self.registro_lecturas = registro_lecturas
+        self.verbose = verbose
+
+    def planificar(self, trabajos):
+        pendientes = [t for t in trabajos if t.nombre not in self.checkpoint]
+        estado = (self.scanner.Estado(self.scanner.SALIDA_1), self.scanner.Estado(self.scanner.SALIDA_2))
+        return planificar(pendientes, self.scanner.CostoTransicion, estado, self.medida.ix_actual)
+
+    def ejecutar_trabajo(self, trabajo):
+        t0 = time.perf_counter()
+        self.scanner.MoverA(ScannerInti.DireccionGPIB, trabajo.canal_s, trabajo.canal_x)
+        t1 = time.perf_counter()
+        resumen = {"timestamp": datetime.now().isoformat(), **trabajo.a_dict(), "error": None}
+        try:
+            self._leer_temperaturas(resumen, "inicio")
+            self.medida.bridge.send_rx_value(trabajo.Rx)
+            if trabajo.objetivo_ppm is not None:
+                resultado = self.medida.medir_hasta_incertidumbre(
+                    trabajo.Rs, trabajo.Ix, trabajo.t, trabajo.objetivo_ppm, trabajo.n_medidas,
+                    trabajo.n_stats, registro=self.registro_lecturas, asentamiento=trabajo.asentamiento or None)
+            else:
+                resultado = self.medida.medir(trabajo.Rs, trabajo.Ix, trabajo.t, trabajo.n_medidas,
+                                              trabajo.n_stats, registro=self.registro_lecturas,
+                                              asentamiento=trabajo.asentamiento or None)
+            estadistica = resultado["estadistica"]
+            asentamiento = resultado["asentamiento"] or {}
+            resumen.update(n=resultado["n"], rel_prom=resultado["rel_prom"], media=estadistica["media"],
+                           desvio=estadistica["desvio"], incertidumbre_ppm=estadistica["incertidumbre_ppm"],
+                           asentamiento_s=asentamiento.get("tiempo_s"),
+                           objetivo_alcanzado=resultado["objetivo_alcanzado"], error=resultado["error"])
+            if resumen["error"] is None and not resultado["objetivo_alcanzado"] \
+                    and resultado["n"] < trabajo.n_medidas:
+                resumen["error"] = f"Se leyeron {resultado['n']} de {trabajo.n_medidas} reportes."
+            self._leer_temperaturas(resumen, "fin")
+        except (MI60100Error, pyvisa.errors.VisaIOError) as e:
+            resumen["error"] = str(e)
+        if resumen["error"] is not None:
+            self._detener_puente()
+        t2 = time.perf_counter()
+        resumen.update(t_scanner_s=t1 - t0, t_medicion_s=t2 - t1, t_total_s=t2 - t0)
+        return resumen
+
+    def _leer_temperaturas(self, resumen, momento):
+        for canal, multimetro in self.termometros.items():
+            resumen[f"T_{canal}_{momento}"] = lector_multimetro(multimetro)()
+
+    def _detener_puente(self):
+        """Tras un error deja el puente en standby para que el próximo trabajo arranque limpio."""
+        try:
+            self.medida.bridge.standby()
+        except (MI60100Error, pyvisa.errors.VisaIOError) as e:
+            if self.verbose:
+                print(f"[ERROR] No se pudo poner el puente en standby: {e}")
+
+    def ejecutar(self, trabajos, callback=None):
+        """
+        Ejecuta los trabajos pendientes en el orden planificado. Devuelve los resúmenes de esta corrida.
+        callback(i, total, resumen) se llama al terminar cada trabajo.
+        """
+        plan = self.planificar(trabajos)
+        hechos = len(trabajos) - len(plan)
+        if self.verbose and hechos:
+            print(f"[INFO] Retomando campaña: {hechos} trabajos ya hechos según el checkpoint.")
+        resumenes = []
+        for i, trabajo in enumerate(plan):
+            if self.verbose:
+                print(f"[{i+1}/{len(plan)}] {trabajo.nombre}: Ix={trabajo.Ix} canales {trabajo.canales}")
+            resumen = self.ejecutar_trabajo(trabajo)
+            resumenes.append(resumen)
+            if self.registro is not None:
+                self.registro.agregar(resumen)
+            # Un trabajo con error no se marca: se reintenta al retomar y la campaña sigue con el próximo
+            if resumen["error"] is None:
+                self.checkpoint.marcar(trabajo.nombre, resumen)
+            elif self.verbose:
+                print(f"[ERROR] {trabajo.nombre}: {resumen['error']}")
+            if callback is not None:
+                callback(i, len(plan), resumen)
+        return resumenes
+
+
+def imprimir_resumen(resumenes):
+    print(f"{'trabajo':<30}{'n':>6}{'rel_prom':>18}{'unc ppm':>10}{'scanner s':>11}{'medición s':>12}")
+    for r in resumenes:
+        rel = f"{r['rel_prom']:.10f}" if r.get("rel_prom") is not None else "-"
+        unc = f"{r['incertidumbre_ppm']:.3g}" if r.get("incertidumbre_ppm") is not None else "-"
+        print(f"{r['nombre']:<30}{r.get('n') or 0:>6}{rel:>18}{unc:>10}{r['t_scanner_s']:>11.3f}"
+              f"{r['t_medicion_s']:>12.3f}")
+    print(f"Total: {sum(r['t_total_s'] for r in resumenes):.1f} s")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(f"Uso: python {os.path.basename(__file__)} campania.json [--simulado]")
+        return
+    ruta = sys.argv[1]
+    trabajos = cargar_trabajos(ruta)
+    base = os.path.splitext(ruta)[0]
+    rm = None
+    if "--simulado" in sys.argv:
+        from Instrumental.Simulado import ResourceManagerSimulado
+        rm = ResourceManagerSimulado(escala_tiempo=0.001)
+    scanner = ScannerInti(rm=rm)
+    medida = Medida(verbose=False, rm=rm)
+    try:
+        with RegistroResultados(base + "_resultados", CAMPOS_RESUMEN) as registro:
+            campania = Campania(scanner, medida, checkpoint=base + "_checkpoint.json", registro=registro)
+            imprimir_resumen(campania.ejecutar(trabajos))
+    finally:
+        scanner.ResetGeneral(ScannerInti.DireccionGPIB)
+        medida.close()
+
+
+if __name__ == "__main__":
+    main()
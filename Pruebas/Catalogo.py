@@ -0,0 +1,226 @@
+import os
+import re
+import sys
+import time
+import sqlite3
+import hashlib
+# Hay que poner esto para que me tome el paquete Instrumental
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Instrumental.Captura import EXTENSION, leer_texto, abrir_captura
+
+# Carpeta de datos del repositorio y ubicación por defecto del catálogo
+CARPETA_DATOS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "datos")
+RUTA_CATALOGO = os.path.join(CARPETA_DATOS, "catalogo.sqlite")
+
+_FECHA_NOMBRE = re.compile(r"(\d{4}-\d{2}-\d{2})_(\d{2})-(\d{2})-(\d{2})")
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS capturas (
+    ruta        TEXT PRIMARY KEY,
+    carpeta     TEXT,
+    formato     TEXT,
+    mtime       REAL,
+    tamano      INTEGER,
+    hash        TEXT,
+    fecha       TEXT,
+    temp        REAL,
+    humedad     REAL,
+    v_maxima    REAL,
+    v_minima    REAL,
+    sweep_time  REAL,
+    n           INTEGER,
+    media       REAL,
+    desvio      REAL,
+    minimo      REAL,
+    maximo      REAL,
+    indexado    REAL
+);
+CREATE INDEX IF NOT EXISTS idx_capturas_fecha ON capturas (fecha);
+CREATE INDEX IF NOT EXISTS idx_capturas_temp ON capturas (temp);
+CREATE INDEX IF NOT EXISTS idx_capturas_carpeta ON capturas (carpeta);
+"""
+
+# Filtros de buscar(): argumento -> (columna, operador)
+_FILTROS = {
+    "carpeta": ("carpeta", "="),
+    "formato": ("formato", "="),
+    "desde": ("fecha", ">="),
+    "hasta": ("fecha", "<="),
+    "temp_min": ("temp", ">="),
+    "temp_max": ("temp", "<="),
+    "humedad_min": ("humedad", ">="),
+    "humedad_max": ("humedad", "<="),
+    "v_maxima_min": ("v_maxima", ">="),
+    "v_maxima_max": ("v_maxima", "<="),
+    "v_minima_min": ("v_minima", ">="),
+    "v_minima_max": ("v_minima", "<="),
+    "sweep_time": ("sweep_time", "="),
+}
+
+
+def _hash(ruta):
+    h = hashlib.sha1()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def _fecha_iso(metadatos, nombre):
+    """Fecha del encabezado ('2025-05-30/12:04:45') o, si no hay, la del nombre del archivo."""
+    fecha = metadatos.get("fecha")
+    if isinstance(fecha, str) and fecha:
+        return fecha.replace("/", "T")
+    m = _FECHA_NOMBRE.search(nombre)
+    return f"{m.group(1)}T{m.group(2)}:{m.group(3)}:{m.group(4)}" if m else None
+
+
+class Catalogo:
+    """
+    Índice SQLite del archivo de capturas (datos/**/Medicion_*.txt y .cap).
+
+    actualizar() recorre la carpeta y solo vuelve a leer los archivos nuevos o cambiados
+    (mtime/tamaño distintos y hash distinto); buscar() consulta sin tocar los archivos:
+
+        cat = Catalogo()
+        cat.actualizar()
+        cat.buscar(carpeta="Carga", temp_min=24, desde="2025-05-01")
+    """
+
+    def __init__(self, ruta=RUTA_CATALOGO, carpeta_datos=CARPETA_DATOS):
+        self.ruta = ruta
+        self.carpeta_datos = carpeta_datos
+        self.conexion = sqlite3.connect(ruta)
+        self.conexion.row_factory = sqlite3.Row
+        self.conexion.executescript(_ESQUEMA)
+
+    def close(self):
+        self.conexion.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _archivos(self):
+        """Capturas bajo la carpeta; si un .txt ya fue convertido se indexa solo su .cap."""
+        for raiz, _, nombres in os.walk(self.carpeta_datos):
+            presentes = set(nombres)
+            for nombre in nombres:
+                base, ext = os.path.splitext(nombre)
+                if "Medicion_" not in nombre or ext not in (".txt", EXTENSION):
+                    continue
+                if ext == ".txt" and base + EXTENSION in presentes:
+                    continue
+                yield os.path.join(raiz, nombre)
+
+    def _leer(self, ruta):
+        if ruta.endswith(EXTENSION):
+            captura = abrir_captura(ruta)
+            return captura.voltajes(), dict(captura.metadatos)
+        return leer_texto(ruta)
+
+    def _registro(self, ruta, estado, huella):
+        valores, metadatos = self._leer(ruta)
+        relativa = os.path.relpath(ruta, self.carpeta_datos)
+        n = len(valores)
+        return {
+            "ruta": relativa,
+            "carpeta": os.path.dirname(relativa),
+            "formato": os.path.splitext(ruta)[1].lstrip("."),
+            "mtime": estado.st_mtime,
+            "tamano": estado.st_size,
+            "hash": huella,
+            "fecha": _fecha_iso(metadatos, os.path.basename(ruta)),
+            "temp": metadatos.get("temp"),
+            "humedad": metadatos.get("humedad"),
+            "v_maxima": metadatos.get("v_maxima"),
+            "v_minima": metadatos.get("v_minima"),
+            "sweep_time": metadatos.get("sweep_time"),
+            "n": n,
+            "media": float(valores.mean()) if n else None,
+            "desvio": float(valores.std()) if n else None,
+            "minimo": float(valores.min()) if n else None,
+            "maximo": float(valores.max()) if n else None,
+            "indexado": time.time(),
+        }
+
+    def actualizar(self, verbose=False):
+        """Indexa lo nuevo o modificado y borra lo que ya no existe. Devuelve (nuevos/cambiados, borrados)."""
+        conocidos = {fila["ruta"]: fila for fila in self.conexion.execute(
+            "SELECT ruta, mtime, tamano, hash FROM capturas")}
+        vistos = set()
+        cambiados = 0
+        for ruta in self._archivos():
+            relativa = os.path.relpath(ruta, self.carpeta_datos)
+            vistos.add(relativa)
+            estado = os.stat(ruta)
+            previo = conocidos.get(relativa)
+            if previo is not None and previo["mtime"] == estado.st_mtime and previo["tamano"] == estado.st_size:
+                continue
+            huella = _hash(ruta)
+            if previo is not None and previo["hash"] == huella:
+                # Solo cambió la fecha de modificación (copia, touch): no se vuelve a leer
+                self.conexion.execute("UPDATE capturas SET mtime = ?, tamano = ? WHERE ruta = ?",
+                                      (estado.st_mtime, estado.st_size, relativa))
+                continue
+            try:
+                registro = self._registro(ruta, estado, huella)
+            except (ValueError, OSError) as e:
+                print(f"[ERROR] No se pudo indexar {ruta}: {e}")
+                continue
+            columnas = ", ".join(registro)
+            marcas = ", ".join("?" for _ in registro)
+            self.conexion.execute(f"INSERT OR REPLACE INTO capturas ({columnas}) VALUES ({marcas})",
+                                  tuple(registro.values()))
+            cambiados += 1
+            if verbose:
+                print(f"[INFO] Indexado: {relativa}")
+        borrados = set(conocidos) - vistos
+        self.conexion.executemany("DELETE FROM capturas WHERE ruta = ?", [(r,) for r in borrados])
+        self.conexion.commit()
+        return cambiados, len(borrados)
+
+    def buscar(self, orden="fecha", limite=None, **filtros):
+        """
+        Capturas que cumplen los filtros (ver _FILTROS: carpeta, desde/hasta en ISO,
+        temp_min/max, humedad_min/max, v_maxima_min/max, v_minima_min/max, sweep_time).
+        Un hasta con solo la fecha ('2025-05-30') incluye todo ese día.
+        Devuelve una lista de dicts con la ruta absoluta y los campos del índice.
+        """
+        condiciones, parametros = [], []
+        for clave, valor in filtros.items():
+            if valor is None:
+                continue
+            if clave not in _FILTROS:
+                raise ValueError(f"Filtro '{clave}' no soportado.")
+            columna, operador = _FILTROS[clave]
+            if clave == "hasta" and len(str(valor)) == len("AAAA-MM-DD"):
+                # Solo fecha: incluye todas las capturas de ese día
+                valor = f"{valor}T23:59:59"
+            condiciones.append(f"{columna} {operador} ?")
+            parametros.append(valor)
+        if orden not in ("ruta", "fecha", "temp", "humedad", "n"):
+            raise ValueError(f"Orden '{orden}' no soportado.")
+        consulta = "SELECT * FROM capturas"
+        if condiciones:
+            consulta += " WHERE " + " AND ".join(condiciones)
+        consulta += f" ORDER BY {orden}"
+        if limite is not None:
+            consulta += f" LIMIT {int(limite)}"
+        resultados = []
+        for fila in self.conexion.execute(consulta, parametros):
+            registro = dict(fila)
+            registro["ruta_absoluta"] = os.path.join(self.carpeta_datos, registro["ruta"])
+            resultados.append(registro)
+        return resultados
+
+
+if __name__ == "__main__":
+    with Catalogo() as catalogo:
+        cambiados, borrados = catalogo.actualizar(verbose=True)
+        print(f"[INFO] {cambiados} capturas indexadas, {borrados} eliminadas del índice.")
+        for registro in catalogo.buscar():
+            print(f"{registro['fecha']}  {registro['ruta']:<55} T={registro['temp']}  n={registro['n']}")
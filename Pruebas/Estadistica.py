@@ -0,0 +1,199 @@
+"""
+Estadística en línea para corridas largas del puente: memoria constante y O(1) por lectura.
+"""
+import math
+import time
+import numpy as np
+
+
+class EstadisticaOnline:
+    """
+    Acumulador de lecturas sin guardar la serie:
+    - media y varianza de toda la corrida (algoritmo de Welford, estable numéricamente)
+    - mínimo y máximo
+    - ventana circular de las últimas `n_ventana` lecturas, igual que la ventana J de
+      estadísticas del 60100 (2..50), con su media, desvío e incertidumbre tipo A.
+
+        est = EstadisticaOnline(n_ventana=10)
+        est.agregar(1.0000012)
+        est.media, est.desvio, est.media_ventana(), est.incertidumbre_ppm()
+    """
+
+    def __init__(self, n_ventana=10):
+        if n_ventana < 1:
+            raise ValueError("n_ventana debe ser >= 1")
+        self.n_ventana = int(n_ventana)
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.n = 0
+        self.media = 0.0
+        self._m2 = 0.0
+        self.minimo = math.inf
+        self.maximo = -math.inf
+        self.ultimo = None
+        self._ventana = np.empty(self.n_ventana)
+        self._siguiente = 0
+
+    def agregar(self, valor):
+        valor = float(valor)
+        self.n += 1
+        delta = valor - self.media
+        self.media += delta / self.n
+        self._m2 += delta * (valor - self.media)
+        if valor < self.minimo:
+            self.minimo = valor
+        if valor > self.maximo:
+            self.maximo = valor
+        self.ultimo = valor
+        self._ventana[self._siguiente] = valor
+        self._siguiente = (self._siguiente + 1) % self.n_ventana
+
+    # ---------------------
+    # Toda la corrida
+    # ---------------------
+    @property
+    def varianza(self):
+        """Varianza muestral (n-1) de toda la corrida; NaN con menos de 2 lecturas."""
+        return self._m2 / (self.n - 1) if self.n > 1 else math.nan
+
+    @property
+    def desvio(self):
+        return math.sqrt(self.varianza) if self.n > 1 else math.nan
+
+    # ---------------------
+    # Ventana de las últimas n_ventana lecturas
+    # ---------------------
+    @property
+    def llena(self):
+        return self.n >= self.n_ventana
+
+    def ventana(self):
+        """Copia de la ventana en orden cronológico (a lo sumo n_ventana valores)."""
+        if not self.llena:
+            return self._ventana[:self.n].copy()
+        return np.roll(self._ventana, -self._siguiente)
+
+    def media_ventana(self):
+        """Media de las últimas n_ventana lecturas; None si todavía no se juntaron."""
+        return float(self._ventana.mean()) if self.llena else None
+
+    def desvio_ventana(self):
+        if not self.llena or self.n_ventana < 2:
+            return None
+        return float(self._ventana.std(ddof=1))
+
+    def incertidumbre_ppm(self):
+        """
+        Desvío de la media de la ventana, en ppm de la media (como UNC del 60100).
+        None si no hay ventana completa o si la media es 0 (relativo a cero no está definido).
+        """
+        desvio = self.desvio_ventana()
+        media = self.media_ventana()
+        if desvio is None or media == 0.0:
+            return None
+        return desvio / math.sqrt(self.n_ventana) / abs(media) * 1e6
+
+    def a_dict(self):
+        return {
+            "n": self.n,
+            "media": self.media if self.n else None,
+            "desvio": self.desvio if self.n > 1 else None,
+            "minimo": self.minimo if self.n else None,
+            "maximo": self.maximo if self.n else None,
+            "media_ventana": self.media_ventana(),
+            "desvio_ventana": self.desvio_ventana(),
+            "incertidumbre_ppm": self.incertidumbre_ppm(),
+        }
+
+
+class DetectorAsentamiento:
+    """
+    Decide en línea cuándo la relación dejó de derivar (p.ej. por autocalentamiento tras
+    encender Ix). Sobre una ventana deslizante de `ventana` lecturas se ajusta una recta y
+    se considera asentada cuando la pendiente no es significativa (|b| / error(b) < umbral_t)
+    o cuando la deriva a lo largo de la ventana es menor que tolerancia_ppm, durante
+    `confirmaciones` ventanas seguidas. El punto de asentamiento es el inicio de la primera
+    de esas ventanas; se guarda su índice y el tiempo transcurrido desde la primera lectura.
+
+        detector = DetectorAsentamiento(ventana=20)
+        if detector.agregar(relacion):   # True la primera vez que se asienta
+            desde = detector.valores_asentados()
+    """
+
+    def __init__(self, ventana=20, umbral_t=2.0, tolerancia_ppm=None, confirmaciones=3):
+        if ventana < 3:
+            raise ValueError("ventana debe ser >= 3")
+        self.ventana = int(ventana)
+        self.umbral_t = umbral_t
+        self.tolerancia_ppm = tolerancia_ppm
+        self.confirmaciones = int(confirmaciones)
+        self._x = np.arange(self.ventana) - (self.ventana - 1) / 2.0
+        self._sxx = float(self._x @ self._x)
+        # Se guardan además las lecturas de las ventanas de confirmación
+        self._largo = self.ventana + self.confirmaciones - 1
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.n = 0
+        self.asentado = False
+        self.indice = None
+        self.tiempo_s = None
+        self.pendiente = None
+        self._t0 = None
+        self._valores = np.empty(self._largo)
+        self._tiempos = np.empty(self._largo)
+        self._siguiente = 0
+        self._seguidas = 0
+
+    def _ordenados(self, buffer):
+        return np.roll(buffer, -self._siguiente)
+
+    def _sin_deriva(self):
+        y = self._ordenados(self._valores)[-self.ventana:]
+        media = y.mean()
+        b = float(self._x @ (y - media)) / self._sxx
+        self.pendiente = b
+        residuo = y - media - b * self._x
+        s2 = float(residuo @ residuo) / (self.ventana - 2)
+        error_b = math.sqrt(s2 / self._sxx)
+        if error_b == 0.0 or abs(b) / error_b < self.umbral_t:
+            return True
+        if self.tolerancia_ppm is not None and media:
+            return abs(b) * self.ventana / abs(media) * 1e6 < self.tolerancia_ppm
+        return False
+
+    def agregar(self, valor, t=None):
+        """Agrega una lectura (t en s; por defecto el reloj monotónico). True al detectar el asentamiento."""
+        t = time.monotonic() if t is None else float(t)
+        if self._t0 is None:
+            self._t0 = t
+        self._valores[self._siguiente] = valor
+        self._tiempos[self._siguiente] = t
+        self._siguiente = (self._siguiente + 1) % self._largo
+        self.n += 1
+        # Se evalúa desde la primera ventana completa: las confirmaciones cuentan desde ahí,
+        # así que al confirmar el buffer ya tiene las `confirmaciones` ventanas
+        if self.asentado or self.n < self.ventana:
+            return False
+        self._seguidas = self._seguidas + 1 if self._sin_deriva() else 0
+        if self._seguidas < self.confirmaciones:
+            return False
+        self.asentado = True
+        # La primera ventana estable empieza al principio del buffer
+        self.indice = self.n - self._largo
+        self.tiempo_s = float(self._ordenados(self._tiempos)[0] - self._t0)
+        return True
+
+    def valores_asentados(self):
+        """
+        Lecturas desde el punto de asentamiento (para arrancar la estadística).
+        Usar apenas agregar() devuelve True: después el buffer sigue avanzando.
+        """
+        if not self.asentado:
+            return np.empty(0)
+        return self._ordenados(self._valores)
+
+    def a_dict(self):
+        return {"asentado": self.asentado, "indice": self.indice, "tiempo_s": self.tiempo_s,
+                "pendiente": self.pendiente}
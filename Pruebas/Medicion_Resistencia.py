@@ -1,8 +1,5 @@
 import sys
 import os
-import re
-import csv
-import time
 from datetime import datetime
 from datetime import date
 
@@ -10,7 +7,8 @@ from datetime import date
 # Si la clase MI60100 está en el mismo directorio o un subdirectorio accesible,
 # la siguiente línea podría necesitar ajustarse según la estructura de tu proyecto.
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from Instrumental.MI6010D import MI60100 # Esta línea importa la clase MI60100 [9].
+from Registro import RegistroResultados
+from Instrumental.MI6010D import MI60100, CAMPOS_REPORTE, decodificar_reporte # Esta línea importa la clase MI60100 [9].
 
 # Carpeta donde está el script actual
 base_dir = os.path.dirname(os.path.abspath(__file__))
@@ -21,58 +19,51 @@ nombre_csv = f"Medicion_{date.today().isoformat()}.csv"
 # Ruta completa (al lado del script)
 ruta_csv = os.path.join(base_dir, nombre_csv)
 
+CAMPOS_CSV = ["timestamp", "ratio", "Rs", "Rx", "media", "std_ppm", "incertidumbre_ppm", "raw"]
+
 def parse_report(report: str) -> dict:
     """
-    Parser específico para reportes del MI60100.
+    Parser específico para reportes del MI60100 (ver MI6010D.DecodificadorReportes).
     """
     data = {'raw': report, 'timestamp': datetime.now().isoformat()}
-    patterns = {
-        'ratio': r'R[=:]\s*([+-]?\d+\.\d+E[+-]?\d+)',
-        'Rs': r'RS[=:]\s*([+-]?\d+\.\d+E[+-]?\d+)',
-        'Rx': r'RX[=:]\s*([+-]?\d+\.\d+E[+-]?\d+)',
-        'media': r'MEAN[=:]\s*([+-]?\d+\.\d+E[+-]?\d+)',
-        'std_ppm': r'STD[=:]\s*([+-]?\d+\.\d+E[+-]?\d+)',
-        'incertidumbre_ppm': r'UNC[=:]\s*([+-]?\d+\.\d+E[+-]?\d+)',
-    }
-
-    for key, pat in patterns.items():
-        m = re.search(pat, report)
-        if m:
-            data[key] = float(m.group(1))
+    reporte = decodificar_reporte(report)
+    if reporte is not None:
+        for key in CAMPOS_REPORTE:
+            valor = getattr(reporte, key)
+            if valor is not None:
+                data[key] = valor
     return data
 
 def medir_resistencia_unica(mi: MI60100, Rx: float, Rs: float, Ix: float, csv_file: str = "medicion_unica.csv"):
     """
     Configura el puente y toma una única medición.
+    El resultado se agrega a csv_file (rota a <nombre>_NNN.csv, ver Registro.RegistroResultados).
+    Entre pasos se espera a que el puente confirme (esperar_listo) en vez de pausas fijas.
     """
     # 1. Standby
     mi.standby()
-    time.sleep(0.1)
+    mi.esperar_listo()
 
     # 2. Rs como estándar
     mi.send_rx_value(Rs)
-    time.sleep(0.1)
     mi.set_rs_as_standard()
-    time.sleep(0.1)
+    mi.esperar_listo()
 
     # 3. Rx nominal
     mi.send_rx_value(Rx)
-    time.sleep(0.1)
+    mi.esperar_listo()
 
     # 4. Corriente (esto ya enciende Ix)
     mi.set_primary_current(Ix)
-    time.sleep(0.2)
+    mi.esperar_listo()
 
     # 5. Medir
-    rep = mi.single_measurement()  # pequeña pausa extra
+    rep = mi.single_measurement()
     parsed = parse_report(rep)
 
-    # 6. Guardar en CSV
-    fieldnames = ["timestamp", "ratio", "Rs", "Rx", "media", "std_ppm", "incertidumbre_ppm", "raw"]
-    with open(csv_file, "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerow(parsed)
+    # 6. Agregar al CSV del día (no se pisan las mediciones anteriores)
+    with RegistroResultados(csv_file, CAMPOS_CSV) as registro:
+        registro.agregar(parsed)
 
     return parsed
 
@@ -1,57 +1,140 @@
 import numpy as np
-import time
 import os
+from datetime import datetime
 import sys
 # Hay que poner esto para que me tome el modulo MI6010D
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from Instrumental.MI6010D import MI60100, MI60100Error
+from Instrumental.MI6010D import MI60100, MI60100Error, DecodificadorReportes, CAMPOS_REPORTE
+from Estadistica import EstadisticaOnline, DetectorAsentamiento
+
+
+# Columnas para registrar los reportes de medir() (ver Registro.RegistroResultados)
+CAMPOS_REGISTRO = ["timestamp", "indice", "Rs_nominal", "Ix", *CAMPOS_REPORTE]
 
 
 class Medida:
-    def __init__(self, bridge_address="GPIB0::15::INSTR", verbose=True):
-        self.bridge = MI60100(bridge_address)
+    def __init__(self, bridge_address="GPIB0::15::INSTR", verbose=True, rm=None):
+        self.bridge = MI60100(bridge_address, rm=rm)
         self.verbose = verbose
+        # Líneas ya agrupadas por configuración (ver Plan_Medicion): se envían sin recalcular
+        self.comandos_precompilados = {}
+
+    @property
+    def ix_actual(self):
+        """Corriente encendida en el puente (None tras standby o error): si no cambia no se reenvía."""
+        return self.bridge.ix_actual
+
+    @staticmethod
+    def comandos_puente(Rs, Ix, t, n_medidas, n_stats, con_corriente=True):
+        """Comandos de configuración del puente para una medición (en el orden en que se envían)."""
+        comandos = [f"A{Rs}"]                  # set resistencia
+        if con_corriente:
+            comandos.append(f"I{Ix}")           # set corriente
+        comandos += [f"T{t}",                   # tiempo
+                     f"M{n_medidas}",           # número de medidas
+                     f"J{n_stats}",             # número de estadísticas
+                     "R"]                       # remoto
+        return comandos
 
     def configurar_puente(self, Rs, Ix, t, n_medidas, n_stats):
-        """Configura el puente con parámetros de medición"""
-        self.bridge._write(f"A{Rs}")       # set resistencia
-        self.bridge._write(f"I{Ix}")       # set corriente
-        self.bridge._write(f"T{t}")        # tiempo
-        self.bridge._write(f"M{n_medidas}")# número de medidas
-        self.bridge._write(f"J{n_stats}")  # número de estadísticas
-        self.bridge._write("R")            # remoto
-
-    def medir(self, Rs, Ix, t, n_medidas, n_stats):
-        """Ejecuta la secuencia de medición solo con el puente MI60100"""
-        self.configurar_puente(Rs, Ix, t, n_medidas, n_stats)
+        """Configura el puente con parámetros de medición (en una sola escritura si el puente lo acepta)"""
+        con_corriente = Ix != self.ix_actual
+        lineas = self.comandos_precompilados.get((Rs, Ix, t, n_medidas, n_stats, con_corriente))
+        if lineas is None:
+            lineas = self.bridge.REGLA_LOTE.agrupar(self.comandos_puente(Rs, Ix, t, n_medidas, n_stats, con_corriente))
+        for linea in lineas:
+            self.bridge._write(linea)
 
-        rel = np.zeros(n_medidas)
+    def medir(self, Rs, Ix, t, n_medidas, n_stats, registro=None, guardar_relaciones=False,
+              asentamiento=None):
+        """
+        Ejecuta la secuencia de medición solo con el puente MI60100.
+        La estadística se acumula en línea (EstadisticaOnline, ventana de n_stats como J del
+        puente), así que la memoria no crece con n_medidas.
+        registro: Registro.RegistroResultados opcional donde se agrega cada reporte al llegar.
+        guardar_relaciones: si es True devuelve la serie completa; si no, solo la última ventana.
+        asentamiento: DetectorAsentamiento (o True para uno por defecto); la estadística
+        arranca recién desde el punto de asentamiento, que queda en resultado["asentamiento"].
+        Si el puente devuelve un error a mitad de camino se devuelve lo leído hasta ahí con
+        el mensaje en resultado["error"] (None si terminó bien).
+        """
+        return self._medir(Rs, Ix, t, n_medidas, n_stats, registro, guardar_relaciones,
+                           asentamiento=asentamiento)
 
-        for i in range(n_medidas):
-            try:
-                dato = self.bridge._read().strip()   # 👈 en vez de self.bridge.query()
-            except MI60100Error as e:
-                print(f"[ERROR] Puente devolvió error: {e}")
-                break
+    def medir_hasta_incertidumbre(self, Rs, Ix, t, objetivo_ppm, n_max, n_stats, registro=None,
+                                  guardar_relaciones=False, asentamiento=None):
+        """
+        Como medir(), pero corta apenas la incertidumbre de la media de la ventana J
+        (desvío / sqrt(n_stats), en ppm) llega a objetivo_ppm, o al juntar n_max lecturas.
+        Al cortar antes se pone el puente en standby (descarta lo que estaba midiendo).
+        El resultado agrega "objetivo_alcanzado" y "n".
+        """
+        def alcanzado(estadistica):
+            incertidumbre = estadistica.incertidumbre_ppm()
+            return incertidumbre is not None and incertidumbre <= objetivo_ppm
 
-            if dato.startswith("&"):
-                rel[i] = float(dato[1:])
-                if self.verbose:
-                    print(f"[{i+1}/{n_medidas}] Rel = {rel[i]}")
-            else:
-                if self.verbose:
-                    print(f"[{i+1}/{n_medidas}] Mensaje: {dato}")
+        resultado = self._medir(Rs, Ix, t, n_max, n_stats, registro, guardar_relaciones, alcanzado,
+                                asentamiento)
+        if resultado["objetivo_alcanzado"] and resultado["n"] < n_max:
+            self.bridge.standby()
+            self.bridge.esperar_listo()
+            if self.verbose:
+                print(f"[INFO] Incertidumbre {resultado['estadistica']['incertidumbre_ppm']:.3g} ppm "
+                      f"<= {objetivo_ppm} ppm tras {resultado['n']} lecturas: puente en standby.")
+        return resultado
+
+    def _medir(self, Rs, Ix, t, n_medidas, n_stats, registro=None, guardar_relaciones=False, detener=None,
+               asentamiento=None):
+        """Lazo común: detener(estadistica) -> True corta la lectura de reportes."""
+        if asentamiento is True:
+            asentamiento = DetectorAsentamiento()
+        self.configurar_puente(Rs, Ix, t, n_medidas, n_stats)
 
-            time.sleep(0.5)  # ajusta según velocidad real
+        estadistica = EstadisticaOnline(n_ventana=n_stats)
+        # n_medidas puede ser solo un tope (medir_hasta_incertidumbre): las columnas crecen solas
+        decodificador = DecodificadorReportes(capacidad=min(n_medidas, 1024) if guardar_relaciones else 0,
+                                              acumular=guardar_relaciones)
+        detenido = False
+        error = None
+        try:
+            for i, reporte in enumerate(self.bridge.leer_reportes(n_medidas, decodificador)):
+                if reporte.ratio is not None:
+                    if asentamiento is None or asentamiento.asentado:
+                        estadistica.agregar(reporte.ratio)
+                    elif asentamiento.agregar(reporte.ratio):
+                        # Se descartan las lecturas de calentamiento
+                        for valor in asentamiento.valores_asentados():
+                            estadistica.agregar(valor)
+                        if self.verbose:
+                            print(f"[INFO] Asentado en la lectura {asentamiento.indice + 1} "
+                                  f"({asentamiento.tiempo_s:.1f} s).")
+                if registro is not None:
+                    registro.agregar({"timestamp": datetime.now().isoformat(), "indice": i,
+                                      "Rs_nominal": Rs, "Ix": Ix, **reporte._asdict()})
+                if self.verbose:
+                    print(f"[{i+1}/{n_medidas}] Rel = {reporte.ratio}")
+                if detener is not None and detener(estadistica):
+                    detenido = True
+                    break
+        except MI60100Error as e:
+            print(f"[ERROR] Puente devolvió error: {e}")
+            error = str(e)
 
-        # Calcular promedio de las últimas n_stats muestras válidas
-        medidas_validas = rel[rel != 0]
-        rel_prom = np.mean(medidas_validas[-n_stats:]) if len(medidas_validas) >= n_stats else None
+        if guardar_relaciones:
+            relaciones = decodificador.columnas()["ratio"]
+            relaciones = relaciones[~np.isnan(relaciones)]
+        else:
+            relaciones = estadistica.ventana()
 
         return {
-            "relaciones": medidas_validas,
-            "rel_prom": rel_prom,
+            "relaciones": relaciones,
+            "rel_prom": estadistica.media_ventana(),
+            "estadistica": estadistica.a_dict(),
+            "n": decodificador.n,
+            "objetivo_alcanzado": detenido,
+            "asentamiento": asentamiento.a_dict() if asentamiento is not None else None,
+            "error": error,
         }
 
     def close(self):
@@ -60,6 +143,6 @@ class Medida:
             self.bridge.local_unlock()
         except Exception:
             pass
-        self.bridge.rm.close()
+        self.bridge.close()
         if self.verbose:
             print("[INFO] Conexión cerrada correctamente.")
\ No newline at end of file
@@ -0,0 +1,114 @@
+import os
+import sys
+import time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+# Hay que poner esto para que me tome el paquete Instrumental
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Instrumental import clase_driver, lector_multimetro
+from Instrumental.MI6010D import MI60100, MI60100Error
+
+
+def crear_multimetro(nombre, direccion, rm=None):
+    """Crea el driver de temperatura según los nombres de Interface.py (HP3458A, HP34401, HP34420)."""
+    if nombre not in ("HP3458A", "HP34401", "HP34420"):
+        raise ValueError(f"Dispositivo '{nombre}' no soportado.")
+    clase = clase_driver(nombre)
+    if nombre == "HP3458A":
+        return clase(direccion, verbose=False, rm=rm)
+    return clase(direccion, rm=rm)
+
+
+# Margen sobre las dos inversiones de un ciclo del puente (2 * delay) para el timeout de cada punto
+MARGEN_PUNTO_S = 10
+
+
+class Orquestador:
+    """
+    Corre cada instrumento en su propio hilo. Por cada punto dispara la medición del
+    puente (SRQ, ver MI60100.single_measurement_async) y, mientras el puente hace la
+    inversión, lee las temperaturas de Rs y Rx en paralelo. Todas las lecturas de un
+    punto comparten el timestamp del inicio del ciclo del puente.
+
+    termometros: dict canal -> driver, p.ej. {"Rs": HP34401A(...), "Rx": HP34420A(...)}.
+    delay_s: delay configurado en el puente (set_delay_seconds). Cada punto espera el
+    reporte hasta 2 * delay_s + MARGEN_PUNTO_S; None usa el timeout del instrumento.
+    """
+
+    def __init__(self, puente: MI60100, termometros=None, verbose=True, delay_s=None):
+        self.puente = puente
+        self.timeout_s = None if delay_s is None else 2 * delay_s + MARGEN_PUNTO_S
+        self.termometros = dict(termometros or {})
+        self.verbose = verbose
+        self._ejecutores = {
+            canal: ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"DMM-{canal}")
+            for canal in self.termometros
+        }
+
+    def _leer_temperatura(self, canal):
+        try:
+            return lector_multimetro(self.termometros[canal])()
+        except Exception as e:
+            print(f"[ERROR] Lectura de temperatura {canal}: {e}")
+            return None
+
+    def medir_punto(self, timeout_s=None):
+        """Un ciclo del puente con las temperaturas leídas durante la inversión (timeout_s=None: self.timeout_s)."""
+        timestamp = datetime.now().isoformat()
+        t0 = time.monotonic()
+        if timeout_s is None:
+            timeout_s = self.timeout_s
+        futuro_puente = self.puente.single_measurement_async(timeout_s=timeout_s)
+        futuros = {canal: ej.submit(self._leer_temperatura, canal) for canal, ej in self._ejecutores.items()}
+        punto = {"timestamp": timestamp, "reporte": futuro_puente.result()}
+        for canal, futuro in futuros.items():
+            punto[f"T_{canal}"] = futuro.result()
+        punto["duracion_s"] = time.monotonic() - t0
+        return punto
+
+    def medir(self, n_puntos, callback=None):
+        """Toma n_puntos puntos; callback(i, punto) se llama al completar cada uno."""
+        puntos = []
+        for i in range(n_puntos):
+            try:
+                punto = self.medir_punto()
+            except MI60100Error as e:
+                print(f"[ERROR] Puente devolvió error: {e}")
+                break
+            puntos.append(punto)
+            if self.verbose:
+                print(f"[{i+1}/{n_puntos}] {punto}")
+            if callback is not None:
+                callback(i, punto)
+        return puntos
+
+    def close(self):
+        for ejecutor in self._ejecutores.values():
+            ejecutor.shutdown(wait=True)
+
+
+def main():
+    puente = MI60100(15)
+    termometros = {
+        "Rs": crear_multimetro("HP34401", "GPIB0::14::INSTR"),
+        "Rx": crear_multimetro("HP34420", "GPIB0::13::INSTR"),
+    }
+    delay_s = 5
+    orquestador = Orquestador(puente, termometros, delay_s=delay_s)
+    try:
+        puente.local_unlock()
+        puente.send_rx_value(1)
+        puente.set_delay_seconds(delay_s)
+        puente.set_primary_current(0.001)
+        orquestador.medir(10)
+    finally:
+        orquestador.close()
+        puente.standby()
+        puente.close()
+        for dmm in termometros.values():
+            dmm.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+"""
+Plan de medición estructurado (JSON): puente, scanner, termómetros y generador.
+
+El plan se valida al cargarlo (todos los errores juntos, con la ruta del campo) y se
+compila una sola vez: orden de ejecución planificado (ver Campania.planificar) y, por
+cada medición, las líneas listas para enviar a cada instrumento, ya agrupadas con la
+ReglaLote del driver. El resultado se guarda en Config/.cache/<sha256 del archivo>.json:
+volver a correr el mismo plan lo toma de ahí sin validar ni compilar de nuevo.
+
+    python Pruebas/Plan_Medicion.py Config/plan.json [--simulado]
+
+Ejemplo en PLAN_EJEMPLO (es lo que inserta el botón "Plantilla" de la interfaz).
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+# Hay que poner esto para que me tome el paquete Instrumental
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Instrumental import clase_driver
+from Instrumental.MI6010D import MI60100
+from Instrumental.Scanner import ScannerInti
+from Medida import Medida
+from Campania import Trabajo, planificar
+
+# Cambiar al modificar el formato compilado: invalida la cache
+VERSION_COMPILADOR = 1
+
+CARPETA_CACHE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Config", ".cache")
+
+PLAN_EJEMPLO = {
+    "nombre": "Calibración 1 ohm",
+    "puente": {"direccion": "GPIB0::15::INSTR", "t": 5, "n_medidas": 50, "n_stats": 10,
+               "objetivo_ppm": None, "asentamiento": False},
+    "scanner": {"direccion": "GPIB0::18::INSTR"},
+    "termometros": {
+        "Rs": {"modelo": "HP34401", "direccion": "GPIB0::14::INSTR", "rango": 10, "resolucion": 1e-5},
+    },
+    "generador": None,
+    "mediciones": [
+        {"nombre": "R1", "Rx": 1, "Rs": 1, "Ix": 0.001, "canal_s": 1, "canal_x": 2},
+        {"nombre": "R2", "Rx": 1, "Rs": 1, "Ix": 0.001, "canal_s": 1, "canal_x": 3, "n_medidas": 100},
+    ],
+}
+
+# Parámetros de medición: por defecto en "puente", se pueden pisar en cada medición
+_PARAMETROS_MEDICION = ("t", "n_medidas", "n_stats", "objetivo_ppm", "asentamiento")
+_DEFECTOS_PUENTE = {"direccion": "GPIB0::15::INSTR", "t": 5, "n_medidas": 50, "n_stats": 10,
+                    "objetivo_ppm": None, "asentamiento": False}
+_DEFECTOS_GENERADOR = {"vpp_cha": 1, "offset_cha": 0.5, "vpp_chb": 5, "offset_chb": 2.5}
+_MODELOS_TERMOMETRO = ("HP3458A", "HP34401", "HP34420")
+_CANALES = range(1, 17)
+
+
+class ErrorPlan(ValueError):
+    """Plan inválido. errores: lista de mensajes 'ruta.del.campo: problema'."""
+
+    def __init__(self, errores):
+        super().__init__("Plan de medición inválido:\n" + "\n".join(errores))
+        self.errores = errores
+
+
+# ---------------------
+# Validación
+# ---------------------
+def _numero(valor, ruta, errores, minimo=None, maximo=None, entero=False, opcional=False):
+    if valor is None:
+        if not opcional:
+            errores.append(f"{ruta}: falta el valor")
+        return
+    if isinstance(valor, bool) or not isinstance(valor, (int, float)) or (entero and not isinstance(valor, int)):
+        errores.append(f"{ruta}: debe ser {'entero' if entero else 'numérico'} (vino {valor!r})")
+        return
+    if minimo is not None and valor < minimo:
+        errores.append(f"{ruta}: {valor} es menor que {minimo}")
+    if maximo is not None and valor > maximo:
+        errores.append(f"{ruta}: {valor} es mayor que {maximo}")
+
+
+def _texto(valor, ruta, errores):
+    if not isinstance(valor, str) or not valor.strip():
+        errores.append(f"{ruta}: debe ser un texto no vacío")
+
+
+def _claves(seccion, permitidas, ruta, errores):
+    for clave in seccion:
+        if clave not in permitidas:
+            errores.append(f"{ruta}.{clave}: campo desconocido")
+
+
+def _parametros(valores, ruta, errores, opcionales):
+    """Chequea t/n_medidas/n_stats/objetivo_ppm/asentamiento contra los rangos del 60100."""
+    _numero(valores.get("t"), f"{ruta}.t", errores, 4, 1000, entero=True, opcional=opcionales)
+    _numero(valores.get("n_medidas"), f"{ruta}.n_medidas", errores, 1, 10 ** 9, entero=True, opcional=opcionales)
+    _numero(valores.get("n_stats"), f"{ruta}.n_stats", errores, 2, 50, entero=True, opcional=opcionales)
+    _numero(valores.get("objetivo_ppm"), f"{ruta}.objetivo_ppm", errores, 0, opcional=True)
+    if "asentamiento" in valores and not isinstance(valores["asentamiento"], bool):
+        errores.append(f"{ruta}.asentamiento: debe ser true o false")
+
+
+def _seccion(plan, clave, errores):
+    """Sección opcional del plan como dict ({} si falta o si no es un objeto, con su error)."""
+    seccion = plan.get(clave)
+    if seccion is None:
+        return {}
+    if not isinstance(seccion, dict):
+        errores.append(f"{clave}: debe ser un objeto")
+        return {}
+    return seccion
+
+
+def validar(plan):
+    """Valida el plan (dict). Devuelve el plan con los valores por defecto completos o lanza ErrorPlan."""
+    errores = []
+    if not isinstance(plan, dict):
+        raise ErrorPlan(["el plan debe ser un objeto JSON"])
+    _claves(plan, ("nombre", "puente", "scanner", "termometros", "generador", "mediciones"), "plan", errores)
+
+    puente = dict(_DEFECTOS_PUENTE, **_seccion(plan, "puente", errores))
+    _claves(puente, _DEFECTOS_PUENTE, "puente", errores)
+    _texto(puente["direccion"], "puente.direccion", errores)
+    _parametros(puente, "puente", errores, opcionales=False)
+
+    scanner = dict({"direccion": ScannerInti.ADDRESS_GPIB}, **_seccion(plan, "scanner", errores))
+    _claves(scanner, ("direccion",), "scanner", errores)
+    _texto(scanner["direccion"], "scanner.direccion", errores)
+
+    termometros = plan.get("termometros") or {}
+    if not isinstance(termometros, dict):
+        errores.append("termometros: debe ser un objeto canal -> instrumento")
+        termometros = {}
+    for canal, dmm in termometros.items():
+        ruta = f"termometros.{canal}"
+        if not isinstance(dmm, dict):
+            errores.append(f"{ruta}: debe ser un objeto")
+            continue
+        _claves(dmm, ("modelo", "direccion", "rango", "resolucion"), ruta, errores)
+        if dmm.get("modelo") not in _MODELOS_TERMOMETRO:
+            errores.append(f"{ruta}.modelo: debe ser uno de {', '.join(_MODELOS_TERMOMETRO)}")
+        _texto(dmm.get("direccion"), f"{ruta}.direccion", errores)
+        _numero(dmm.get("rango"), f"{ruta}.rango", errores, 0, opcional=True)
+        _numero(dmm.get("resolucion"), f"{ruta}.resolucion", errores, 0, opcional=True)
+
+    generador = plan.get("generador")
+    if generador is not None:
+        if not isinstance(generador, dict):
+            errores.append("generador: debe ser un objeto o null")
+            generador = None
+        else:
+            generador = dict(_DEFECTOS_GENERADOR, **generador)
+            _claves(generador, ("direccion", "frecuencia", *_DEFECTOS_GENERADOR), "generador", errores)
+            _texto(generador.get("direccion"), "generador.direccion", errores)
+            _numero(generador.get("frecuencia"), "generador.frecuencia", errores, 0)
+            for clave in _DEFECTOS_GENERADOR:
+                _numero(generador[clave], f"generador.{clave}", errores)
+
+    mediciones = plan.get("mediciones")
+    if not isinstance(mediciones, list) or not mediciones:
+        errores.append("mediciones: debe ser una lista con al menos una medición")
+        mediciones = []
+    nombres = set()
+    completas = []
+    for i, medicion in enumerate(mediciones):
+        ruta = f"mediciones[{i}]"
+        if not isinstance(medicion, dict):
+            errores.append(f"{ruta}: debe ser un objeto")
+            continue
+        _claves(medicion, ("nombre", "Rx", "Rs", "Ix", "canal_s", "canal_x", *_PARAMETROS_MEDICION), ruta, errores)
+        _numero(medicion.get("Rx"), f"{ruta}.Rx", errores, 0)
+        _numero(medicion.get("Rs"), f"{ruta}.Rs", errores, 0)
+        _numero(medicion.get("Ix"), f"{ruta}.Ix", errores, 0)
+        for canal in ("canal_s", "canal_x"):
+            valor = medicion.get(canal)
+            if valor is not None and (not isinstance(valor, int) or valor not in _CANALES):
+                errores.append(f"{ruta}.{canal}: debe ser un canal entre {_CANALES[0]} y {_CANALES[-1]} o null")
+        _parametros(medicion, ruta, errores, opcionales=True)
+        completa = {p: puente[p] for p in _PARAMETROS_MEDICION}
+        completa.update(medicion)
+        completa.setdefault("nombre", Trabajo(completa.get("Rx"), completa.get("Rs"), completa.get("Ix"),
+                                              completa.get("canal_s"), completa.get("canal_x")).nombre)
+        if completa["nombre"] in nombres:
+            errores.append(f"{ruta}.nombre: '{completa['nombre']}' está repetido")
+        nombres.add(completa["nombre"])
+        completas.append(completa)
+
+    if errores:
+        raise ErrorPlan(errores)
+    return {"nombre": plan.get("nombre") or "", "puente": puente, "scanner": scanner,
+            "termometros": termometros, "generador": generador, "mediciones": completas}
+
+
+def validar_texto(texto):
+    """Valida el texto de un plan (p.ej. la caja de la interfaz). Devuelve el plan completo."""
+    try:
+        plan = json.loads(texto)
+    except json.JSONDecodeError as e:
+        raise ErrorPlan([f"JSON inválido: {e}"])
+    return validar(plan)
+
+
+# ---------------------
+# Compilación
+# ---------------------
+def _comandos_termometro(dmm):
+    opciones = {k: dmm[k] for k in ("rango", "resolucion") if dmm.get(k) is not None}
+    argumentos = {"range_val": opciones["rango"]} if "rango" in opciones else {}
+    if "resolucion" in opciones:
+        argumentos["resolution"] = opciones["resolucion"]
+    # Solo se importan los drivers de los modelos que usa el plan
+    driver = clase_driver(dmm["modelo"])
+    if dmm["modelo"] == "HP3458A":
+        return driver.REGLA_LOTE.agrupar(driver.comandos_medicion("DCV", **argumentos))
+    return driver.REGLA_LOTE.agrupar(driver.comandos_voltage_dc(**argumentos))
+
+
+def compilar(plan, huella=None):
+    """Plan validado -> plan compilado (dict serializable en JSON)."""
+    trabajos = [Trabajo.desde_dict(m) for m in plan["mediciones"]]
+    pasos = []
+    for trabajo in planificar(trabajos, ScannerInti.CostoTransicion):
+        argumentos = (trabajo.Rs, trabajo.Ix, trabajo.t, trabajo.n_medidas, trabajo.n_stats)
+        pasos.append({
+            "trabajo": trabajo.a_dict(),
+            # Las dos variantes: al ejecutar se usa la que corresponda según la corriente anterior
+            "puente": {
+                "con_corriente": MI60100.REGLA_LOTE.agrupar(Medida.comandos_puente(*argumentos, True)),
+                "sin_corriente": MI60100.REGLA_LOTE.agrupar(Medida.comandos_puente(*argumentos, False)),
+            },
+        })
+    generador = plan["generador"]
+    HP3245A = clase_driver("HP3245A") if generador is not None else None
+    return {
+        "version": VERSION_COMPILADOR,
+        "hash": huella,
+        "nombre": plan["nombre"],
+        "puente": {"direccion": plan["puente"]["direccion"]},
+        "scanner": plan["scanner"],
+        "generador": None if generador is None else {
+            "direccion": generador["direccion"],
+            "lineas": HP3245A.REGLA_LOTE.agrupar(HP3245A.comandos_generador(
+                generador["frecuencia"], generador["vpp_cha"], generador["offset_cha"],
+                generador["vpp_chb"], generador["offset_chb"])),
+        },
+        "termometros": {canal: {"modelo": dmm["modelo"], "direccion": dmm["direccion"],
+                                "lineas": _comandos_termometro(dmm)}
+                        for canal, dmm in plan["termometros"].items()},
+        "pasos": pasos,
+    }
+
+
+def huella_plan(contenido):
+    """sha256 del contenido del archivo (bytes) y de la versión del compilador."""
+    return hashlib.sha256(b"%d\n" % VERSION_COMPILADOR + contenido).hexdigest()
+
+
+def cargar_plan(ruta, carpeta_cache=CARPETA_CACHE, verbose=False):
+    """
+    Devuelve el plan compilado de `ruta`. Si el contenido ya se compiló antes se toma de la
+    cache sin validar; si no, se valida (ErrorPlan), se compila y se guarda en la cache.
+    """
+    with open(ruta, "rb") as f:
+        contenido = f.read()
+    huella = huella_plan(contenido)
+    ruta_cache = os.path.join(carpeta_cache, huella + ".json") if carpeta_cache else None
+    if ruta_cache and os.path.exists(ruta_cache):
+        with open(ruta_cache, encoding="utf-8") as f:
+            compilado = json.load(f)
+        if compilado.get("version") == VERSION_COMPILADOR:
+            if verbose:
+                print(f"[INFO] Plan compilado tomado de la cache ({huella[:12]}).")
+            return compilado
+    compilado = compilar(validar_texto(contenido.decode("utf-8")), huella)
+    if ruta_cache:
+        os.makedirs(carpeta_cache, exist_ok=True)
+        temporal = ruta_cache + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(compilado, f)
+        os.replace(temporal, ruta_cache)
+        if verbose:
+            print(f"[INFO] Plan validado y compilado ({huella[:12]}).")
+    return compilado
+
+
+# ---------------------
+# Ejecución
+# ---------------------
+def preparar_medida(medida, compilado):
+    """Carga en la Medida las líneas del puente ya agrupadas de cada paso."""
+    for paso in compilado["pasos"]:
+        t = paso["trabajo"]
+        clave = (t["Rs"], t["Ix"], t["t"], t["n_medidas"], t["n_stats"])
+        medida.comandos_precompilados[clave + (True,)] = paso["puente"]["con_corriente"]
+        medida.comandos_precompilados[clave + (False,)] = paso["puente"]["sin_corriente"]
+
+
+def configurar_generador(compilado, rm=None):
+    """Envía la configuración compilada al generador (si el plan lo tiene)."""
+    generador = compilado["generador"]
+    if generador is not None:
+        with clase_driver("HP3245A")(generador["direccion"], verbose=False, rm=rm) as gen:
+            for linea in generador["lineas"]:
+                gen.instrument.write(linea)
+
+
+def abrir_termometros(compilado, rm=None):
+    """Abre y configura los termómetros del plan. Devuelve dict canal -> multímetro (hay que cerrarlos)."""
+    from Orquestador import crear_multimetro
+    termometros = {}
+    try:
+        for canal, dmm in compilado["termometros"].items():
+            termometros[canal] = multimetro = crear_multimetro(dmm["modelo"], dmm["direccion"], rm=rm)
+            for linea in dmm["lineas"]:
+                multimetro.instrument.write(linea)
+    except Exception:
+        cerrar_termometros(termometros)
+        raise
+    return termometros
+
+
+def cerrar_termometros(termometros):
+    for multimetro in termometros.values():
+        multimetro.close()
+
+
+def campos_resumen(compilado):
+    """Columnas del CSV de resultados del plan: las de la campaña más las de cada termómetro."""
+    from Campania import campos_resumen as campos
+    return campos(compilado["termometros"])
+
+
+def ejecutar_plan(compilado, rm=None, checkpoint=None, registro=None, registro_lecturas=None,
+                  callback=None, verbose=True):
+    """
+    Corre un plan compilado como campaña (ver Campania). Devuelve los resúmenes por medición,
+    con la temperatura de cada termómetro al inicio y al final de cada una.
+    """
+    from Campania import Campania
+    configurar_generador(compilado, rm)
+    termometros = abrir_termometros(compilado, rm)
+    scanner = medida = None
+    try:
+        scanner = ScannerInti(rm=rm, direccion=compilado["scanner"]["direccion"])
+        medida = Medida(compilado["puente"]["direccion"], verbose=False, rm=rm)
+        preparar_medida(medida, compilado)
+        trabajos = [Trabajo.desde_dict(paso["trabajo"]) for paso in compilado["pasos"]]
+        campania = Campania(scanner, medida, checkpoint=checkpoint, registro=registro,
+                            registro_lecturas=registro_lecturas, verbose=verbose, termometros=termometros)
+        return campania.ejecutar(trabajos, callback=callback)
+    finally:
+        if scanner is not None:
+            scanner.ResetGeneral(ScannerInti.DireccionGPIB)
+        if medida is not None:
+            medida.close()
+        cerrar_termometros(termometros)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(f"Uso: python {os.path.basename(__file__)} plan.json [--simulado]")
+        return
+    from Registro import RegistroResultados
+    from Campania import imprimir_resumen
+    ruta = sys.argv[1]
+    t0 = time.perf_counter()
+    try:
+        compilado = cargar_plan(ruta, verbose=True)
+    except ErrorPlan as e:
+        print(f"[ERROR] {e}")
+        return
+    print(f"[INFO] Plan listo en {(time.perf_counter() - t0) * 1e3:.1f} ms: {len(compilado['pasos'])} mediciones.")
+    rm = None
+    if "--simulado" in sys.argv:
+        from Instrumental.Simulado import ResourceManagerSimulado
+        rm = ResourceManagerSimulado(escala_tiempo=0.001)
+    base = os.path.splitext(ruta)[0]
+    with RegistroResultados(base + "_resultados", campos_resumen(compilado)) as registro:
+        imprimir_resumen(ejecutar_plan(compilado, rm, checkpoint=base + "_checkpoint.json", registro=registro))
+
+
+if __name__ == "__main__":
+    main()
@@ -15,15 +15,14 @@ def main():
         rel = []
         for i in range(n_medidas):
             try:
-                dato = medida.bridge.single_measurement().strip()  # Aquí se inicia y obtiene la medida
-                if dato.startswith("&"):
-                    valor = float(dato[1:])
-                    rel.append(valor)
+                reporte = medida.bridge.reporte_unico()  # Aquí se inicia y obtiene la medida
+                if reporte is not None and reporte.ratio is not None:
+                    rel.append(reporte.ratio)
                     if medida.verbose:
-                        print(f"[{i+1}/{n_medidas}] Rel = {valor}")
+                        print(f"[{i+1}/{n_medidas}] Rel = {reporte.ratio}")
                 else:
                     if medida.verbose:
-                        print(f"[{i+1}/{n_medidas}] Mensaje: {dato}")
+                        print(f"[{i+1}/{n_medidas}] Mensaje: {reporte}")
             except Exception as e:
                 print(f"[ERROR] Medición {i+1}: {e}")
         
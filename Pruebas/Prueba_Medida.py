@@ -10,7 +10,7 @@ def main():
     medida = Medida("GPIB0::15::INSTR", verbose=True)
 
     try:
-        resultados = medida.medir(Rs, Ix, t, n_medidas, n_stats)
+        resultados = medida.medir(Rs, Ix, t, n_medidas, n_stats, guardar_relaciones=True)
 
         print("\n=== Resultados ===")
         print("Todas las relaciones:", resultados["relaciones"])
@@ -0,0 +1,244 @@
+"""
+Registro de resultados en CSV solo-agregar, a prueba de cortes.
+
+agregar() solo encola la fila y vuelve enseguida: un hilo escritor arma las líneas,
+las escribe con buffer y hace flush + fsync cada `intervalo_fsync_s` (o al juntar
+`max_pendientes` filas), así que un corte de luz pierde a lo sumo esa ventana.
+Los archivos rotan por tamaño y/o por tiempo: <base>_000.csv, <base>_001.csv, ...
+cada uno con su encabezado.
+
+Al abrir un registro existente se retoma el último archivo: si quedó una fila a medio
+escribir (el proceso murió durante un write) se trunca hasta la última línea completa.
+Si su encabezado no coincide con las columnas pedidas se empieza el archivo siguiente.
+
+    with RegistroResultados("datos/Puente/Medicion_2025-06-01", CAMPOS) as registro:
+        registro.agregar({"timestamp": ..., "ratio": ...})
+"""
+import os
+import re
+import csv
+import io
+import time
+import queue
+import threading
+from datetime import datetime
+
+_FIN = object()
+
+
+def recuperar(ruta):
+    """
+    Deja `ruta` terminando en una línea completa (trunca la fila cortada por un corte).
+    Devuelve la cantidad de bytes descartados.
+    """
+    with open(ruta, "rb+") as f:
+        tamano = f.seek(0, os.SEEK_END)
+        if tamano == 0:
+            return 0
+        # Se busca el último '\n' leyendo de atrás para adelante
+        posicion = tamano
+        bloque = 4096
+        while posicion > 0:
+            inicio = max(0, posicion - bloque)
+            f.seek(inicio)
+            datos = f.read(posicion - inicio)
+            k = datos.rfind(b"\n")
+            if k >= 0:
+                fin = inicio + k + 1
+                break
+            posicion = inicio
+        else:
+            fin = 0
+        if fin < tamano:
+            f.truncate(fin)
+            f.flush()
+            os.fsync(f.fileno())
+        return tamano - fin
+
+
+def inicio_segmento(ruta, columna="timestamp"):
+    """
+    Momento de creación (epoch) de un archivo del registro: el `columna` de la primera
+    fila (ISO). Un archivo con solo el encabezado se creó cuando se escribió por última
+    vez (su mtime). None si la primera fila no tiene un timestamp legible.
+    """
+    with open(ruta, newline="", encoding="utf-8") as f:
+        lector = csv.DictReader(f)
+        primera = next(lector, None)
+    if primera is None:
+        return os.path.getmtime(ruta)
+    try:
+        return datetime.fromisoformat(primera.get(columna) or "").timestamp()
+    except ValueError:
+        return None
+
+
+def encabezado(ruta):
+    """Columnas de la primera línea del archivo (None si está vacío)."""
+    with open(ruta, newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), None)
+
+
+def _fsync_carpeta(carpeta):
+    """Persiste la entrada de directorio de un archivo nuevo (no existe en Windows)."""
+    if os.name != "posix":
+        return
+    fd = os.open(carpeta or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class RegistroResultados:
+    """
+    ruta_base: ruta sin extensión; los archivos son <ruta_base>_NNN.csv.
+    campos: columnas del CSV (las claves que falten quedan vacías, las que sobren se ignoran).
+    intervalo_fsync_s: ventana máxima de datos que se puede perder ante un corte.
+    max_bytes / max_segundos: rotación por tamaño y/o por antigüedad del archivo (None = sin límite).
+    La antigüedad de un archivo retomado se toma del timestamp de su primera fila
+    (ver inicio_segmento); sin esa columna se cuenta desde que se retoma.
+    """
+
+    def __init__(self, ruta_base, campos, intervalo_fsync_s=1.0, max_pendientes=1000,
+                 max_bytes=64 * 1024 * 1024, max_segundos=None, verbose=False):
+        self.ruta_base = os.path.splitext(ruta_base)[0]
+        self.campos = list(campos)
+        self.intervalo_fsync_s = intervalo_fsync_s
+        self.max_pendientes = max_pendientes
+        self.max_bytes = max_bytes
+        self.max_segundos = max_segundos
+        self.verbose = verbose
+        self.filas = 0
+        self.archivos = []
+        self._cola = queue.SimpleQueue()
+        self._error = None
+        self._cerrado = False
+        self._archivo = None
+        carpeta = os.path.dirname(self.ruta_base)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+        self._abrir(self._ultimo_segmento())
+        self._hilo = threading.Thread(target=self._escritor, name="RegistroResultados", daemon=True)
+        self._hilo.start()
+
+    # ---------------------
+    # API
+    # ---------------------
+    def agregar(self, fila):
+        """
+        Encola una fila (dict). No toca el disco: no bloquea el lazo de adquisición.
+        Lanza ValueError si el registro ya se cerró (la fila se perdería).
+        """
+        if self._error is not None:
+            raise self._error
+        if self._cerrado or not self._hilo.is_alive():
+            raise ValueError(f"El registro {self.ruta_base} ya está cerrado.")
+        self._cola.put(fila)
+
+    def close(self):
+        """Escribe lo pendiente, hace fsync y cierra. Relanza un error del hilo escritor si lo hubo."""
+        self._cerrado = True
+        if self._hilo.is_alive():
+            self._cola.put(_FIN)
+            self._hilo.join()
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # ---------------------
+    # Archivos
+    # ---------------------
+    def _ruta(self, indice):
+        return f"{self.ruta_base}_{indice:03d}.csv"
+
+    def _ultimo_segmento(self):
+        patron = re.compile(re.escape(os.path.basename(self.ruta_base)) + r"_(\d{3,})\.csv$")
+        carpeta = os.path.dirname(self.ruta_base) or "."
+        indices = [int(m.group(1)) for m in map(patron.match, os.listdir(carpeta)) if m]
+        return max(indices) if indices else 0
+
+    def _abrir(self, indice):
+        ruta = self._ruta(indice)
+        existe = os.path.exists(ruta) and os.path.getsize(ruta) > 0
+        if existe:
+            perdidos = recuperar(ruta)
+            if perdidos and self.verbose:
+                print(f"[INFO] {ruta}: se descartaron {perdidos} bytes de una fila incompleta.")
+            existe = os.path.getsize(ruta) > 0
+        if existe and encabezado(ruta) != self.campos:
+            # Otras columnas (p.ej. otro plan con otros termómetros): no se mezclan en el mismo CSV
+            if self.verbose:
+                print(f"[INFO] {ruta} tiene otras columnas: se sigue en el archivo siguiente.")
+            return self._abrir(indice + 1)
+        self.indice = indice
+        self._archivo = open(ruta, "a", newline="", encoding="utf-8", buffering=1 << 16)
+        self._bytes = self._archivo.tell()
+        # Al retomar, la antigüedad se cuenta desde la primera fila (el mtime es la última escritura)
+        self._t_apertura = (inicio_segmento(ruta) if existe else None) or time.time()
+        self.archivos.append(ruta)
+        if not existe:
+            self._escribir(self._linea(dict(zip(self.campos, self.campos))))
+            self._sincronizar()
+            _fsync_carpeta(os.path.dirname(ruta))
+        if self.verbose:
+            print(f"[INFO] Registrando en {ruta}")
+
+    def _rotar_si_hace_falta(self):
+        por_tamano = self.max_bytes is not None and self._bytes >= self.max_bytes
+        por_tiempo = self.max_segundos is not None and time.time() - self._t_apertura >= self.max_segundos
+        if por_tamano or por_tiempo:
+            self._sincronizar()
+            self._archivo.close()
+            self._abrir(self.indice + 1)
+
+    def _linea(self, fila):
+        salida = io.StringIO()
+        csv.DictWriter(salida, fieldnames=self.campos, extrasaction="ignore").writerow(fila)
+        return salida.getvalue()
+
+    def _escribir(self, linea):
+        self._archivo.write(linea)
+        self._bytes += len(linea.encode("utf-8"))
+
+    def _sincronizar(self):
+        self._archivo.flush()
+        os.fsync(self._archivo.fileno())
+
+    # ---------------------
+    # Hilo escritor
+    # ---------------------
+    def _escritor(self):
+        pendientes = 0
+        ultimo_fsync = time.monotonic()
+        try:
+            while True:
+                espera = max(0.0, self.intervalo_fsync_s - (time.monotonic() - ultimo_fsync))
+                try:
+                    fila = self._cola.get(timeout=espera if pendientes else None)
+                except queue.Empty:
+                    fila = None
+                if fila is _FIN:
+                    break
+                if fila is not None:
+                    self._rotar_si_hace_falta()
+                    self._escribir(self._linea(fila))
+                    self.filas += 1
+                    pendientes += 1
+                vencido = time.monotonic() - ultimo_fsync >= self.intervalo_fsync_s
+                if pendientes and (vencido or pendientes >= self.max_pendientes):
+                    self._sincronizar()
+                    pendientes = 0
+                    ultimo_fsync = time.monotonic()
+        except Exception as e:
+            self._error = e
+        finally:
+            try:
+                self._sincronizar()
+            finally:
+                self._archivo.close()
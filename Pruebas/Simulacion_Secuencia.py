@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+# Hay que poner esto para que me tome el paquete Instrumental
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Instrumental.Simulado import ResourceManagerSimulado
+from Instrumental.Metricas import METRICAS
+from Instrumental.MI6010D import MI60100
+from Instrumental.Scanner import ScannerInti
+from Instrumental.HP3458A import HP3458A
+from Instrumental.HP34401 import HP34401A
+from Instrumental.HP34420 import HP34420A
+
+
+def cronometrar(nombre, funcion, tiempos):
+    t0 = time.perf_counter()
+    resultado = funcion()
+    tiempos.append((nombre, time.perf_counter() - t0))
+    return resultado
+
+
+def secuencia_completa(escala_tiempo=0.01, n_medidas=5, cant_muestras=10000):
+    """
+    Ejecuta una secuencia de medición completa contra el banco simulado y devuelve
+    [(paso, segundos de reloj)]. Con escala_tiempo=0.01 los tiempos de instrumento
+    corren 100x más rápido, de modo que el resultado escala a 1/0.01 del real.
+    Las esperas fijas (time.sleep) de los drivers no se escalan y quedan amplificadas
+    en la columna escalada: justamente son las que hay que eliminar.
+    """
+    rm = ResourceManagerSimulado(escala_tiempo=escala_tiempo, semilla=0)
+    tiempos = []
+
+    puente = cronometrar("abrir MI60100", lambda: MI60100(15, rm=rm), tiempos)
+    scanner = cronometrar("abrir ScannerInti", lambda: ScannerInti(rm=rm), tiempos)
+    dmm = cronometrar("abrir HP3458A", lambda: HP3458A(rm=rm, verbose=False), tiempos)
+    temp_rs = cronometrar("abrir HP34401A", lambda: HP34401A(rm=rm), tiempos)
+    temp_rx = cronometrar("abrir HP34420A", lambda: HP34420A(rm=rm), tiempos)
+
+    def conmutar():
+        scanner.SetearCanal(scanner.DireccionGPIB, ScannerInti.SALIDA_1, 1)
+        scanner.SetearCanal(scanner.DireccionGPIB, ScannerInti.SALIDA_2, 2)
+        scanner.InvertirCanal(scanner.DireccionGPIB)
+    cronometrar("scanner: setear e invertir", conmutar, tiempos)
+
+    def configurar_puente():
+        puente.standby()
+        puente.send_rx_value(1)
+        puente.set_delay_seconds(4)
+        puente.set_primary_current(0.001)
+    cronometrar("puente: configuración", configurar_puente, tiempos)
+    cronometrar(f"puente: {n_medidas} x M1R",
+                lambda: [puente.single_measurement() for _ in range(n_medidas)], tiempos)
+    cronometrar("temperaturas: READ? Rs y Rx", lambda: (temp_rs.read(), temp_rx.read()), tiempos)
+    cronometrar(f"HP3458A: sweep {cant_muestras} muestras",
+                lambda: dmm.measure_sweep_binary(cant_muestras, 2e-5, 1.4e-6), tiempos)
+
+    puente.close()
+    dmm.close()
+    temp_rs.close()
+    temp_rx.close()
+    return tiempos
+
+
+def main():
+    escala = float(sys.argv[1]) if len(sys.argv) > 1 else 0.01
+    tiempos = secuencia_completa(escala_tiempo=escala)
+    total = sum(t for _, t in tiempos)
+    print(f"\n=== Secuencia simulada (escala de tiempo {escala}) ===")
+    for nombre, t in tiempos:
+        print(f"{nombre:<40} {t:8.3f} s  ({t / escala:9.2f} s escalados, {100 * t / total:5.1f} %)")
+    print(f"{'Total':<40} {total:8.3f} s  ({total / escala:9.2f} s escalados)")
+    print()
+    print(METRICAS.resumen())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,26 @@
 # -*- mode: python ; coding: utf-8 -*-
+# Interfaz del banco. Se arma en modo carpeta (onedir): el --onefile descomprimía todo
+# (NumPy, matplotlib, pyvisa) en un temporal en cada arranque y tardaba varios segundos.
+#   pyinstaller Text_box.spec   ->  dist/Interface/Interface.exe
 
 
 a = Analysis(
-    ['Text_box.py'],
-    pathex=[],
+    ['Interface.py'],
+    # Los módulos de Pruebas se importan por nombre (ver Ejecucion._usar_pruebas)
+    pathex=['Pruebas'],
     binaries=[],
     datas=[],
-    hiddenimports=[],
+    # Los drivers se importan por nombre desde el registro de Instrumental (clase_driver)
+    hiddenimports=[
+        'Instrumental.MI6010D',
+        'Instrumental.Scanner',
+        'Instrumental.HP3245A',
+        'Instrumental.HP3458A',
+        'Instrumental.HP34401',
+        'Instrumental.HP34420',
+        'Instrumental.Simulado',
+        'Instrumental.Grafico_Vivo',
+    ],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -18,16 +32,14 @@ pyz = PYZ(a.pure)
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.datas,
     [],
-    name='Text_box',
+    exclude_binaries=True,
+    name='Interface',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
+    # Sin UPX: descomprimir las DLL en cada arranque cuesta más de lo que ahorra en disco
+    upx=False,
     console=False,
     disable_windowed_traceback=False,
     argv_emulation=False,
@@ -35,3 +47,13 @@ exe = EXE(
     codesign_identity=None,
     entitlements_file=None,
 )
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='Interface',
+)
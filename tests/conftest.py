@@ -0,0 +1,52 @@
+"""
+Configuración común de las pruebas: todo corre contra el banco simulado
+(Instrumental.Simulado), sin backend VISA ni instrumentos reales.
+
+    python -m pytest -q
+"""
+import os
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Hay que poner esto para que me tome el paquete Instrumental y los módulos de Pruebas
+for carpeta in (RAIZ, os.path.join(RAIZ, "Pruebas")):
+    if carpeta not in sys.path:
+        sys.path.insert(0, carpeta)
+
+from Instrumental import Sesiones
+from Instrumental.Metricas import METRICAS
+from Instrumental.Simulado import ResourceManagerSimulado, crear_banco
+
+# Instrumento 1000 veces más rápido que el real: un ciclo del puente con T=4 dura 9 ms
+ESCALA_TIEMPO = 0.001
+
+
+@pytest.fixture
+def banco():
+    """
+    Crea bancos simulados, p.ej. banco(puente={"formato_reporte": "completo"}).
+    Al terminar cierra las sesiones del pool: van por id del rm, que se puede reutilizar.
+    """
+    creados = []
+
+    def crear(escala_tiempo=ESCALA_TIEMPO, semilla=1, **por_instrumento):
+        rm = ResourceManagerSimulado(crear_banco(escala_tiempo, semilla, **por_instrumento))
+        creados.append(rm)
+        return rm
+
+    yield crear
+    Sesiones.cerrar_todo()
+
+
+@pytest.fixture
+def rm(banco):
+    return banco()
+
+
+@pytest.fixture
+def metricas():
+    METRICAS.reiniciar()
+    yield METRICAS
+    METRICAS.reiniciar()
@@ -0,0 +1,39 @@
+"""Ajuste de tramos RC: tau sin ruido, segmentación y elección de archivos."""
+import numpy as np
+import pytest
+
+from Ajuste_Exponencial import ajustar_tramo, buscar_capturas, segmentar
+
+
+@pytest.mark.parametrize("tau", [0.05, 0.3, 1.0, 2.7])
+def test_recupera_tau_sin_ruido(tau):
+    t = np.arange(500) * 0.01
+    ajuste = ajustar_tramo(t, 2.0 + 3.0 * np.exp(-t / tau))
+    assert ajuste["tau"] == pytest.approx(tau, rel=1e-4)
+    assert ajuste["A"] == pytest.approx(3.0, rel=1e-3)
+    assert ajuste["C"] == pytest.approx(2.0, rel=1e-3)
+
+
+def test_segmentar_carga_y_descarga():
+    n = 400
+    ciclo = np.r_[1 - np.exp(-np.arange(n) / 40.0), np.exp(-np.arange(n) / 40.0)]
+    v = np.tile(ciclo, 3) + np.random.default_rng(1).normal(0, 0.002, 6 * n)
+    tramos = segmentar(v)
+    assert [d for _, _, d in tramos] == [1, -1] * 3
+    # Cada tramo cubre al menos cinco constantes de tiempo del flanco
+    for inicio, fin, _ in tramos:
+        assert fin - inicio > 5 * 40
+
+
+def test_segmentar_senal_plana():
+    assert segmentar(np.ones(100)) == []
+    assert segmentar([1.0]) == []
+
+
+def test_txt_convertido_se_ajusta_solo_como_cap(tmp_path):
+    carpeta = tmp_path / "Carga" / "dia"
+    carpeta.mkdir(parents=True)
+    for nombre in ("Medicion_1.txt", "Medicion_1.cap", "Medicion_2.txt", "Medicion_3.cap", "otro.txt"):
+        (carpeta / nombre).write_text("")
+    rutas = buscar_capturas(str(tmp_path / "Carga"))
+    assert [r.rsplit("dia", 1)[1][1:] for r in rutas] == ["Medicion_1.cap", "Medicion_2.txt", "Medicion_3.cap"]
@@ -0,0 +1,66 @@
+"""Allan solapada/modificada y deriva contra cálculos directos."""
+import math
+
+import numpy as np
+import pytest
+
+from Allan import AllanIncremental, allan, deriva, m_octavas
+
+
+@pytest.fixture
+def relaciones():
+    rnd = np.random.default_rng(7)
+    return 1.0000012 + 1e-7 * rnd.standard_normal(500)
+
+
+def _allan_directo(y, m):
+    """Definiciones de libro: promedios de m lecturas sin sumas acumuladas."""
+    n = y.size
+    promedios = np.array([y[k:k + m].mean() for k in range(n - m + 1)])
+    adev = math.sqrt(np.mean((promedios[m:] - promedios[:-m]) ** 2) / 2)
+    d = np.array([y[i + m:i + 2 * m].sum() - y[i:i + m].sum() for i in range(n - 2 * m + 1)])
+    ventanas = np.array([d[j:j + m].sum() for j in range(n - 3 * m + 2)])
+    mdev = math.sqrt(np.mean(ventanas ** 2) / (2 * m ** 4))
+    return adev, mdev
+
+
+def test_m_octavas():
+    assert m_octavas(100).tolist() == [1, 2, 4, 8, 16, 32]
+    assert m_octavas(100, maximo=10).tolist() == [1, 2, 4, 8]
+
+
+def test_allan_contra_calculo_directo(relaciones):
+    resultado = allan(relaciones, tau0=10.0)
+    assert resultado["tau"].tolist() == [10.0 * m for m in m_octavas(relaciones.size)]
+    for i, m in enumerate(m_octavas(relaciones.size)):
+        adev, mdev = _allan_directo(relaciones, int(m))
+        assert resultado["adev"][i] == pytest.approx(adev, rel=1e-6)
+        assert resultado["mdev"][i] == pytest.approx(mdev, rel=1e-6)
+
+
+def test_allan_incremental_igual_a_la_serie_completa(relaciones):
+    m = m_octavas(relaciones.size)
+    incremental = AllanIncremental(m, relativa=True)
+    for bloque in np.array_split(relaciones, 7):
+        incremental.agregar(bloque)
+    completa = allan(relaciones, m=m, relativa=True)
+    parcial = incremental.resultado()
+    assert np.allclose(parcial["adev"], completa["adev"], rtol=1e-9)
+    assert np.allclose(parcial["mdev"], completa["mdev"], rtol=1e-9)
+    assert parcial["n_adev"].tolist() == [relaciones.size - 2 * k + 1 for k in m]
+
+
+def test_deriva_contra_polyfit(relaciones):
+    t = np.arange(relaciones.size) * 10.0
+    serie = relaciones + 3e-10 * t
+    resultado = deriva(serie, t)
+    pendiente, ordenada = np.polyfit(t, serie, 1)
+    assert resultado["deriva"] == pytest.approx(pendiente, rel=1e-6)
+    assert resultado["coeficientes"][0] == pytest.approx(ordenada, rel=1e-12)
+
+
+def test_deriva_cuadratica(relaciones):
+    t = np.arange(relaciones.size, dtype=float)
+    serie = relaciones + 1e-9 * t + 2e-12 * t ** 2
+    coeficientes = deriva(serie, t, grado=2)["coeficientes"]
+    assert coeficientes[2] == pytest.approx(np.polyfit(t, serie, 2)[0], rel=1e-4)
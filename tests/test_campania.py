@@ -0,0 +1,131 @@
+"""Campaña: orden de ejecución y checkpoint para retomar."""
+import json
+
+import pytest
+import pyvisa
+
+from Campania import Campania, Checkpoint, Trabajo, planificar, cargar_trabajos
+from Instrumental.MI6010D import MI60100Error
+from Instrumental.Scanner import ScannerInti
+from Medida import Medida
+
+
+def _trabajos():
+    return [Trabajo(1, 1, 0.001, canal=(1, 2), t=4, n_medidas=3, n_stats=2),
+            Trabajo(1, 1, 0.01, canal=(1, 3), t=4, n_medidas=3, n_stats=2),
+            Trabajo(1, 1, 0.001, canal=(1, 4), t=4, n_medidas=3, n_stats=2)]
+
+
+def test_planificar_agrupa_por_corriente():
+    plan = planificar(_trabajos(), ScannerInti.CostoTransicion)
+    assert [t.Ix for t in plan] == [0.001, 0.001, 0.01]
+    # Partiendo con 10 mA encendidos conviene empezar por ese trabajo
+    plan = planificar(_trabajos(), ScannerInti.CostoTransicion, (1, 3), 0.01)
+    assert plan[0].canales == (1, 3)
+
+
+def test_trabajo_ida_y_vuelta(tmp_path):
+    trabajo = Trabajo(10, 1, 0.001, canal=(2, 5), objetivo_ppm=0.05, asentamiento=True)
+    assert Trabajo.desde_dict(trabajo.a_dict()).a_dict() == trabajo.a_dict()
+    ruta = tmp_path / "campania.json"
+    ruta.write_text(json.dumps({"trabajos": [trabajo.a_dict()]}), encoding="utf-8")
+    assert [t.nombre for t in cargar_trabajos(str(ruta))] == [trabajo.nombre]
+
+
+def test_checkpoint_persiste(tmp_path):
+    ruta = str(tmp_path / "checkpoint.json")
+    Checkpoint(ruta).marcar("R1", {"n": 3})
+    checkpoint = Checkpoint(ruta)
+    assert "R1" in checkpoint and "R2" not in checkpoint
+    assert checkpoint.hechos["R1"] == {"n": 3}
+
+
+def test_retoma_desde_el_checkpoint(rm, tmp_path):
+    ruta = str(tmp_path / "checkpoint.json")
+    trabajos = _trabajos()
+    scanner = ScannerInti(rm=rm)
+    medida = Medida(verbose=False, rm=rm)
+    try:
+        hechos = Campania(scanner, medida, checkpoint=ruta, verbose=False).ejecutar(trabajos[:2])
+        assert [r["n"] for r in hechos] == [3, 3]
+        resumenes = []
+        Campania(scanner, medida, checkpoint=ruta, verbose=False).ejecutar(
+            trabajos, callback=lambda i, total, resumen: resumenes.append((i, total, resumen["nombre"])))
+    finally:
+        scanner.ResetGeneral(ScannerInti.DireccionGPIB)
+        medida.close()
+    assert resumenes == [(0, 1, trabajos[2].nombre)]
+    assert sorted(Checkpoint(ruta).hechos) == sorted(t.nombre for t in trabajos)
+
+
+def test_despues_de_standby_vuelve_a_mandar_la_corriente(rm):
+    medida = Medida(verbose=False, rm=rm)
+    try:
+        assert medida.medir(1, 0.001, 4, 2, 2)["n"] == 2
+        medida.bridge.standby()
+        # Con la corriente cacheada no se mandaría I y el puente contestaría E12
+        assert medida.ix_actual is None
+        assert medida.medir(1, 0.001, 4, 2, 2)["n"] == 2
+    finally:
+        medida.close()
+
+
+class _TermometroColgado:
+    def read(self):
+        raise pyvisa.errors.VisaIOError(pyvisa.constants.StatusCode.error_timeout)
+
+
+def test_error_a_mitad_de_trabajo_no_se_marca(rm, tmp_path, monkeypatch):
+    ruta = str(tmp_path / "checkpoint.json")
+    trabajos = _trabajos()[:2]
+    scanner = ScannerInti(rm=rm)
+    medida = Medida(verbose=False, rm=rm)
+    leer_reportes = medida.bridge.leer_reportes
+
+    def corta_en_el_primero(n, decodificador=None):
+        for reporte in leer_reportes(n, decodificador):
+            yield reporte
+            if medida.ix_actual == 0.001:
+                raise MI60100Error(12, "corte simulado")
+
+    monkeypatch.setattr(medida.bridge, "leer_reportes", corta_en_el_primero)
+    try:
+        resumenes = Campania(scanner, medida, checkpoint=ruta, verbose=False).ejecutar(trabajos)
+    finally:
+        scanner.ResetGeneral(ScannerInti.DireccionGPIB)
+        medida.close()
+    por_nombre = {r["nombre"]: r for r in resumenes}
+    assert "corte simulado" in por_nombre[trabajos[0].nombre]["error"]
+    assert por_nombre[trabajos[0].nombre]["n"] == 1
+    # El segundo trabajo (10 mA) se mide igual
+    assert por_nombre[trabajos[1].nombre]["error"] is None
+    assert sorted(Checkpoint(ruta).hechos) == [trabajos[1].nombre]
+
+
+def test_trabajo_incompleto_es_un_error(rm, monkeypatch):
+    scanner = ScannerInti(rm=rm)
+    medida = Medida(verbose=False, rm=rm)
+    leer_reportes = medida.bridge.leer_reportes
+    monkeypatch.setattr(medida.bridge, "leer_reportes",
+                        lambda n, decodificador=None: leer_reportes(n - 1, decodificador))
+    try:
+        resumen = Campania(scanner, medida, verbose=False).ejecutar_trabajo(_trabajos()[0])
+    finally:
+        scanner.ResetGeneral(ScannerInti.DireccionGPIB)
+        medida.close()
+    assert resumen["n"] == 2 and resumen["error"] == "Se leyeron 2 de 3 reportes."
+
+
+def test_timeout_de_un_termometro_no_corta_la_campania(rm, tmp_path):
+    ruta = str(tmp_path / "checkpoint.json")
+    scanner = ScannerInti(rm=rm)
+    medida = Medida(verbose=False, rm=rm)
+    try:
+        resumenes = Campania(scanner, medida, checkpoint=ruta, verbose=False,
+                             termometros={"Rs": _TermometroColgado()}).ejecutar(_trabajos())
+    finally:
+        scanner.ResetGeneral(ScannerInti.DireccionGPIB)
+        medida.close()
+    assert len(resumenes) == 3
+    assert all(r["error"] for r in resumenes)
+    assert Checkpoint(ruta).hechos == {}
@@ -0,0 +1,49 @@
+"""Formato binario de capturas (.cap) y conversión de los archivos de texto de datos/."""
+import numpy as np
+import pytest
+
+from Instrumental.Captura import (EscritorCaptura, abrir_captura, convertir_texto, guardar_captura,
+                                  leer_encabezado, leer_texto, TAM_ENCABEZADO)
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_ida_y_vuelta(tmp_path, mmap):
+    cuentas = np.array([0, 1, -1, 32767, -32768, 1234], dtype=np.int16)
+    ruta = guardar_captura(str(tmp_path / "a.cap"), cuentas, 3.6621e-4, {"temp": 23.5, "sweep_time": 2e-5})
+    captura = abrir_captura(ruta, mmap=mmap)
+    assert len(captura) == cuentas.size
+    assert np.array_equal(captura.cuentas, cuentas)
+    assert np.allclose(captura.voltajes(1, 3), cuentas[1:3] * 3.6621e-4)
+    assert np.allclose(captura.tiempos(0, 2), [0.0, 2e-5])
+    assert captura.metadatos["temp"] == 23.5
+
+
+def test_escritor_incremental_con_bytes_sint(tmp_path):
+    ruta = str(tmp_path / "b.cap")
+    with EscritorCaptura(ruta, 1.0) as escritor:
+        escritor.agregar(np.arange(3, dtype=">i2").tobytes())
+        escritor.agregar([3, 4])
+    assert leer_encabezado(ruta)["n"] == 5
+    assert (tmp_path / "b.cap").stat().st_size == TAM_ENCABEZADO + 5 * 2
+    assert abrir_captura(ruta).cuentas.tolist() == [0, 1, 2, 3, 4]
+
+
+def test_archivo_que_no_es_captura(tmp_path):
+    ruta = tmp_path / "c.cap"
+    ruta.write_bytes(b"texto")
+    with pytest.raises(ValueError):
+        leer_encabezado(str(ruta))
+
+
+def test_convertir_texto_reproduce_los_valores(tmp_path):
+    escala = 1.2 * 10 / 2 ** 15
+    valores = np.array([2731, 5, 6, 6, -3]) * escala
+    ruta_txt = tmp_path / "Medicion_2025-05-30_12-01-57.txt"
+    ruta_txt.write_text("Fecha:\n2025-05-30/12:05:05\nTemp:\n23.47\nsweep time:\n2e-05\nMediciones:\n"
+                        + "\n".join(str(float(v)) for v in valores) + "\n", encoding="utf-8")
+    leidos, metadatos = leer_texto(str(ruta_txt))
+    assert np.allclose(leidos, valores)
+    assert metadatos == {"fecha": "2025-05-30/12:05:05", "temp": 23.47, "sweep_time": 2e-05}
+    captura = abrir_captura(convertir_texto(str(ruta_txt)))
+    assert captura.metadatos["escala_exacta"] is True
+    assert np.allclose(captura.voltajes(), valores, rtol=0, atol=1e-12)
@@ -0,0 +1,35 @@
+"""Catálogo SQLite de capturas: filtros de búsqueda."""
+import pytest
+
+from Catalogo import Catalogo
+
+
+@pytest.fixture
+def catalogo(tmp_path):
+    with Catalogo(str(tmp_path / "catalogo.sqlite"), str(tmp_path)) as catalogo:
+        catalogo.conexion.executemany(
+            "INSERT INTO capturas (ruta, fecha, temp) VALUES (?, ?, ?)",
+            [("a.cap", "2025-05-29T23:59:00", 23.0), ("b.cap", "2025-05-30T12:04:45", 23.5),
+             ("c.cap", "2025-05-31T00:00:01", 24.0)])
+        yield catalogo
+
+
+def _rutas(registros):
+    return [r["ruta"] for r in registros]
+
+
+def test_hasta_con_solo_la_fecha_incluye_ese_dia(catalogo):
+    assert _rutas(catalogo.buscar(hasta="2025-05-30")) == ["a.cap", "b.cap"]
+    assert _rutas(catalogo.buscar(desde="2025-05-30", hasta="2025-05-30")) == ["b.cap"]
+
+
+def test_hasta_con_hora(catalogo):
+    assert _rutas(catalogo.buscar(hasta="2025-05-30T12:00:00")) == ["a.cap"]
+
+
+def test_filtros_y_orden(catalogo):
+    assert _rutas(catalogo.buscar(temp_min=23.5, orden="temp")) == ["b.cap", "c.cap"]
+    with pytest.raises(ValueError):
+        catalogo.buscar(color="rojo")
+    with pytest.raises(ValueError):
+        catalogo.buscar(orden="color")
@@ -0,0 +1,77 @@
+"""Decodificación incremental de los reportes del MI60100."""
+import numpy as np
+import pytest
+
+from Instrumental.MI6010D import MI60100, DecodificadorReportes, decodificar_reporte, codigo_error
+
+
+def test_codigo_error():
+    assert codigo_error("E012") == (True, 12)
+    assert codigo_error(b"E0x") == (True, None)
+    assert codigo_error("&1.0E+00") == (False, None)
+
+
+def test_fragmentos_partidos():
+    decodificador = DecodificadorReportes()
+    assert [r.ratio for r in decodificador.alimentar(b"&1.0000001E+00\r\n&0.99")] == [pytest.approx(1.0000001)]
+    reportes = decodificador.alimentar(b"99999E+00\r\n")
+    assert [r.ratio for r in reportes] == [pytest.approx(0.9999999)]
+    assert decodificador.n == 2
+    assert np.allclose(decodificador.columnas()["ratio"], [1.0000001, 0.9999999])
+
+
+def test_decodificar_reporte_guarda_el_crudo():
+    reporte = decodificar_reporte("&1.0000001E+00")
+    assert reporte.ratio == pytest.approx(1.0000001)
+    assert reporte.crudo == "&1.0000001E+00"
+
+
+def test_formato_largo_y_errores():
+    decodificador = DecodificadorReportes()
+    reportes = decodificador.alimentar("R=1.000001E+00 RS=1.0E+00\nRX=1.000001E+00 MEAN=1.0E+00 STD=0.5 UNC=0.1\nE009\n")
+    assert len(reportes) == 2
+    assert reportes[0].Rx == pytest.approx(1.000001)
+    assert reportes[0].incertidumbre_ppm == pytest.approx(0.1)
+    assert reportes[1].error and reportes[1].codigo == 9
+    assert decodificador.errores == [(1, 9)]
+
+
+def test_sin_acumular_no_reserva_columnas():
+    decodificador = DecodificadorReportes(capacidad=10 ** 9, acumular=False)
+    assert all(columna.size == 0 for columna in decodificador._columnas.values())
+    assert len(decodificador.alimentar("&1.0E+00\n" * 5)) == 5
+    assert decodificador.columnas()["ratio"].size == 0
+
+
+def _medir(puente, n):
+    puente.local_unlock()
+    puente.set_delay_seconds(4)
+    puente.set_primary_current(0.001)
+    puente.set_num_measurements(n)
+    puente._write("R")
+
+
+def test_leer_reportes_en_formato_completo(banco):
+    puente = MI60100(15, rm=banco(puente={"formato_reporte": "completo"}))
+    _medir(puente, 3)
+    reportes = list(puente.leer_reportes(3))
+    assert len(reportes) == 3
+    assert all(r.Rs == pytest.approx(1.0) and r.incertidumbre_ppm is not None for r in reportes)
+
+
+def test_leer_reportes_no_reserva_n_filas(rm, monkeypatch):
+    reservadas = []
+    original = DecodificadorReportes.__init__
+
+    def espiar(self, capacidad=1024, guardar_crudo=False, acumular=True):
+        original(self, capacidad, guardar_crudo, acumular)
+        reservadas.append(self._columnas["ratio"].size)
+
+    monkeypatch.setattr(DecodificadorReportes, "__init__", espiar)
+    puente = MI60100(15, rm=rm)
+    _medir(puente, 10 ** 9)
+    reportes = puente.leer_reportes(10 ** 9)
+    assert next(reportes).ratio == pytest.approx(1.0, rel=1e-6)
+    assert reservadas == [0]
+    reportes.close()
+    puente.standby()
@@ -0,0 +1,74 @@
+"""Descubrimiento de instrumentos en el bus simulado y su cache."""
+import json
+
+from Instrumental import Sesiones
+from Instrumental.Descubrimiento import descubrir, direccion, orden, instrumentos_en_cache
+from Instrumental.HP34401 import HP34401A
+
+BANCO = {
+    "GPIB0::5::INSTR": "HP34401A",
+    "GPIB0::10::INSTR": "HP34420A",
+    "GPIB0::13::INSTR": "HP3245A",
+    "GPIB0::15::INSTR": "MI60100",
+    "GPIB0::18::INSTR": "ScannerInti",
+    "GPIB0::26::INSTR": "HP3458A",
+}
+
+
+def test_identifica_el_banco(rm):
+    encontrados = descubrir(rm, ruta_cache=None)
+    assert {recurso: r["driver"] for recurso, r in encontrados.items()} == BANCO
+    assert direccion("HP34401", encontrados) == "GPIB0::5::INSTR"
+    assert direccion("HP9999", encontrados, defecto="-") == "-"
+
+
+def test_orden_numerico():
+    assert sorted(BANCO, key=orden)[:2] == ["GPIB0::5::INSTR", "GPIB0::10::INSTR"]
+
+
+def test_usa_la_cache_si_el_bus_no_cambio(rm, tmp_path):
+    ruta = str(tmp_path / "instrumentos.json")
+    descubrir(rm, ruta_cache=ruta)
+    with open(ruta, encoding="utf-8") as f:
+        cache = json.load(f)
+    cache["GPIB0"]["instrumentos"]["GPIB0::5::INSTR"]["driver"] = "de la cache"
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(cache, f)
+    assert descubrir(rm, ruta_cache=ruta)["GPIB0::5::INSTR"]["driver"] == "de la cache"
+    assert descubrir(rm, ruta_cache=ruta, forzar=True)["GPIB0::5::INSTR"]["driver"] == "HP34401A"
+    assert instrumentos_en_cache(ruta)["GPIB0::5::INSTR"]["driver"] == "HP34401A"
+
+
+def test_q_solo_a_lo_que_no_contesto_la_identificacion(rm):
+    recibidos = {}
+    for recurso, instrumento in rm.instrumentos.items():
+        procesar = instrumento._procesar
+
+        def registrar(texto, recurso=recurso, procesar=procesar):
+            recibidos.setdefault(recurso, []).append(texto.strip())
+            return procesar(texto)
+
+        instrumento._procesar = registrar
+    descubrir(rm, ruta_cache=None)
+    for recurso in ("GPIB0::5::INSTR", "GPIB0::10::INSTR", "GPIB0::13::INSTR", "GPIB0::26::INSTR"):
+        assert "Q" not in recibidos[recurso]
+    assert recibidos["GPIB0::15::INSTR"][-2:] == ["Q", "s"]
+    assert rm.instrumentos["GPIB0::15::INSTR"].standby
+    # Las sesiones de la búsqueda no quedan abiertas en el pool
+    assert Sesiones.sesiones_abiertas() == {}
+
+
+def test_no_consulta_direcciones_abiertas_por_un_driver(rm, tmp_path):
+    ruta = str(tmp_path / "instrumentos.json")
+    descubrir(rm, ruta_cache=ruta)
+    multimetro = HP34401A("GPIB0::5::INSTR", rm=rm)
+    try:
+        comandos = rm.instrumentos["GPIB0::5::INSTR"].comandos_recibidos
+        encontrados = descubrir(rm, ruta_cache=ruta, forzar=True)
+        assert rm.instrumentos["GPIB0::5::INSTR"].comandos_recibidos == comandos
+        # Se conserva lo que ya decía la cache
+        assert encontrados["GPIB0::5::INSTR"]["driver"] == "HP34401A"
+        assert descubrir(rm, ruta_cache=None)["GPIB0::5::INSTR"]["en_uso"]
+        assert Sesiones.sesiones_abiertas() == {"GPIB0::5::INSTR": 1}
+    finally:
+        multimetro.close()
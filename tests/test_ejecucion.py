@@ -0,0 +1,34 @@
+"""Motor de ejecución: elección de la tarea según el archivo y puntos de control."""
+import json
+import queue
+
+import pytest
+
+from Ejecucion import Cancelado, Contexto, tarea_campania, tarea_para, tarea_plan
+
+
+@pytest.mark.parametrize("datos, tarea", [({"trabajos": []}, tarea_campania), ([], tarea_campania),
+                                          ({"nombre": "plan"}, tarea_plan)])
+def test_tarea_para(tmp_path, datos, tarea):
+    ruta = tmp_path / "archivo.json"
+    ruta.write_text(json.dumps(datos), encoding="utf-8")
+    assert tarea_para(str(ruta)) is tarea
+
+
+@pytest.mark.parametrize("texto", ["3", '"trabajos"', "null", "{"])
+def test_tarea_para_rechaza_lo_que_no_es_campania_ni_plan(tmp_path, texto):
+    ruta = tmp_path / "archivo.json"
+    ruta.write_text(texto, encoding="utf-8")
+    with pytest.raises(ValueError):
+        tarea_para(str(ruta))
+
+
+def test_contexto_cancela_en_el_proximo_punto_de_control():
+    cola = queue.Queue()
+    contexto = Contexto(cola)
+    contexto.agregar({"indice": 0})
+    contexto._cancelar.set()
+    with pytest.raises(Cancelado):
+        contexto.agregar({"indice": 1})
+    # La lectura que ya estaba hecha se entrega igual
+    assert [cola.get_nowait()[1]["indice"] for _ in range(2)] == [0, 1]
@@ -0,0 +1,78 @@
+"""Estadística en línea (Welford) y detección de asentamiento."""
+import math
+
+import numpy as np
+import pytest
+
+from Estadistica import EstadisticaOnline, DetectorAsentamiento
+
+
+@pytest.fixture
+def relaciones():
+    rnd = np.random.default_rng(7)
+    return 1.0000012 + 1e-7 * rnd.standard_normal(500)
+
+
+# ---------------------
+# EstadisticaOnline
+# ---------------------
+def test_welford_contra_numpy(relaciones):
+    estadistica = EstadisticaOnline(n_ventana=10)
+    for valor in relaciones:
+        estadistica.agregar(valor)
+    assert estadistica.n == relaciones.size
+    assert estadistica.media == pytest.approx(relaciones.mean(), rel=1e-15)
+    assert estadistica.desvio == pytest.approx(relaciones.std(ddof=1), rel=1e-9)
+    assert (estadistica.minimo, estadistica.maximo) == (relaciones.min(), relaciones.max())
+    assert np.array_equal(estadistica.ventana(), relaciones[-10:])
+    assert estadistica.media_ventana() == pytest.approx(relaciones[-10:].mean(), rel=1e-15)
+    esperada = relaciones[-10:].std(ddof=1) / math.sqrt(10) / relaciones[-10:].mean() * 1e6
+    assert estadistica.incertidumbre_ppm() == pytest.approx(esperada)
+
+
+def test_ventana_incompleta():
+    estadistica = EstadisticaOnline(n_ventana=5)
+    for valor in (1.0, 2.0):
+        estadistica.agregar(valor)
+    assert estadistica.ventana().tolist() == [1.0, 2.0]
+    assert estadistica.media_ventana() is None
+    assert estadistica.incertidumbre_ppm() is None
+
+
+@pytest.mark.parametrize("valores", [[1.0, -1.0, 1.0, -1.0], [0.0] * 4])
+def test_incertidumbre_con_media_cero_es_none(valores):
+    estadistica = EstadisticaOnline(n_ventana=4)
+    for valor in valores:
+        estadistica.agregar(valor)
+    assert estadistica.incertidumbre_ppm() is None
+    assert estadistica.a_dict()["incertidumbre_ppm"] is None
+
+
+# ---------------------
+# DetectorAsentamiento
+# ---------------------
+def test_serie_estable_se_asienta_en_la_primera_ventana_posible(relaciones):
+    detector = DetectorAsentamiento(ventana=10, confirmaciones=3)
+    for i, valor in enumerate(relaciones):
+        if detector.agregar(valor, t=i):
+            break
+    # Se evalúa desde la lectura 10: la tercera confirmación llega en la 12
+    assert detector.n == 12
+    assert detector.indice == 0
+    assert detector.tiempo_s == 0.0
+    assert np.array_equal(detector.valores_asentados(), relaciones[:12])
+
+
+def test_deriva_de_calentamiento(relaciones):
+    detector = DetectorAsentamiento(ventana=20, confirmaciones=3)
+    t = np.arange(relaciones.size)
+    serie = relaciones + 5e-6 * np.exp(-t / 40.0)
+    asentado = None
+    for i, valor in enumerate(serie):
+        if detector.agregar(valor, t=2.0 * i):
+            asentado = i
+            break
+    assert asentado is not None and asentado > 60
+    assert detector.tiempo_s == 2.0 * detector.indice
+    assert detector.valores_asentados().size == 20 + 3 - 1
+    assert detector.agregar(1.0) is False   # ya asentado: no se vuelve a avisar
@@ -0,0 +1,32 @@
+"""Lecturas en memoria del HP3458A (read_buffer) en formato binario y ASCII."""
+import numpy as np
+import pytest
+
+from Instrumental.HP3458A import HP3458A
+
+
+@pytest.fixture
+def dmm(rm):
+    return HP3458A(do_reset=False, verbose=False, rm=rm)
+
+
+@pytest.mark.parametrize("formato", ["SINT", "DINT", "DREAL", "ASCII"])
+def test_read_buffer(dmm, formato):
+    valores = dmm.read_buffer(20, formato=formato)
+    assert valores.shape == (20,)
+    # SINT cuantiza con ISCALE = 1.2 * rango / 2**15
+    tolerancia = 10 * 1.2 / 2 ** 15 if formato == "SINT" else 1e-6
+    assert np.allclose(valores, 0.5, atol=tolerancia)
+
+
+def test_read_buffer_pide_la_cantidad_con_nrdgs(dmm, rm):
+    dmm.read_buffer(7, formato="SINT")
+    simulado = rm.instrumentos["GPIB0::26::INSTR"]
+    assert simulado.mem == "FIFO"
+    assert simulado.nrdgs == 7
+    assert simulado.memoria.size == 7
+
+
+def test_formato_no_soportado(dmm):
+    with pytest.raises(ValueError):
+        dmm.read_buffer(5, formato="SREAL")
@@ -0,0 +1,33 @@
+"""Registro perezoso de drivers del paquete Instrumental."""
+import subprocess
+import sys
+
+import pytest
+
+import Instrumental
+from Instrumental import clase_driver, DRIVERS, MODELOS
+from conftest import RAIZ
+
+
+def test_clase_por_nombre_de_clase_o_de_modelo():
+    from Instrumental.HP34401 import HP34401A
+    from Instrumental.Scanner import ScannerInti
+    assert clase_driver("HP34401") is HP34401A
+    assert clase_driver("HP34401A") is HP34401A
+    assert clase_driver("Scanner") is ScannerInti
+    assert Instrumental.ScannerInti is ScannerInti
+    assert set(MODELOS.values()) == set(DRIVERS)
+
+
+def test_driver_desconocido():
+    with pytest.raises(ValueError):
+        clase_driver("HP9999")
+    with pytest.raises(AttributeError):
+        Instrumental.NoExiste
+
+
+def test_importar_el_paquete_no_carga_pyvisa_ni_numpy():
+    codigo = ("import sys, Instrumental; "
+              "print(' '.join(m for m in ('pyvisa', 'numpy') if m in sys.modules))")
+    salida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True, check=True)
+    assert salida.stdout.strip() == ""
@@ -0,0 +1,51 @@
+"""Agrupado de comandos en transacciones (ReglaLote) con las reglas de cada driver."""
+import pytest
+
+from Instrumental.Lotes import Lote, ReglaLote, SIN_AGRUPAR
+from Instrumental.HP34401 import HP34401A
+from Instrumental.MI6010D import MI60100
+
+
+def test_une_hasta_el_largo_maximo():
+    regla = ReglaLote(separador=";", largo_max=9)
+    assert regla.agrupar(["AAA", "BBB", "CCC", "D"]) == ["AAA;BBB", "CCC;D"]
+
+
+def test_comandos_solos_cortan_el_lote():
+    regla = ReglaLote(separador="; ", solos=("RESET",))
+    assert regla.agrupar(["DCV 10", "reset", "NPLC 10", "TRIG"]) == ["DCV 10", "reset", "NPLC 10; TRIG"]
+
+
+def test_sin_agrupar():
+    assert SIN_AGRUPAR.agrupar(["A", "B"]) == ["A", "B"]
+
+
+def test_puente_no_une_valores_con_exponente():
+    comandos = ["A1", "I1e-3", "T5", "M50", "J10", "R"]
+    assert MI60100.REGLA_LOTE.agrupar(comandos) == ["A1", "I1e-3", "T5M50J10R"]
+
+
+def test_scpi_del_34401():
+    regla = HP34401A.REGLA_LOTE
+    assert regla.agrupar(["*RST", "CONF:VOLT:DC 10", "VOLT:DC:NPLC 10"]) == ["*RST", "CONF:VOLT:DC 10;:VOLT:DC:NPLC 10"]
+
+
+def test_lote_envia_al_salir_y_descarta_con_excepcion():
+    enviadas = []
+    with Lote(enviadas.append, ReglaLote(separador=";")) as lote:
+        lote.write(" A ").write("").write("B")
+    assert enviadas == ["A;B"]
+    with pytest.raises(RuntimeError):
+        with Lote(enviadas.append, ReglaLote()) as lote:
+            lote.write("C")
+            raise RuntimeError
+    assert enviadas == ["A;B"]
+
+
+def test_puente_acepta_la_configuracion_agrupada(rm):
+    puente = MI60100(15, rm=rm)
+    with puente.lote() as lote:
+        for cmd in ("u", "r2", "A1", "I0.001", "T4", "M1", "J10"):
+            lote.write(cmd)
+    simulado = rm.instrumentos["GPIB0::15::INSTR"]
+    assert (simulado.rx, simulado.ix, simulado.delay, simulado.n_medidas) == (2.0, 0.001, 4, 1)
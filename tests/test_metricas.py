@@ -0,0 +1,31 @@
+"""Métricas de transporte de las sesiones del pool."""
+import pytest
+
+from Instrumental.Metricas import clave_comando
+from Instrumental.MI6010D import MI60100, MI60100Error
+
+
+def test_clave_comando():
+    assert clave_comando("r1.0001\r\n") == "r#"
+    assert clave_comando(b"DCV 10,1E-5") == "DCV"
+    assert clave_comando("*IDN?") == "*IDN?"
+
+
+def test_latencia_y_bytes_por_comando(rm, metricas):
+    puente = MI60100(15, rm=rm)
+    puente.local_unlock()
+    puente.query()
+    comandos = metricas.a_dict()["recursos"]["GPIB0::15::INSTR"]
+    assert comandos["u"]["n"] == 1
+    assert comandos["Q"]["bytes_enviados"] == 3
+    assert "Q" in metricas.resumen()
+
+
+def test_error_se_cuenta_en_el_comando_que_lo_causo(rm, metricas):
+    puente = MI60100(15, rm=rm)
+    puente.local_unlock()
+    with pytest.raises(MI60100Error):
+        puente.single_measurement()
+    comandos = metricas.a_dict()["recursos"]["GPIB0::15::INSTR"]
+    assert comandos["M#R"]["errores"] == 1
+    assert metricas.a_dict()["errores_instrumento"]["GPIB0::15::INSTR"] == {"12": 1}
@@ -0,0 +1,59 @@
+"""Driver del puente MI60100 sobre el banco simulado."""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from Instrumental.MI6010D import MI60100, MI60100Error
+
+
+def test_esperar_listo_devuelve_el_estado(rm):
+    puente = MI60100(15, rm=rm)
+    puente.local_unlock()
+    assert puente.esperar_listo() == "RSq"
+
+
+def test_esperar_listo_no_deja_respuestas_q_de_mas(banco):
+    # Q tarda más que el intervalo de espera: antes se reenviaba en cada intento
+    rm = banco(escala_tiempo=1.0, puente={"demora_estado": 0.35})
+    puente = MI60100(15, rm=rm)
+    assert puente.esperar_listo(timeout_s=2.0, intervalo_ms=100).endswith("q")
+    time.sleep(0.5)
+    assert rm.instrumentos["GPIB0::15::INSTR"]._salida == []
+
+
+def test_corriente_se_reenvia_despues_de_standby(rm):
+    puente = MI60100(15, rm=rm)
+    puente.set_primary_current(0.001)
+    assert puente.ix_actual == 0.001
+    puente.standby()
+    assert puente.ix_actual is None
+
+
+def test_error_limpia_la_corriente(rm):
+    puente = MI60100(15, rm=rm)
+    puente.local_unlock()
+    puente.ix_actual = 0.001   # el driver cree que hay corriente, el puente no
+    with pytest.raises(MI60100Error):
+        puente.single_measurement()
+    assert puente.ix_actual is None
+
+
+def test_cancelar_la_lectura_asincronica_no_llama_al_callback(rm, caplog):
+    puente = MI60100(15, rm=rm)
+    # El hilo del driver queda ocupado para que la lectura siga pendiente y se pueda cancelar
+    puente._ejecutor = ThreadPoolExecutor(max_workers=1)
+    liberar = threading.Event()
+    puente._ejecutor.submit(liberar.wait)
+    recibidos = []
+    try:
+        with caplog.at_level(logging.ERROR, logger="concurrent.futures"):
+            futuro = puente.read_report_async(recibidos.append, timeout_s=0.1)
+            assert futuro.cancel()
+    finally:
+        liberar.set()
+        puente._ejecutor.shutdown()
+    assert recibidos == []
+    assert not [r for r in caplog.records if r.name == "concurrent.futures"]
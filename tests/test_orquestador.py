@@ -0,0 +1,34 @@
+"""Orquestador: temperaturas leídas durante el ciclo del puente."""
+import pytest
+
+from Instrumental.MI6010D import MI60100
+from Orquestador import Orquestador, crear_multimetro, MARGEN_PUNTO_S
+
+
+def test_puntos_con_temperaturas(rm):
+    puente = MI60100(15, rm=rm)
+    puente.local_unlock()
+    puente.set_delay_seconds(4)
+    puente.set_primary_current(0.001)
+    termometros = {"Rs": crear_multimetro("HP34401", "GPIB0::5::INSTR", rm=rm),
+                   "Rx": crear_multimetro("HP34420", "GPIB0::10::INSTR", rm=rm)}
+    orquestador = Orquestador(puente, termometros, verbose=False, delay_s=4)
+    try:
+        puntos = orquestador.medir(2)
+    finally:
+        orquestador.close()
+        puente.standby()
+    assert len(puntos) == 2
+    assert all(p["reporte"].startswith("&") for p in puntos)
+    assert all(p["T_Rs"] == pytest.approx(0.1) and p["T_Rx"] == pytest.approx(1e-3) for p in puntos)
+
+
+def test_timeout_por_punto_sale_del_delay(rm):
+    puente = MI60100(15, rm=rm)
+    assert Orquestador(puente, delay_s=100).timeout_s == 200 + MARGEN_PUNTO_S
+    assert Orquestador(puente).timeout_s is None
+
+
+def test_multimetro_no_soportado():
+    with pytest.raises(ValueError):
+        crear_multimetro("HP9999", "GPIB0::1::INSTR")
@@ -0,0 +1,91 @@
+"""Plan de medición: validación, compilación con cache y ejecución en el banco simulado."""
+import copy
+import json
+import os
+
+import pytest
+
+from Plan_Medicion import (ErrorPlan, PLAN_EJEMPLO, validar, validar_texto, compilar, cargar_plan,
+                           ejecutar_plan, campos_resumen)
+
+
+def _errores(plan):
+    with pytest.raises(ErrorPlan) as error:
+        validar(plan)
+    return error.value.errores
+
+
+def test_plan_de_ejemplo_es_valido():
+    plan = validar(copy.deepcopy(PLAN_EJEMPLO))
+    assert [m["nombre"] for m in plan["mediciones"]] == ["R1", "R2"]
+    # Los parámetros de "puente" son los defectos de cada medición
+    assert plan["mediciones"][0]["n_medidas"] == 50
+    assert plan["mediciones"][1]["n_medidas"] == 100
+
+
+@pytest.mark.parametrize("seccion", ["puente", "scanner"])
+@pytest.mark.parametrize("valor", [[1, 2], "GPIB0::15::INSTR", 5])
+def test_seccion_que_no_es_objeto(seccion, valor):
+    plan = dict(PLAN_EJEMPLO, **{seccion: valor})
+    assert f"{seccion}: debe ser un objeto" in _errores(plan)
+
+
+def test_junta_todos_los_errores():
+    plan = copy.deepcopy(PLAN_EJEMPLO)
+    plan["puente"]["t"] = 2
+    plan["extra"] = 1
+    plan["termometros"]["Rs"]["modelo"] = "HP9999"
+    plan["mediciones"][1]["nombre"] = "R1"
+    plan["mediciones"][0]["canal_s"] = 17
+    errores = _errores(plan)
+    assert "plan.extra: campo desconocido" in errores
+    assert "puente.t: 2 es menor que 4" in errores
+    assert any(e.startswith("termometros.Rs.modelo:") for e in errores)
+    assert "mediciones[1].nombre: 'R1' está repetido" in errores
+    assert any(e.startswith("mediciones[0].canal_s:") for e in errores)
+
+
+def test_json_invalido():
+    with pytest.raises(ErrorPlan) as error:
+        validar_texto("{")
+    assert error.value.errores[0].startswith("JSON inválido")
+
+
+def test_compilado_agrupa_las_lineas_del_puente():
+    compilado = compilar(validar(copy.deepcopy(PLAN_EJEMPLO)))
+    paso = compilado["pasos"][0]
+    assert paso["puente"]["con_corriente"] == ["A1I0.001T5M50J10R"]
+    assert paso["puente"]["sin_corriente"] == ["A1T5M50J10R"]
+    assert compilado["termometros"]["Rs"]["lineas"]
+    json.dumps(compilado)
+
+
+def test_cache_por_contenido(tmp_path):
+    ruta = tmp_path / "plan.json"
+    ruta.write_text(json.dumps(PLAN_EJEMPLO), encoding="utf-8")
+    cache = tmp_path / "cache"
+    primero = cargar_plan(str(ruta), carpeta_cache=str(cache))
+    archivos = os.listdir(cache)
+    assert archivos == [primero["hash"] + ".json"]
+    # Se toma de la cache: un compilado adulterado ahí se devuelve tal cual
+    adulterado = dict(primero, nombre="desde la cache")
+    (cache / archivos[0]).write_text(json.dumps(adulterado), encoding="utf-8")
+    assert cargar_plan(str(ruta), carpeta_cache=str(cache))["nombre"] == "desde la cache"
+    # Otro contenido, otra huella
+    ruta.write_text(json.dumps(dict(PLAN_EJEMPLO, nombre="otro")), encoding="utf-8")
+    assert cargar_plan(str(ruta), carpeta_cache=str(cache))["hash"] != primero["hash"]
+
+
+def test_ejecutar_plan_lee_los_termometros(rm, tmp_path):
+    plan = copy.deepcopy(PLAN_EJEMPLO)
+    plan["puente"].update(t=4, n_medidas=3, n_stats=2)
+    plan["mediciones"][1]["n_medidas"] = 4
+    plan["termometros"] = {"Rs": {"modelo": "HP34401", "direccion": "GPIB0::5::INSTR"},
+                           "Rx": {"modelo": "HP34420", "direccion": "GPIB0::10::INSTR"}}
+    compilado = compilar(validar(plan))
+    assert campos_resumen(compilado)[-4:] == ["T_Rs_inicio", "T_Rs_fin", "T_Rx_inicio", "T_Rx_fin"]
+    resumenes = ejecutar_plan(compilado, rm, checkpoint=str(tmp_path / "checkpoint.json"), verbose=False)
+    assert [r["n"] for r in resumenes] == [3, 4]
+    assert all(r["error"] is None for r in resumenes)
+    assert all(r["T_Rs_inicio"] == pytest.approx(0.1) and r["T_Rx_fin"] == pytest.approx(1e-3)
+               for r in resumenes)
@@ -0,0 +1,96 @@
+"""Registro de resultados en CSV: recuperación tras un corte, rotación y retome."""
+import csv
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from Registro import RegistroResultados, recuperar, inicio_segmento
+
+
+def _filas(ruta):
+    with open(ruta, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_recuperar_trunca_la_fila_cortada(tmp_path):
+    ruta = tmp_path / "r.csv"
+    ruta.write_bytes(b"a,b\n1,2\n3,")
+    assert recuperar(str(ruta)) == 2
+    assert ruta.read_bytes() == b"a,b\n1,2\n"
+    assert recuperar(str(ruta)) == 0
+
+
+def test_recuperar_sin_ningun_terminador(tmp_path):
+    ruta = tmp_path / "r.csv"
+    ruta.write_bytes(b"x" * 10000)
+    assert recuperar(str(ruta)) == 10000
+    assert ruta.read_bytes() == b""
+
+
+def test_retoma_el_archivo_tras_un_corte(tmp_path):
+    base = str(tmp_path / "m")
+    with RegistroResultados(base, ["i", "v"]) as registro:
+        registro.agregar({"i": 0, "v": 1.5})
+    with open(base + "_000.csv", "a", encoding="utf-8") as f:
+        f.write("1,2.")   # fila a medio escribir
+    with RegistroResultados(base, ["i", "v"]) as registro:
+        registro.agregar({"i": 1, "v": 2.5, "sobra": "x"})
+    assert _filas(base + "_000.csv") == [{"i": "0", "v": "1.5"}, {"i": "1", "v": "2.5"}]
+
+
+def test_rotacion_por_tamano(tmp_path):
+    base = str(tmp_path / "m")
+    with RegistroResultados(base, ["i"], max_bytes=20) as registro:
+        for i in range(10):
+            registro.agregar({"i": i})
+    assert len(registro.archivos) > 1
+    leidas = [int(f["i"]) for ruta in registro.archivos for f in _filas(ruta)]
+    assert leidas == list(range(10))
+
+
+def test_antiguedad_de_un_archivo_retomado_sale_de_la_primera_fila(tmp_path):
+    base = str(tmp_path / "m")
+    hace_dos_horas = datetime.now() - timedelta(hours=2)
+    with RegistroResultados(base, ["timestamp", "v"]) as registro:
+        registro.agregar({"timestamp": hace_dos_horas.isoformat(), "v": 1})
+    assert inicio_segmento(base + "_000.csv") == pytest.approx(hace_dos_horas.timestamp())
+    # Escribir de nuevo actualiza el mtime, pero el archivo ya pasó max_segundos: rota
+    with RegistroResultados(base, ["timestamp", "v"], max_segundos=3600) as registro:
+        registro.agregar({"timestamp": datetime.now().isoformat(), "v": 2})
+    assert os.path.exists(base + "_001.csv")
+    assert [f["v"] for f in _filas(base + "_001.csv")] == ["2"]
+
+
+def test_antiguedad_sin_columna_timestamp(tmp_path):
+    base = str(tmp_path / "m")
+    with RegistroResultados(base, ["v"]) as registro:
+        registro.agregar({"v": 1})
+    assert inicio_segmento(base + "_000.csv") is None
+    with RegistroResultados(base, ["v"], max_segundos=3600) as registro:
+        assert time.time() - registro._t_apertura < 60
+
+
+def test_agregar_despues_de_cerrar(tmp_path):
+    registro = RegistroResultados(str(tmp_path / "m"), ["i"])
+    registro.agregar({"i": 0})
+    registro.close()
+    with pytest.raises(ValueError):
+        registro.agregar({"i": 1})
+    assert _filas(registro.archivos[-1]) == [{"i": "0"}]
+
+
+def test_otras_columnas_empiezan_otro_archivo(tmp_path):
+    base = str(tmp_path / "m")
+    with RegistroResultados(base, ["i", "v"]) as registro:
+        registro.agregar({"i": 0, "v": 1})
+    with RegistroResultados(base, ["i", "v", "T_Rs_inicio"]) as registro:
+        registro.agregar({"i": 1, "v": 2, "T_Rs_inicio": 23.1})
+    assert registro.archivos == [base + "_001.csv"]
+    assert _filas(base + "_000.csv") == [{"i": "0", "v": "1"}]
+    assert _filas(base + "_001.csv") == [{"i": "1", "v": "2", "T_Rs_inicio": "23.1"}]
+    # Con las mismas columnas se sigue en el último
+    with RegistroResultados(base, ["i", "v", "T_Rs_inicio"]) as registro:
+        registro.agregar({"i": 2, "v": 3, "T_Rs_inicio": 23.2})
+    assert len(_filas(base + "_001.csv")) == 2
@@ -0,0 +1,47 @@
+"""Espejo de relés y planificación de barridos del ScannerInti."""
+import pytest
+
+from Instrumental.Scanner import ScannerInti
+
+
+@pytest.fixture
+def scanner(rm):
+    scanner = ScannerInti(rm=rm, tiempo_reset=0.0, tiempo_seteo=0.0, tiempo_cambio_estado=0.0)
+    yield scanner
+    scanner.ResetGeneral(ScannerInti.DireccionGPIB)
+
+
+def test_mover_toca_solo_los_reles_que_cambian(scanner):
+    assert scanner.MoverA(ScannerInti.DireccionGPIB, 1, 2) == 2
+    assert scanner.MoverA(ScannerInti.DireccionGPIB, 1, 3) == 2
+    assert scanner.MoverA(ScannerInti.DireccionGPIB, 1, 3) == 0
+    assert (scanner.Estado(ScannerInti.SALIDA_1), scanner.Estado(ScannerInti.SALIDA_2)) == (1, 3)
+    assert scanner.Verificar(ScannerInti.DireccionGPIB)
+
+
+def test_sincronizar_lee_el_instrumento(scanner):
+    scanner.MoverA(ScannerInti.DireccionGPIB, 4, 7)
+    scanner.estado = {ScannerInti.SALIDA_1: None, ScannerInti.SALIDA_2: None}
+    assert scanner.Sincronizar(ScannerInti.DireccionGPIB) == {ScannerInti.SALIDA_1: 4, ScannerInti.SALIDA_2: 7}
+
+
+def test_invertir_canal(scanner):
+    scanner.MoverA(ScannerInti.DireccionGPIB, 1, 2)
+    scanner.InvertirCanal(ScannerInti.DireccionGPIB)
+    assert (scanner.Estado(ScannerInti.SALIDA_1), scanner.Estado(ScannerInti.SALIDA_2)) == (2, 1)
+    assert scanner.Verificar(ScannerInti.DireccionGPIB)
+
+
+def test_costo_y_plan(scanner):
+    assert scanner.CostoTransicion((None, None), (1, 2)) == 2
+    assert scanner.CostoTransicion((1, 2), (1, 3)) == 2
+    assert scanner.CostoTransicion((1, 2), (3, 4)) == 4
+    pares = [(3, 4), (1, 3), (1, 2)]
+    assert scanner.PlanificarBarrido(pares, inicial=(1, 2)) == [(1, 2), (1, 3), (3, 4)]
+
+
+def test_ejecutar_barrido(scanner):
+    resultados = scanner.EjecutarBarrido(ScannerInti.DireccionGPIB, [(1, 2), (3, 4), (1, 3)],
+                                         medir=lambda s, x: s * 10 + x, verificar=True)
+    assert [par for par, _ in resultados] == [(1, 2), (1, 3), (3, 4)]
+    assert [r for _, r in resultados] == [12, 13, 34]
@@ -0,0 +1,83 @@
+"""Banco simulado y drivers de Instrumental sobre él."""
+import time
+
+import pyvisa
+import pytest
+
+from Instrumental.MI6010D import MI60100, MI60100Error
+from Instrumental.HP34401 import HP34401A
+from Instrumental.HP34420 import HP34420A
+from Instrumental.HP3458A import HP3458A
+from Instrumental.Scanner import ScannerInti
+
+
+def _puente(rm):
+    puente = MI60100(15, rm=rm)
+    puente.local_unlock()
+    puente.set_delay_seconds(4)
+    return puente
+
+
+def test_puente_mide_la_relacion_nominal(rm):
+    puente = _puente(rm)
+    puente.send_rx_value(2)
+    puente.set_primary_current(0.001)
+    reporte = puente.single_measurement()
+    assert reporte.startswith("&")
+    assert float(reporte[1:]) == pytest.approx(2.0, rel=1e-6)
+    puente.standby()
+
+
+def test_puente_sin_corriente_devuelve_e12(rm):
+    puente = _puente(rm)
+    with pytest.raises(MI60100Error) as error:
+        puente.single_measurement()
+    assert error.value.code == 12
+
+
+def test_reporte_tarda_dos_inversiones_mas_la_conversion(banco):
+    rm = banco(escala_tiempo=0.01)
+    puente = _puente(rm)
+    puente.set_primary_current(0.001)
+    t0 = time.monotonic()
+    puente.single_measurement()
+    # (2 * 4 s + 1 s) * 0.01
+    assert time.monotonic() - t0 >= 0.09
+
+
+def test_formato_completo(banco):
+    rm = banco(puente={"formato_reporte": "completo"})
+    puente = _puente(rm)
+    puente.set_primary_current(0.001)
+    reporte = puente.single_measurement()
+    for campo in ("R=", "RS=", "RX=", "MEAN=", "STD=", "UNC="):
+        assert campo in reporte
+
+
+def test_recurso_inexistente(rm):
+    with pytest.raises(pyvisa.errors.VisaIOError):
+        rm.open_resource("GPIB0::2::INSTR")
+
+
+def test_multimetros_344xx(rm):
+    for clase, direccion, valor in ((HP34401A, "GPIB0::5::INSTR", 0.1), (HP34420A, "GPIB0::10::INSTR", 1e-3)):
+        dmm = clase(direccion, rm=rm)
+        dmm.configure_voltage_dc()
+        assert float(dmm.read()) == pytest.approx(valor)
+
+
+def test_hp3458a_lectura_unica(rm):
+    dmm = HP3458A(do_reset=False, verbose=False, rm=rm)
+    dmm.configure_measurement("DCV", 10)
+    assert dmm.measure_once() == pytest.approx(0.5)
+
+
+def test_scanner_refleja_los_reles(rm):
+    scanner = ScannerInti(rm=rm)
+    scanner.SetearCanal(ScannerInti.DireccionGPIB, ScannerInti.SALIDA_1, 3)
+    scanner.SetearCanal(ScannerInti.DireccionGPIB, ScannerInti.SALIDA_2, 5)
+    # Ver devuelve el relé cerrado contando desde 0 (InvertirCanal le suma 1)
+    assert scanner.Ver(ScannerInti.DireccionGPIB, ScannerInti.SALIDA_1) == 2
+    assert scanner.Ver(ScannerInti.DireccionGPIB, ScannerInti.SALIDA_2) - 24 == 4
+    scanner.ResetGeneral(ScannerInti.DireccionGPIB)
+    assert scanner.Ver(ScannerInti.DireccionGPIB, ScannerInti.SALIDA_1) == ScannerInti.NADA